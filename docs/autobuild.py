@@ -18,14 +18,30 @@ from glob import glob
 import kivy_statecharts
 
 # force loading of kivy_statechart modules
+import kivy_statecharts.core.empty_state
+import kivy_statecharts.core.history_state
+import kivy_statecharts.core.lean_state
+import kivy_statecharts.core.state
+import kivy_statecharts.core.futures
+import kivy_statecharts.core.statechart
+import kivy_statecharts.core.statechart_definition
 import kivy_statecharts.debug.monitor
+import kivy_statecharts.debug.monitor_backend
 import kivy_statecharts.debug.sequence_matcher
+import kivy_statecharts.debug.startup_profile
+import kivy_statecharts.debug.flight_recorder
+import kivy_statecharts.private.event_cache
+import kivy_statecharts.private.event_queue
 import kivy_statecharts.private.state_path_matcher
+import kivy_statecharts.private.state_path_trie
+import kivy_statecharts.private.timer_queue
 import kivy_statecharts.system.async
 import kivy_statecharts.system.empty_state
+import kivy_statecharts.system.lean_state
 import kivy_statecharts.system.history_state
 import kivy_statecharts.system.state
 import kivy_statecharts.system.statechart
+import kivy_statecharts.system.statechart_definition
 
 # Directory of doc
 base_dir = os.path.dirname(__file__)
@@ -0,0 +1,138 @@
+# ================================================================================
+# Project: kivy-statecharts - A Statechart Framework for Kivy
+# Copyright: (c) 2010, 2011 Michael Cohen, and contributors.
+# Python Port: Jeff Pittman, ported from SproutCore, SC.Statechart
+# ================================================================================
+
+import inspect
+
+'''
+  Asynchronous actions and futures
+  --------------------------------
+
+  A state's enter_state or exit_state can suspend a state transition by
+  returning an Async action, made with perform_async(), or a future, as
+  as_future() tells them apart. StatechartFuture is what the statechart
+  returns from send_event_future() and go_to_state_future().
+'''
+
+class AsyncMixin:
+    '''Singleton.'''
+
+    def perform(self, func, arg1=None, arg2=None):
+        '''Call in either a state's enter_state or exit_state method when you
+           want a state to perform an asynchronous action, such as an
+           animation.
+
+           Parameters:
+
+           * func {String|Function} the function to be invoked on a state
+           * arg1 Optional. An argument to pass to the given function
+           * arg2 Optional. An argument to pass to the given function
+
+           Returns {Async} a new instance of an Async call instance.
+        '''
+        return Async(func, arg1=arg1, arg2=arg2)
+
+class Async(AsyncMixin):
+    '''Represents a call that is intended to be asynchronous. This is
+       used during a state transition process when either entering or exiting a
+       state.
+    '''
+    def __init__(self, func, arg1=None, arg2=None):
+        self.func = func
+        self.arg1 = arg1
+        self.arg2 = arg2
+
+    def try_to_perform(self, state):
+        '''Called by the statechart.'''
+        if isinstance(self.func, basestring):
+            if hasattr(state, self.func):
+              getattr(state, self.func)(self.arg1, self.arg2)
+        # [PORT] Either one, same call sig?
+        elif inspect.isfunction(self.func) or inspect.ismethod(self.func):
+            self.func(state, self.arg1, self.arg2)
+
+class StatechartFuture(object):
+    '''The result of a statechart call that completes later, such as
+       StatechartManager.send_event_future(). Follows the interface of
+       concurrent.futures.Future: done(), result(), exception() and
+       add_done_callback().
+    '''
+    def __init__(self):
+        self._done = False
+        self._result = None
+        self._exception = None
+        self._callbacks = []
+
+    def done(self):
+        return self._done
+
+    def result(self):
+        '''Returns the result, or raises the exception the future failed
+           with.
+        '''
+        if not self._done:
+            raise Exception("The result of this future is not set yet.")
+        if self._exception is not None:
+            raise self._exception
+        return self._result
+
+    def exception(self):
+        '''Returns the exception the future failed with, or None.'''
+        if not self._done:
+            raise Exception("The result of this future is not set yet.")
+        return self._exception
+
+    def add_done_callback(self, fn):
+        '''Calls fn with this future once it is done, or now if it already
+           is.
+        '''
+        if self._done:
+            fn(self)
+        else:
+            self._callbacks.append(fn)
+
+    def set_result(self, result):
+        '''Called by the statechart.'''
+        self._result = result
+        self._complete()
+
+    def set_exception(self, exception):
+        '''Called by the statechart.'''
+        self._exception = exception
+        self._complete()
+
+    def _complete(self):
+        self._done = True
+
+        callbacks, self._callbacks = self._callbacks, []
+        for fn in callbacks:
+            fn(self)
+
+def future_exception(future):
+    '''Returns the exception a done future failed with, or None. A cancelled
+       future fails with the exception its exception() raises.
+    '''
+    exception = getattr(future, 'exception', None)
+
+    if exception is None:
+        return None
+
+    try:
+        return exception()
+    except Exception as cancelled:
+        return cancelled
+
+def as_future(value):
+    '''Returns value if it can tell when it is done, as futures do with
+       add_done_callback(), such as concurrent.futures.Future or
+       StatechartFuture. Returns None for anything else.
+    '''
+    if value is None or isinstance(value, Async):
+        return None
+
+    if hasattr(value, 'add_done_callback'):
+        return value
+
+    return None
@@ -0,0 +1,41 @@
+# ================================================================================
+# Project: kivy-statecharts - A Statechart Framework for Kivy
+# Copyright: (c) 2010, 2011 Michael Cohen, and contributors.
+# Python Port: Jeff Pittman, ported from SproutCore, SC.Statechart
+# ================================================================================
+
+
+from kivy_statecharts.core.state import BaseState
+
+
+class BaseHistoryState(BaseState):
+    '''The behavior of history states, HistoryState and LeanHistoryState,
+       apart from how is_recursive and default_state are stored. See
+       HistoryState.
+    '''
+
+    __slots__ = ()
+
+    # Used to indicate if the statechart should recurse the history states
+    # after entering the this object's parent state.
+    is_recursive = False
+
+    # The default state to enter if the parent state does not yet have its
+    # history_state property assigned.
+    default_state = None
+
+    def state(self):
+        '''Used by the statechart during a state transition process.
+
+           Returns a state to enter based on whether the parent state has its
+           history_state property assigned. If not then this object's assigned
+           default state is returned.
+
+           PORT: This was a computed property, so it could be observed.
+                 Here, we make it a dynamic method.
+        '''
+
+        default_state = self.get_state(self.default_state)
+        history_state = self.parent_state.history_state
+
+        return history_state if history_state else default_state
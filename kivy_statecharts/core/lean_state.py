@@ -0,0 +1,116 @@
+# ================================================================================
+# Project: kivy-statecharts - A Statechart Framework for Kivy
+# Copyright: (c) 2010, 2011 Michael Cohen, and contributors.
+# Python Port: Jeff Pittman, ported from SproutCore, SC.Statechart
+# ================================================================================
+
+from kivy_statecharts.core.empty_state import BaseEmptyState
+from kivy_statecharts.core.history_state import BaseHistoryState
+from kivy_statecharts.core.state import BaseState
+
+from types import MemberDescriptorType
+
+class LeanState(BaseState):
+    '''A state that keeps its attributes in slots instead of Kivy properties.
+
+       LeanState has the same API as State, so a state class can switch by
+       changing its base class. It is not an EventDispatcher, though: its
+       attributes cannot be bound to, trace and owner are looked up from the
+       statechart when read, and full_path is computed once the state is
+       initialized. Use it for big or headless statecharts, where nothing
+       observes the states themselves.
+
+       Subclasses that only handle events can declare an empty __slots__ to
+       keep their instances small. Subclasses with substates need an instance
+       __dict__, because each substate is also set as an attribute on its
+       parent state.
+    '''
+
+    __slots__ = ('owner_key', 'name', 'parent_state', 'history_state',
+                 'initial_substate_key', 'initial_substate_object',
+                 'substates_are_concurrent', 'substates', 'statechart',
+                 'state_is_initialized', 'current_substates',
+                 'entered_substates', 'state_id', '_full_path_value',
+                 '_registered_event_handlers',
+                 '_registered_string_event_handlers',
+                 '_registered_reg_exp_event_handlers',
+                 '_registered_substates', '_substate_path_cache',
+                 '_substate_path_trie', '_lazy_substates',
+                 '_event_dispatch_table', '_event_memo',
+                 '_reg_exp_event_matcher', '_reg_exp_event_handler_groups',
+                 '_is_entering_state', '_is_exiting_state',
+                 '_traverse_states_to_exit_skip_state', '__weakref__')
+
+    def __init__(self, **kwargs):
+        self.name = None
+        self.parent_state = None
+        self.history_state = None
+        self.initial_substate_key = _declared(self, 'initial_substate_key',
+                                              None)
+        self.initial_substate_object = None
+        self.substates_are_concurrent = _declared(self,
+                                                  'substates_are_concurrent',
+                                                  False)
+        self.substates = []
+        self.statechart = None
+        self.state_is_initialized = False
+        self.current_substates = []
+        self.entered_substates = []
+        self._full_path_value = None
+
+        self._init_attributes(kwargs)
+
+    @property
+    def trace(self):
+        '''Indicates if this state should trace actions. Follows the
+           statechart's trace property.
+        '''
+        sc = self.statechart
+        return sc.trace if sc else False
+
+    @property
+    def owner(self):
+        '''The owner of this state: the statechart's owner if it has one,
+           otherwise the statechart.
+        '''
+        sc = self.statechart
+        key = sc.statechart_owner_key if sc else None
+        owner = getattr(sc, key) if sc else None
+        return owner if owner else sc
+
+    @property
+    def full_path(self):
+        '''The relative path to the root state.'''
+        if self._full_path_value is not None:
+            return self._full_path_value
+
+        full_path = self._compute_full_path()
+
+        if self.state_is_initialized:
+            self._full_path_value = full_path
+
+        return full_path
+
+    def _owner(self, *l):
+        # owner is looked up when read.
+        pass
+
+def _declared(state, key, default):
+    '''Returns the value the class of state declares for the slot key as a
+       class attribute, as State allows for its Kivy properties, e.g. the
+       root state class built by the statechart, or default.
+    '''
+    value = getattr(type(state), key)
+    return default if isinstance(value, MemberDescriptorType) else value
+
+class LeanEmptyState(BaseEmptyState, LeanState):
+    '''The empty state added to lean states without an initial substate.'''
+
+    __slots__ = ()
+
+class LeanHistoryState(BaseHistoryState, LeanState):
+    '''A history state for lean states. See HistoryState.
+
+       It keeps is_recursive and default_state in its instance __dict__, so
+       that subclasses can also set them as class attributes.
+    '''
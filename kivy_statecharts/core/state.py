@@ -0,0 +1,1633 @@
+# ================================================================================
+# Project: kivy-statecharts - A Statechart Framework for Kivy
+# Copyright: (c) 2010, 2011 Michael Cohen, and contributors.
+# Python Port: Jeff Pittman, ported from SproutCore, SC.Statechart
+# ================================================================================
+
+from kivy_statecharts.private.state_path_matcher import compile_expression
+from kivy_statecharts.private.state_path_matcher import _BASIC
+from kivy_statecharts.private.state_path_trie import StatePathTrie
+from kivy_statecharts.core.futures import AsyncMixin
+from collections import deque, OrderedDict
+
+import importlib, inspect, re, weakref
+
+REGEX_TYPE = type(re.compile(''))
+
+# Kinds of entries in a state's event dispatch table.
+NO_EVENT_HANDLER = 0
+EVENT_HANDLER_NAME = 1
+BASIC_EVENT_METHOD = 2
+EVENT_HANDLER = 3
+
+# Matches numbered backreferences, which do not survive combining regular
+# expression event handlers into one expression.
+NUMBERED_BACKREFERENCE = re.compile(r'\\[1-9]|\(\?\(\d')
+
+# How many open ended event names a state remembers the handler for.
+EVENT_MEMO_SIZE = 256
+
+# How many path expressions a state remembers the resolution of, in
+# get_substate().
+SUBSTATE_PATH_CACHE_SIZE = 256
+
+# A dotted path to a state class, for lazy substates. See is_lazy_substate().
+LAZY_SUBSTATE_PATH = re.compile(r'^[A-Za-z_]\w*(\.[A-Za-z_]\w*)+$')
+
+# What separates the state names in a state path match expression.
+PATH_PART_SEPARATOR = re.compile(r'[.~]')
+
+# Names of the substate classes and event handlers of each State subclass,
+# found by class_members() when the first instance is initialized.
+_STATE_MEMBERS = weakref.WeakKeyDictionary()
+
+# Classes of descriptors whose value is kept per instance, such as Kivy
+# properties, which class_members() looks up on each instance. See
+# register_property_type().
+_PROPERTY_TYPES = ()
+
+'''Authorship Details
+   ------------------
+
+   Michael Cohen wrote the javascript version in 2010-2011 as Ki:
+
+       https://github.com/FrozenCanuck/Ki/
+
+   which became SC.Statechart in 2011:
+
+       https://github.com/sproutcore/sproutcore/tree/master/frameworks/statechart
+
+   Jeff Pittman wrote the Python port in 2012, porting directly from
+   SC.Statechart, and prepared for incorporation into the Kivy project.
+
+   kivy-statecharts became part of the Kivy project in [TODO].
+'''
+
+class BaseState(object):
+    '''The behavior shared by all states, State and LeanState, apart from how
+       a state stores its attributes: State keeps them in Kivy properties,
+       LeanState in slots.
+
+       BaseState, like everything in kivy_statecharts.core, does not import
+       Kivy, so that headless statecharts, e.g. in batch simulations and test
+       workers, load quickly. The Kivy adapter, kivy_statecharts.system,
+       adds properties and Clock integration.
+    '''
+
+    __slots__ = ()
+
+    def _init_attributes(self, kwargs):
+        '''Sets up a new state's bookkeeping, then applies the keyword
+           arguments it was created with.
+        '''
+        self._registered_event_handlers = {}
+        self._registered_string_event_handlers = {}
+        self._registered_reg_exp_event_handlers = []
+        self._registered_substates = []
+        self._substate_path_cache = {}
+
+        # The index of the paths of all substates, kept by the root state
+        # only, see _register_with_parent_states().
+        self._substate_path_trie = None
+
+        # Substates declared as dotted paths and not yet loaded, by name.
+        self._lazy_substates = None
+        self._event_dispatch_table = {}
+        self._event_memo = OrderedDict()
+        self._reg_exp_event_matcher = None
+        self._reg_exp_event_handler_groups = {}
+        self._is_entering_state = False
+        self._is_exiting_state = False
+
+        # Dense integer id given to this state by its statechart in
+        # init_state(), used to index the statechart's state flags.
+        self.state_id = None
+
+        sc = self.statechart
+
+        self.owner_key = sc.statechart_owner_key if sc else None
+
+        for k,v in kwargs.items():
+            if k == 'initial_substate_key':
+                # [PORT] Force initial_substate_key to always be string.
+                if isinstance(v, basestring):
+                    self.initial_substate_key = v
+                else:
+                    name = v.name if hasattr(v, 'name') else None
+                    if name:
+                        self.initial_substate_key = name
+                    else:
+                        self.initial_substate_object = v
+            else:
+                setattr(self, k, v)
+
+    def statechart_owner_did_change(self):
+        self._owner()
+
+        for substate in self.substates:
+            substate.statechart_owner_did_change()
+
+    def destroy(self):
+        sc = self.statechart
+
+        # [PORT] What about destroying owner_key
+        self.owner_key = sc.statechart_owner_key if sc else None
+
+        if sc is not None:
+            sc.state_tree_did_change()
+            sc._unregister_state(self)
+
+        _unregister_state_path(self)
+
+        self._unbind_observers()
+
+        [state.destroy() for state in self.substates]
+
+        if self._lazy_substates:
+            for lazy_substate in self._lazy_substates.values():
+                _unregister_state_path(lazy_substate)
+
+        self.substates = []
+        self.current_substates = []
+        self.entered_substates = []
+        self.parent_state = None
+        self.history_state = None
+        self.initial_substate_key = None
+        self.initial_substate_object = None
+        self.statechart = None
+
+        #self.notifyPropertyChange("owner")
+
+        self._registered_event_handlers = []
+        self._registered_string_event_handlers = []
+        self._registered_reg_exp_event_handlers = []
+        self._registered_substates = []
+        self._substate_path_cache = {}
+        self._substate_path_trie = None
+        self._lazy_substates = None
+        self._event_dispatch_table = {}
+        self._event_memo = OrderedDict()
+        self._reg_exp_event_matcher = None
+        self._reg_exp_event_handler_groups = {}
+
+    def init_state(self):
+        '''Used to initialize this state. To only be called by the owning
+           statechart.
+        '''
+        profile = getattr(self.statechart, '_active_startup_profile', None)
+
+        if profile is None:
+            self._init_state()
+            return
+
+        profile.begin_subtree(self)
+        try:
+            self._init_state()
+        finally:
+            profile.end_subtree(self)
+
+    def _init_state(self):
+        if self.state_is_initialized:
+            self.state_log_warning("Cannot init_state() -- already init'ed.")
+            return
+
+        if not self.name:
+            self.state_log_error("Cannot init_state() an unnamed state.")
+            raise Exception("Cannot init_state() an unnamed state.")
+
+        if self.statechart is not None:
+            self.statechart._register_state(self)
+
+        self._register_with_parent_states()
+
+        matched_initial_substate = False
+        history_state = None
+
+        self.substates = []
+
+        if hasattr(self, 'InitialSubstate'):
+            from kivy_statecharts.core.history_state import BaseHistoryState
+
+            initial_substate_class = getattr(self, 'InitialSubstate')
+
+            if (initial_substate_class is not None and
+                inspect.isclass(initial_substate_class) and
+                issubclass(initial_substate_class, BaseHistoryState)):
+
+                history_state = self.create_substate(initial_substate_class)
+
+                if history_state.default_state:
+                    setattr(self,
+                            'initial_substate_key',
+                            history_state.default_state)
+                else:
+                    msg = ("Initial substate is invalid. History state "
+                           "requires the name of a default state to be set.")
+                    self.state_log_error(msg)
+                    raise Exception(msg)
+
+        # Iterate through all this state's substates, if any, create them, and
+        # then initialize them. This causes a recursive process.
+        for key, value in class_members(self, _STATE_MEMBERS,
+                                        _is_state_member):
+            if inspect.ismethod(value):
+                self._register_event_handler(key, value)
+                continue
+
+            if isinstance(value, basestring):
+                # Substates entered along with this state are loaded now.
+                if (key == self.initial_substate_key
+                        or self.substates_are_concurrent
+                        or (history_state is not None
+                            and history_state.default_state == key)):
+                    value = import_state_class(value)
+                else:
+                    self._add_lazy_substate(key, value)
+                    continue
+
+            if inspect.isclass(value) and issubclass(value, BaseState):
+                state = self._add_substate(key, value, None)
+                # [PORT] Added clarification in this condition to distinguish
+                #        between the normal case of having a simple
+                #        initial_substate_key defined, vs. the use of a
+                #        HistoryState as the initial_substate.
+                if key == self.initial_substate_key and history_state is None:
+                    # [PORT] Needs to always be a string.
+                    self.initial_substate_key = \
+                            state if isinstance(state, basestring) else state.name
+                    self.initial_substate_object = state
+                    matched_initial_substate = True
+                elif history_state and history_state.default_state == key:
+                    # [PORT] No need to do this in python version, because
+                    #        default_state is a key; We do not reset
+                    #        default_state to be a state object -- we rely on
+                    #        get_substate to find it by the key when it is
+                    #        accessed. default_state has already been set (See
+                    #        check above).
+                    # [PORT] Needs to always be a string.
+                    #history_state.default_state = \
+                    #       state if isinstance(state, basestring) else state.name
+                    matched_initial_substate = True
+
+        # Lazy substates count as substates, though they are not created yet.
+        has_substates = len(self.substates) > 0 or bool(self._lazy_substates)
+
+        if self.initial_substate_key and not matched_initial_substate:
+            if not has_substates:
+                if self.initial_substate_key:
+                    msg = ("Unable to make {0} an initial substate since state "
+                           "{1} has no substates").format(
+                                   self.initial_substate_key, self)
+                    self.state_log_error(msg)
+                    raise Exception(msg)
+            else:
+                msg = ("Unable to set initial substate {0} since it did "
+                       "not match any of state {1}'s substates").format(
+                               self.initial_substate_key, self)
+                self.state_log_error(msg)
+                raise Exception(msg)
+
+        if has_substates:
+            state = self._add_empty_initial_substate_if_needed()
+            if (state is None
+                      and self.initial_substate_key
+                      and self.substates_are_concurrent):
+                msg = ("Cannot use {0} as initial substate since "
+                       "substates are all concurrent for state "
+                       "{1}").format(self.initial_substate_key, self)
+                self.state_log_error(msg)
+                raise Exception(msg)
+
+        #self.notifyPropertyChange("substates")
+        # [PORT] substates have changed. Call _current_states on statechart,
+        #        which is bound to root_state_instance, and updates
+        #        self.current_states = self.root_state_instance.substates.
+        #        That binding won't fire if root_state_instance.substates
+        #        changes, so we manually call it in kivy.
+        if self.statechart:
+            self.statechart._current_states()
+
+        self.current_substates = []
+        self.entered_substates = []
+        self._event_dispatch_table = {}
+        self._event_memo = OrderedDict()
+        self._compile_reg_exp_event_handlers()
+        self.state_is_initialized = True
+
+    def _default_substate_class(self):
+        '''Returns the class of the substates added by add_substate() without
+           a state class.
+        '''
+        from kivy_statecharts.core.lean_state import LeanState
+
+        return LeanState
+
+    def _empty_state_class(self):
+        '''Returns the class of the empty state added to this state when it
+           has no initial substate. See _add_empty_initial_substate_if_needed().
+        '''
+        from kivy_statecharts.core.lean_state import LeanEmptyState
+
+        return LeanEmptyState
+
+    def _add_empty_initial_substate_if_needed(self):
+        if self.initial_substate_key or self.substates_are_concurrent:
+            return None
+
+        state = self.create_substate(self._empty_state_class())
+
+        # EmptyState has name set to "__EMPTY_STATE__"
+        self.initial_substate_key = state.name
+
+        # The EmptyState's name, "__EMPTY_STATE__" is used as a
+        # property name, whose value is the empty state object
+        setattr(self, state.name, state)
+
+        # [PORT] Why would this be set, if initial_substate_key is set?
+        self.initial_substate_object = state
+
+        self.substates.append(state)
+
+        state.init_state()
+
+        msg = ("state {0} has no initial substate defined. Will default to "
+               "using an empty state as initial substate")
+        self.state_log_warning(msg.format(self))
+
+        return state
+
+    def _add_substate(self, name, state, attr):
+        attr = dict.copy(attr) if attr else {}
+        attr['name'] = name
+
+        state = self.create_substate(state, attr)
+
+        self.substates.append(state)
+
+        setattr(self, name, state)
+
+        state.init_state()
+
+        return state
+
+    def add_substate(self, name, state=None, attr={}):
+        '''Used to dynamically add a substate to this state. Once added
+           successfully you are then able to go to it from any other state
+           within the owning statechart.
+
+           A couple of notes when adding a substate:
+
+           * If this state does not have any substates, then in addition to the
+             substate being added, an empty state will also be added and set as
+             the initial substate. To make the added substate the initial
+             substate, set this object's initial_substate_key property.
+           * If this state is a current state, the added substate will not be
+             entered.
+           * If this state is entered and its substates are concurrent, the added
+             substate will not be entered.
+
+           If this state is either entered or current and you'd like the added
+           substate to take affect, you will need to explicitly reenter this
+           state by calling its `reenter` method.
+
+           Be aware that the name of the state you are adding must not conflict
+           with the name of a property on this state or else you will get an
+           error.  In addition, this state must be initialized to add
+           substates.
+
+           Parameters:
+
+           * name {String} - A unique name for the given substate.
+           * state {State} - A class that derives from `State`.
+           * attr {dict} - args dict to be applied to the substate.
+
+           Returns an instance of the given state class.
+        '''
+        if not name: # [PORT] this used the empty(name) function.
+            msg = "Cannot add substate. name required"
+            self.state_log_error(msg)
+            raise Exception(msg)
+
+        if hasattr(self, name):
+            msg = ("Cannot add substate '{0}'. Already a defined "
+                   "property").format(name)
+            self.state_log_error(msg)
+            raise Exception(msg)
+
+        if not self.state_is_initialized:
+            msg = ("Cannot add substate '{0}'. Parent state is not yet "
+                   "initialized").format(name)
+            self.state_log_error(msg)
+            raise Exception(msg)
+
+        if state is None:
+            state = self._default_substate_class()
+        elif state is not None and isinstance(state, dict):
+            attr = state
+            state = self._default_substate_class()
+
+        state_is_valid = (inspect.isclass(state)
+                          and issubclass(state, BaseState))
+
+        if not state_is_valid:
+            msg = ("Cannot add substate '{0}'. Must provide a state "
+                   "class").format(name)
+            self.state_log_error(msg)
+            raise Exception(msg)
+
+        state = self._add_substate(name, state, attr)
+
+        self._substate_was_added()
+
+        # [PORT] Should there be a manual update call here?
+        #self.dispatch('substates')
+        #self.notifyPropertyChange("substates")
+
+        return state
+
+    def _substate_was_added(self):
+        '''The bookkeeping of add_substate(), and of loading a lazy substate,
+           once the substate is added: as documented for add_substate(), an
+           empty initial substate is added if needed, and the added substate
+           is not entered.
+        '''
+        self._add_empty_initial_substate_if_needed()
+
+        if self.statechart is not None:
+            self.statechart.state_tree_did_change()
+
+    def create_substate(self, state, attr=None):
+        attr = dict.copy(attr) if attr else {}
+        attr['parent_state'] = self
+        attr['statechart'] = self.statechart
+        return state(**attr)
+
+    def _register_event_handler(self, name, handler):
+        '''Registers event handlers with this state. Event handlers are special
+           functions on the state that are intended to handle more than one
+           event.  This compared to basic functions that only respond to a
+           single event that reflects the name of the method.
+        '''
+        self._registered_event_handlers[name] = handler
+
+        for event in handler.events:
+            # [PORT] checking for string and unicode -- need unicode? otherwise just str?
+            if isinstance(event, basestring):
+                self._registered_string_event_handlers[event] = \
+                        { 'name': name, 'handler': handler }
+                continue
+
+            if isinstance(event, REGEX_TYPE):
+                self._registered_reg_exp_event_handlers.append(
+                        { 'name': name, 'handler': handler, 'regexp': event })
+                continue
+
+            msg = ("Invalid event {0} for event handler {1} in "
+                   "state {1}").format(event, name, self)
+            self.state_log_error(msg)
+            raise Exception(msg)
+
+    def _register_with_parent_states(self):
+        '''Traverse up through this state's parent states to register this
+           state with them, and index its path in the root state's path trie.
+        '''
+        profile = getattr(self.statechart, '_active_startup_profile', None)
+
+        if profile is None:
+            _register_state_path(self, True)
+            return
+
+        phase = profile.begin_phase()
+        _register_state_path(self, True)
+        profile.end_phase('register paths', phase)
+
+    def _add_lazy_substate(self, name, path):
+        '''Declares a substate whose class, given by a dotted path, is only
+           imported, and the substate created, when it is first looked up
+           with get_substate(). Until then, the path trie holds a LazySubstate
+           for it.
+
+           The substates declared in the class are not known until it is
+           imported: a path through the lazy substate, such as
+           'Settings.Sound', loads it, but a state looked up by its name
+           alone, such as 'Sound', is not found until then.
+        '''
+        if self._lazy_substates is None:
+            self._lazy_substates = {}
+
+        lazy_substate = LazySubstate(name, path, self)
+        self._lazy_substates[name] = lazy_substate
+
+        _register_state_path(lazy_substate, False)
+
+    def _load_lazy_substate(self, name):
+        '''Imports the class of a lazy substate and adds the substate.'''
+        lazy_substate = self._lazy_substates.pop(name, None) \
+                if self._lazy_substates \
+                else None
+
+        if lazy_substate is None:
+            # Already loaded, unless the name is not that of a lazy substate.
+            state = getattr(self, name, None)
+            return state if isinstance(state, BaseState) else None
+
+        if self.trace:
+            self.state_log_trace("loading lazy substate {0} from {1}".format(
+                    name, lazy_substate.path))
+
+        state = self._add_substate(name,
+                                   import_state_class(lazy_substate.path),
+                                   None)
+
+        self._substate_was_added()
+
+        return state
+
+    def _load_lazy_substates_on_path(self, value):
+        '''Loads the lazy substates of this state named by the parts of the
+           path expression value, so that the substates declared in them can
+           be matched. Returns True if any was loaded.
+        '''
+        root = self
+        depth = 0
+        while root.parent_state is not None:
+            root = root.parent_state
+            depth += 1
+
+        trie = root._substate_path_trie
+        if trie is None:
+            return False
+
+        loaded = False
+        for part in set(PATH_PART_SEPARATOR.split(value)):
+            if not part or part == 'self':
+                continue
+
+            program = compile_expression(part)[0]
+            for state, relative_depth in trie.find(program, self, depth):
+                if type(state) is LazySubstate:
+                    state.parent_state._load_lazy_substate(state.name)
+                    loaded = True
+
+        return loaded
+
+    def _pending_lazy_substates_note(self):
+        '''Returns a sentence naming the lazy substates of the state tree not
+           loaded yet, for errors about states that cannot be found, or an
+           empty string if there are none.
+        '''
+        root = self
+        while root.parent_state is not None:
+            root = root.parent_state
+
+        paths = []
+        states = [root]
+        while states:
+            state = states.pop()
+            if state._lazy_substates:
+                paths.extend(name if state.parent_state is None
+                             else '{0}.{1}'.format(state.full_path, name)
+                             for name in state._lazy_substates)
+            states.extend(state.substates)
+
+        if not paths:
+            return ''
+
+        return (" States declared in lazy substates not loaded yet, {0}, are "
+                "only known by their paths through them.").format(
+                        ', '.join(sorted(paths)))
+
+    def _register_substate(self, state):
+        '''Registers a given state as a substate of this state.'''
+        self._registered_substates.append(state)
+        self._substate_path_cache = {}
+
+    def path_relative_to(self, state):
+        '''Will generate path for a given state that is relative to this state.
+           It is required that the given state is a substate of this state.
+
+           If the heirarchy of the given state to this state is the following:
+           A > B > C, where A is this state and C is the given state, then the
+           relative path generated will be "B.C"
+        '''
+        path = self.name
+        parent = self.parent_state
+
+        # [PORT] Bindings related problem. In the original SC, _fullPath is a
+        # computed property updated when name or parent changes. Here,
+        # path_relative_to() is called when the name initially changes, at
+        # which time the parent_state has not yet been set, and then just
+        # after is another call when the parent_state changes (See the binding
+        # setup in __init__.py). So, for now, just return the path to avoid
+        # the log message below.
+        if parent is None:
+            return path
+
+        while parent and parent != state:
+            path = "{0}.{1}".format(parent.name, path)
+            parent = parent.parent_state
+
+        if parent != state and state != self:
+            msg = ("Cannot generate relative path from {0} since it is not a "
+                   "parent state of {1}").format(state, self)
+            self.state_log_error(msg)
+            raise Exception(msg)
+
+        return path
+
+    def get_substate(self, value, callback=None):
+        '''Used to get a substate of this state that matches a given value.
+
+           If the value is a state object, then the value will be returned if
+           it is indeed a substate of this state, otherwise null is returned.
+
+           If the given value is a string, then the string is assumed to be a
+           path expression to a substate. The value is then parsed to find the
+           closest match. For path expression syntax, refer to the {@link
+           StatePathMatcher} class.
+
+           If there is no match then null is returned. If there is more than
+           one match then null is returned and an error is generated indicating
+           ambiguity of the given value.
+
+           An optional callback can be provided to handle the scenario when
+           either no substate is found or there is more than one match. The
+           callback is then given the opportunity to further handle the outcome
+           and return a result which the get_substate method will then return.
+           The callback should have the following signature::
+
+               function(state, value, paths)
+
+               state: The state on which get_state() was invokedon.
+               value: The value supplied to get_state().
+               paths: An array of substate paths that matched the given value.
+
+           If there were no matches then `paths` is not provided to the
+           callback.
+
+           Parameters:
+
+           * value {State|String} - Used to identify a substate of this state.
+           * callback {Function} - Optional callback.
+        '''
+
+        if value is None:
+            return None
+
+        if not isinstance(value, basestring):
+            if value in self._registered_substates:
+                return value
+            elif isinstance(value, BaseState):
+                return None
+            else:
+                msg = ("Cannot find matching substate. value must be a State "
+                       "class or string, not type: {0}").format(type(value))
+                self.state_log_error(msg)
+                raise Exception(msg)
+
+        # [PORT] Considered this, but it seemed to match on what should
+        #        remain ambiguous.
+        #for state in self._registered_substates:
+            #if value == state.name:
+                #return state
+
+        # Path expressions are resolved once, until substates are added or
+        # destroyed.
+        resolution = self._substate_path_cache.get(value)
+        if resolution is None:
+            resolution = self._resolve_substate_path(value)
+
+            if len(self._substate_path_cache) >= SUBSTATE_PATH_CACHE_SIZE:
+                self._substate_path_cache.clear()
+            self._substate_path_cache[value] = resolution
+
+        match, path_keys = resolution
+
+        if (match is None and path_keys is None
+                and PATH_PART_SEPARATOR.search(value)
+                and self._load_lazy_substates_on_path(value)):
+            return self.get_substate(value, callback)
+
+        if match is not None:
+            if type(match) is LazySubstate:
+                return match.parent_state._load_lazy_substate(match.name)
+            return match
+
+        if path_keys is not None:
+            if callback is not None:
+                return self._notify_substate_not_found(callback=callback,
+                                                       value=value,
+                                                       keys=path_keys)
+
+            msg = ("Cannot find substate matching '{0}' in state {1}. "
+                   "Ambiguous with "
+                   "the following: {2}").format(value, self.full_path,
+                                                ', '.join(path_keys))
+            self.state_log_error(msg)
+            raise Exception(msg)
+
+        return self._notify_substate_not_found(callback=callback,
+                                               value=value)
+
+    def _resolve_substate_path(self, value):
+        '''Matches a path expression against the paths of the substates, by
+           walking the root state's path trie. Returns a (state, None) tuple
+           for a single match, a (None, paths) tuple, with the paths it is
+           ambiguous with, for several matches, and (None, None) for no
+           match.
+        '''
+        program, last_part = compile_expression(value)
+
+        root = self
+        depth = 0
+        while root.parent_state is not None:
+            root = root.parent_state
+            depth += 1
+
+        trie = root._substate_path_trie
+        if trie is None:
+            return None, None
+
+        matches = trie.find(program, self, depth)
+
+        if len(matches) == 1:
+            return matches[0][0], None
+
+        if len(matches) > 1:
+            # A substate whose relative path is the expression itself wins.
+            if all(step[0] == _BASIC for step in program):
+                for state, relative_depth in matches:
+                    if relative_depth == len(program):
+                        return state, None
+
+            return None, trie.relative_paths(last_part, self, depth)
+
+        return None, None
+
+    def _notify_substate_not_found(self, callback=None,
+                                   value=None, keys=None):
+        if callback:
+            # This, and an even more complicated system involving an optional
+            # target argument, was in the javascript version. Removed here,
+            # until it is deemed necessary for some reason.
+            #if hasattr(self, callback.__name__):
+            #    return getattr(self, callback.__name__)(self, value, keys)
+            #else:
+            return callback(self, value, keys)
+        else:
+            return None
+
+    def get_state(self, value):
+        '''Will attempt to get a state relative to this state.
+
+           A state is returned based on the following:
+
+           1. First check this state's substates for a match; and
+           2. If no matching substate then attempt to get the state from
+              this state's parent state.
+
+           Therefore states are recursively traversed up to the root state to
+           identify a match, and if found is ultimately returned, otherwise
+           null is returned. In the case that the value supplied is ambiguous
+           an error message is returned.
+
+           The value provided can either be a state object or a state path
+           expression. For path expression syntax, refer to the {@link
+           StatePathMatcher} class.
+        '''
+        # [PORT] Added the second part. See get_state tests.
+        if value == self.name or value == self:
+            return self
+
+        # [PORT] This doesn't make sense. It is like a protection for a wrong
+        #        call.
+        if isinstance(value, BaseState):
+            return value
+
+        return self.get_substate(value, self._handle_substate_not_found)
+
+    def _handle_substate_not_found(self, state, value, keys=None):
+        parent_state = self.parent_state
+
+        if parent_state is not None:
+            return parent_state.get_state(value)
+
+        if keys is not None:
+            msg = ("Cannot find state matching '{0}'. "
+                   "Ambiguous with the following: {1}.")
+            self.state_log_error(msg.format(value, ', '.join(keys)))
+
+        return None
+
+    def go_to_state(self, value, context=None):
+        '''Used to go to a state in the statechart either directly from this
+           state if it is a current state, or from the first relative current
+           state from this state.
+
+           If the value given is a string then it is considered a state path
+           expression. The path is then used to find a state relative to this
+           state based on rules of the {@link #get_state} method.
+
+           Parameters:
+
+           * value {State|String} - The state to go to.
+           * context {dict|Object} - Optional dict that will be supplied to
+                 all states that are exited and entered during the state
+                 transition process. Context can not be an instance of State.
+        '''
+        state = self.get_state(value)
+
+        if state is None:
+            msg = ("Cannot go to state {0} from state {1}. Invalid "
+                   "value.{2}").format(value, self,
+                                       self._pending_lazy_substates_note())
+            self.state_log_error(msg)
+            raise Exception(msg)
+
+        fromState = self.find_first_relative_current_state(state)
+
+        self.statechart.go_to_state(state=state,
+                                    from_current_state=fromState,
+                                    use_history=False,
+                                    context=context)
+
+    def go_to_history_state(self, value, recursive=None, context=None):
+        '''Used to go to a given state's history state in the statechart either
+           directly from this state if it is a current state or from one of
+           this state's current substates.
+
+           If the value given is a string then it is considered a state path
+           expression. The path is then used to find a state relative to this
+           state based on rules of the get_state() method.
+
+           * value {State|String} - The state whose history state to go to.
+           * recursive {Boolean} indicates whether to follow history states
+                 recusively starting from the given state
+           * context {Hash|Object} - Optional dict that will be supplied to
+                 all states that are exited entered during the state transition
+                 process. Context can not be an instance of State.
+        '''
+        state = self.get_state(value)
+
+        if state is None:
+            msg = ("Cannot go to history state {0} from state {1}. "
+                   "Invalid value.{2}").format(
+                           value, self, self._pending_lazy_substates_note())
+            self.state_log_error(msg)
+            raise Exception(msg)
+
+        fromState = self.find_first_relative_current_state(state)
+
+        self.statechart.go_to_history_state(state=state,
+                                            from_current_state=fromState,
+                                            recursive=recursive,
+                                            context=context)
+
+    def resume_go_to_state(self):
+        '''Resumes an active goto state transition process that has been
+           suspended.
+        '''
+        self.statechart.resume_go_to_state()
+
+    def state_is_current_substate(self, state=None):
+        '''Checks if a given state is a current substate of this state.
+           Mainly used in cases when this state is a concurrent state.
+
+           Returns True if the given state is a current substate, otherwise
+           False.
+        '''
+        state_obj = None
+        if isinstance(state, basestring):
+            state_obj = self.statechart.get_state(state)
+        else:
+            state_obj = state
+
+        if not state_obj:
+            return False
+
+        sc = self.statechart
+
+        if sc is None or getattr(state_obj, 'statechart', None) is not sc:
+            return True if state_obj in self.current_substates else False
+
+        return self._state_is_flagged_substate(state_obj,
+                                               sc._current_state_flags)
+
+    def state_is_entered_substate(self, state=None):
+        '''Used to check if a given state is a current substate of this state.
+           Mainly used in cases when this state is a concurrent state.
+
+           Returns True if the given state is a current substate, otherwise
+           False.
+        '''
+        state_obj = None
+        if isinstance(state, basestring):
+            state_obj = self.statechart.get_state(state)
+        else:
+            state_obj = state
+
+        if not state_obj:
+            return False
+
+        sc = self.statechart
+
+        if sc is None or getattr(state_obj, 'statechart', None) is not sc:
+            return True if state_obj in self.entered_substates else False
+
+        return self._state_is_flagged_substate(state_obj,
+                                               sc._entered_state_flags)
+
+    def _state_is_flagged_substate(self, state, flags):
+        '''Checks a state of this state's statechart against one of the
+           statechart's current or entered state flags, which say whether a
+           state is in its own current_substates or entered_substates list.
+           A state in its own list is also in the lists of all its parent
+           states.
+        '''
+        state_id = state.state_id
+
+        if state_id is None or not flags[state_id]:
+            return False
+
+        if state is self or self.parent_state is None:
+            return True
+
+        parent = state.parent_state
+        while parent is not None:
+            if parent is self:
+                return True
+            parent = parent.parent_state
+
+        return False
+
+    def is_root_state(self):
+        return True if self.statechart.root_state_instance is self else False
+
+    def is_current_state(self):
+        sc = self.statechart
+        if sc is not None and self.state_id is not None:
+            return sc._current_state_flags[self.state_id] > 0
+        return True if self.state_is_current_substate(self) else False
+
+    def is_concurrent_state(self):
+        return True if self.parent_state.substates_are_concurrent else False
+
+    def is_entered_state(self):
+        '''A state is currently entered if during a state transition process
+           the state's enter_state method was invoked, but only after its
+           exit_state method was called, if at all.
+        '''
+        sc = self.statechart
+        if sc is not None and self.state_id is not None:
+            return sc._entered_state_flags[self.state_id] > 0
+        return True if self.state_is_entered_substate(self) else False
+
+    def find_first_relative_current_state(self, anchor=None):
+        '''Will attempt to find a current state in the statechart that is
+           relative to this state.
+
+           Ordered set of rules to find a relative current state:
+
+             1. If this state is a current state then it will be returned
+
+             2. If this state has no current states and this state has a parent
+                state then return parent state's first relative current state,
+                otherwise return null
+
+             3. If this state has more than one current state then use the
+                given anchor state to get a corresponding substate that can be
+                used to find a current state relative to the substate, if a
+                substate was found.
+
+             4. If (3) did not find a relative current state then default to
+                returning this state's first current substate.
+
+           The anchor param {State|String} is optional. It is a substate of
+           this state used to help direct finding a current state.
+        '''
+        if self.is_current_state():
+            return self
+
+        if not self.current_substates:
+            return self.parent_state.find_first_relative_current_state() \
+                   if self.parent_state is not None \
+                   else None
+
+        if len(self.current_substates) > 1:
+            anchor = self.get_substate(anchor)
+            if anchor is not None:
+                return anchor.find_first_relative_current_state()
+
+        return self.current_substates[0]
+
+    def reenter(self):
+        '''Used to re-enter this state. Call this only when the state is a
+           current state of the statechart.
+        '''
+        if self.is_entered_state():
+            # [PORT] Changed this from self to self.name, after str and key
+            #        changes. Then, had to change it from self.go_to_state to
+            #        self.statechart.go_to_state -- need to pin down that
+            #        difference.
+            self.statechart.go_to_state(state=self.name)
+        else:
+            msg = ("Cannot re-enter state {0} since it is not an entered "
+                   "state in the statechart").format(self)
+            self.state_log_error(msg)
+            raise Exception(msg)
+
+    def try_to_handle_event(self, event, arg1=None, arg2=None):
+        '''Called by the statechart to allow a state to try and handle the
+           given event. If the event is handled by the state then YES is
+           returned, otherwise NO.
+
+           There is a particular order in how an event is handled by a state:
+
+           1. Basic function whose name matches the event.
+           2. Registered event handler that is associated with an event
+              represented as a string.
+           3. Registered event handler that is associated with events matching
+              a regular expression.
+           4. The unknown_event function.
+
+           Event handlers that are associated with events matching a regular
+           expression are combined into a single expression per state, and
+           the handler found for an event name is remembered, so they are
+           cheap to use once an event has been seen.
+
+           The outcome of this lookup is remembered per event name in the
+           state's event dispatch table, so only the first delivery of an
+           event to a state pays for it.
+
+           The unknown_event function is only invoked if the state has it,
+           otherwise it is skipped. Note that you should be careful when using
+           unknown_event since it can be either abused or cause unexpected
+           behavior.
+        '''
+        sc = self.statechart
+        ret = None
+
+        # Look up how this state handles the event in its dispatch table,
+        # working it out the first time the event is seen. See
+        # _resolve_event_dispatch() for the order in which handlers are tried.
+        try:
+            kind, name, handler = self._event_dispatch_table[event]
+        except KeyError:
+            kind, name, handler = self._resolve_event_dispatch(event)
+
+        if kind == NO_EVENT_HANDLER:
+            # Nothing was able to handle the given event for this state
+            return False
+
+        if kind == EVENT_HANDLER_NAME:
+            msg = ("state {0} can not handle event '{1}' since it is a "
+                   "registered event handler").format(self, event)
+            self.state_log_warning(msg)
+            raise Exception(msg)
+
+        if kind == BASIC_EVENT_METHOD:
+            if self.trace:
+                self.state_log_trace("will handle event '{0}'".format(event))
+
+            sc.state_will_try_to_handle_event(self, event, name)
+            ret = handler(arg1, arg2) != False
+            sc.state_did_try_to_handle_event(self, event, name, ret)
+            return ret
+
+        if self.trace:
+            msg = "{0} will handle event '{1}'".format(name, event)
+            self.state_log_trace(msg)
+
+        sc.state_will_try_to_handle_event(self, event, name)
+        ret = handler(event, arg1, arg2) != False
+        sc.state_did_try_to_handle_event(self, event, name, ret)
+        return ret
+
+    def _resolve_event_dispatch(self, event):
+        '''Works out how this state handles the given event and records the
+           result in the state's event dispatch table, so that the next time
+           the event is sent to this state it costs a single dict lookup.
+
+           Returns a (kind, handler name, handler) tuple.
+        '''
+        # Events resolved before by _resolve_unregistered_event() are in its
+        # memo, which is checked before probing the state's attributes again.
+        memo = self._event_memo
+        entry = memo.pop(event, None)
+
+        if entry is not None:
+            # Re-inserting keeps the most recently used events at the end.
+            memo[event] = entry
+            return entry
+
+        # First check if the name of the event is the same as a registered
+        # event handler. If so, then do not handle the event.
+        #
+        # [PORT] So, this means that if you have a method called
+        #        event_handler1, you need to call the associated event
+        #        event1, not event_handler1. This is confusing. Methods in a
+        #        state class are by definition event handlers, registerd by
+        #        the method names. These are handled below. Special 'event
+        #        handlers', capable of handling more than one event are the
+        #        ones marked with the State.event_handler([]) decorator. And
+        #        then there are plain event handlers, treated by this
+        #        conditional. What are they? There probably be better
+        #        terminology to differentiate, e.g., registeredMethods vs.
+        #        event_handlers vs. multipleEventHanders, perhaps.
+        #
+        if event in self._registered_event_handlers:
+            entry = (EVENT_HANDLER_NAME, event, None)
+
+        # Now begin by trying a basic method on the state to respond to the
+        # event
+        elif hasattr(self, event) and inspect.ismethod(getattr(self, event)):
+            entry = (BASIC_EVENT_METHOD, event, getattr(self, event))
+
+        # Try an event handler that is associated with an event represented
+        # as a string
+        elif event in self._registered_string_event_handlers:
+            handler = self._registered_string_event_handlers[event]
+            entry = (EVENT_HANDLER, handler['name'], handler['handler'])
+
+        else:
+            return self._resolve_unregistered_event(event)
+
+        self._event_dispatch_table[event] = entry
+
+        return entry
+
+    def _resolve_unregistered_event(self, event):
+        '''Resolves an event that is neither a method nor a registered string
+           event handler of this state. Event names that get this far are open
+           ended, so the results are kept in a bounded, least recently used
+           memo rather than in the event dispatch table.
+        '''
+        memo = self._event_memo
+
+        # Try an event handler that is associated with events matching a
+        # regular expression
+        handler = self._match_reg_exp_event_handler(event)
+        if handler is not None:
+            entry = (EVENT_HANDLER, handler['name'], handler['handler'])
+
+        # Final attempt. If the state has an unknown_event function then
+        # invoke it to handle the event
+        elif (hasattr(self, 'unknown_event') and
+                inspect.ismethod(getattr(self, 'unknown_event'))):
+            entry = (EVENT_HANDLER, 'unknown_event', self.unknown_event)
+
+        else:
+            entry = (NO_EVENT_HANDLER, None, None)
+
+        if len(memo) >= EVENT_MEMO_SIZE:
+            memo.popitem(last=False)
+
+        # Most recently used events are kept at the end.
+        memo[event] = entry
+
+        return entry
+
+    def _match_reg_exp_event_handler(self, event):
+        '''Returns the first registered regular expression event handler
+           whose expression matches the given event, or None.
+        '''
+        matcher = self._reg_exp_event_matcher
+
+        if matcher is not None:
+            match = matcher.match(event)
+            if match is None:
+                return None
+            # Each handler's expression is wrapped in a group that encloses
+            # any groups of its own, so it is the last group to close.
+            return self._reg_exp_event_handler_groups[match.lastindex]
+
+        for handler in self._registered_reg_exp_event_handlers:
+            if handler['regexp'].match(event):
+                return handler
+
+        return None
+
+    def _compile_reg_exp_event_handlers(self):
+        '''Fuses this state's regular expression event handlers into a single
+           alternation of named groups, so that one match call finds the first
+           handler, in registration order, whose expression matches an event.
+
+           Expressions that can not be safely combined, because their flags
+           differ or they use numbered backreferences, are left to be tried
+           one after another.
+        '''
+        self._reg_exp_event_matcher = None
+        self._reg_exp_event_handler_groups = {}
+
+        handlers = self._registered_reg_exp_event_handlers
+
+        if len(handlers) < 2:
+            return
+
+        flags = handlers[0]['regexp'].flags
+        parts = []
+
+        for i, handler in enumerate(handlers):
+            regexp = handler['regexp']
+            if (regexp.flags != flags
+                    or NUMBERED_BACKREFERENCE.search(regexp.pattern)):
+                return
+            parts.append("(?P<_event_handler_{0}>{1})".format(i,
+                                                              regexp.pattern))
+
+        try:
+            matcher = re.compile('|'.join(parts), flags)
+        except Exception:
+            # Duplicate group names across expressions, or more groups than
+            # the re module supports.
+            return
+
+        for i, handler in enumerate(handlers):
+            group = matcher.groupindex["_event_handler_{0}".format(i)]
+            self._reg_exp_event_handler_groups[group] = handler
+
+        self._reg_exp_event_matcher = matcher
+
+    def enter_state(self, context=None):
+        '''Called whenever this state is to be entered during a state
+           transition process. This is useful when you want the state to
+           perform some initial set up procedures.
+
+           If when entering the state you want to perform some kind of
+           asynchronous action, such as an animation or fetching remote data,
+           then you need to return an asynchronous action, which is done like
+           so:
+
+                def enter_state():
+                     return self.perform_async('foo')
+
+           After returning an action to be performed asynchronously, the
+           statechart will suspend the active state transition process. In
+           order to resume the process, you must call this state's
+           resume_go_to_state method or the statechart's resume_go_to_state. If
+           no asynchronous action is to be performed, then nothing needs to be
+           returned.
+
+           When the enter_state method is called, an optional context value may
+           be supplied if one was provided to the go_to_state method.
+
+           The context param {dict} is used if one was supplied to go_to_state
+           when invoked.
+        '''
+        pass
+
+    def state_will_become_entered(self, context=None):
+        '''Notification called just before enter_state is invoked.
+
+           .. Note:: This is intended to be used by the owning statechart but
+                     it can be overridden if you need to do something special.
+
+          The context param {dict} is used if one was supplied to go_to_state
+          when invoked.
+        '''
+        self._is_entering_state = True
+
+    def state_did_become_entered(self, context=None):
+        '''Notification called just after enter_state is invoked.
+
+           .. Note:: This is intended to be used by the owning statechart but
+                     it can be overridden if you need to do something special.
+
+           The context param {dict} is used if one was supplied to go_to_state
+           when invoked.
+        '''
+        self._is_entering_state = False
+
+    def exit_state(self, context=None):
+        '''Called whenever this state is to be exited during a state transition
+           process. This is useful when you want the state to peform some clean
+           up procedures.
+
+           If when exiting the state you want to perform some kind of
+           asynchronous action, such as an animation or fetching remote data,
+           then you need to return an asynchronous action, which is done like
+           so:
+
+               def exit_state():
+                   return self.perform_async('foo')
+
+           After returning an action to be performed asynchronously, the
+           statechart will suspend the active state transition process. In
+           order to resume the process, you must call this state's
+           resume_go_to_state method or the statechart's resume_go_to_state. If
+           no asynchronous action is to be performed, then nothing needs to be
+           returned.
+
+           When the exit_state method is called, an optional context value may
+           be supplied if one was provided to the go_to_state method.
+
+           The context param {dict} is used if one was supplied to go_to_state
+           when invoked.
+        '''
+        pass
+
+    def state_will_become_exited(self, context=None):
+        '''Notification called just before exit_state is invoked.
+
+           .. Note:: This is intended to be used by the owning statechart but it
+                     can be overridden if you need to do something special.
+
+           The context param {dict} is used if one was supplied to go_to_state
+           when invoked.
+        '''
+        self._is_exiting_state = True
+
+    def state_did_become_exited(self, context=None):
+        '''Notification called just after exit_state is invoked.
+
+           .. Note:: This is intended to be used by the owning statechart but
+                     it can be overridden if you need to do something special.
+
+           The context param {dict} is used if one was supplied to go_to_state
+           when invoked.
+        '''
+        self._is_exiting_state = False
+
+    def perform_async(self, func, arg1=None, arg2=None):
+        '''Call when an asynchronous action need to be performed when either
+           entering or exiting a state.
+        '''
+        return AsyncMixin().perform(func, arg1=arg1, arg2=arg2)
+
+    def responds_to_event(self, event):
+        '''Override as needed.
+
+           Returns True if this state can respond to the given event, otherwise
+           False is returned.
+
+           The event {String} parm is the value to check.
+        '''
+        kind = self._event_dispatch_kind(event)
+
+        return kind == BASIC_EVENT_METHOD or kind == EVENT_HANDLER
+
+    def _event_dispatch_kind(self, event):
+        '''Returns the kind of this state's dispatch table entry for the
+           given event.
+        '''
+        try:
+            return self._event_dispatch_table[event][0]
+        except KeyError:
+            return self._resolve_event_dispatch(event)[0]
+
+    def _compute_full_path(self):
+        '''Returns the path for this state relative to the statechart's
+           root state.
+
+           The path is a dot-notation string representing the path from this
+           state to the statechart's root state, but without including the root
+           state in the path. For instance, if the name of this state if "foo"
+           and the parent state's name is "bar" where bar's parent state is the
+           root state, then the full path is "Bar.foo"
+        '''
+        root = self.statechart.root_state_instance \
+                if self.statechart \
+                else None
+        if root is None:
+            return self.name
+        else:
+            return self.path_relative_to(root)
+
+    def __str__(self):
+        return self.full_path
+
+    def _entered_substates_did_change(self, *l):  #pragma: no cover
+        #self.notifyPropertyChange("entered_substates")
+        pass
+
+    def _current_substates_did_change(self, *l):  #pragma: no cover
+        #self.notifyPropertyChange("current_substates")
+        pass
+
+    def _statechart_owner_did_change(self, *l):  #pragma: no cover
+        #self.notifyPropertyChange("owner")
+        pass
+
+    def _unbind_observers(self):
+        pass
+
+    def _dispatch_property_change(self, name):
+        '''Notifies the observers of the attribute name, after the statechart
+           changed it in place. Only states with observable attributes, such
+           as State, have any.
+        '''
+        pass
+
+    def state_log_trace(self, msg):
+        '''Used to log a state trace message.'''
+        if self.statechart:
+            self.statechart.statechart_log_trace("{0}: {1}".format(self, msg))
+
+    def state_log_warning(self, msg):
+        '''Used to log a state warning message.'''
+        if self.statechart:
+            self.statechart.statechart_log_warning(msg)
+
+    def state_log_error(self, msg):
+        '''Used to log a state error message.'''
+        if self.statechart:
+            self.statechart.statechart_log_error(msg)
+
+    def send_event_after(self, delay, event, arg1=None, arg2=None):
+        '''Sends the event to the statechart after delay seconds, unless this
+           state is exited first. Returns the timer, which can be cancelled
+           with its cancel() method.
+        '''
+        sc = self.statechart
+        return sc.schedule_timer(delay, sc.send_event, (event, arg1, arg2),
+                                 self)
+
+    def go_to_state_after(self, delay, value, context=None):
+        '''Goes to the given state after delay seconds in this state, e.g.
+           from enter_state():
+
+               def enter_state(self, context=None):
+                   self.go_to_state_after(5, 'GameOver')
+
+           The timer is cancelled if this state is exited first. Returns the
+           timer.
+        '''
+        return self.statechart.schedule_timer(delay, self.go_to_state,
+                                              (value, context), self)
+
+    @classmethod
+    def event_handler(self, events):
+        def event_handler_decorator(fn):
+            fn.is_event_handler = True
+            fn.events = events
+            return fn
+        return event_handler_decorator
+
+    @staticmethod
+    def transition_to(state):
+        '''Returns an event handling method that only goes to the given
+           state, e.g.:
+
+               class Slow(State):
+                   speed_up = State.transition_to('Fast')
+
+           It can also be given to State.event_handler(). Since such a
+           handler has no guard, a StatechartDefinition can work out where
+           it leads once per configuration, see broadcast_event().
+        '''
+        def go_to_state(self, *args):
+            self.go_to_state(state)
+        go_to_state.transition_target = state
+        return go_to_state
+
+def _is_state_member(key, value):
+    '''Tells if an attribute is something init_state() acts on: an event
+       handler method, a substate class or a lazy substate.
+    '''
+    if inspect.ismethod(value):
+        return (hasattr(value, 'is_event_handler')
+                and value.is_event_handler == True)
+
+    if isinstance(value, basestring):
+        return is_lazy_substate(key, value)
+
+    return inspect.isclass(value) and issubclass(value, BaseState)
+
+def is_lazy_substate(key, value):
+    '''Tells if a class attribute declares a lazy substate: a dotted path to
+       a state class with the attribute's name, as in:
+
+           class Game(State):
+               Settings = 'screens.settings.Settings'
+
+       The class is imported and the substate created when the substate is
+       first looked up, by get_state() or go_to_state(), unless it is entered
+       along with its parent state, as the initial substate, the default
+       state of the initial history state, or a concurrent substate.
+    '''
+    return (value.rsplit('.', 1)[-1] == key
+            and LAZY_SUBSTATE_PATH.match(value) is not None)
+
+def import_state_class(path):
+    '''Imports the state class at a dotted path, e.g.
+       'screens.settings.Settings'.
+    '''
+    module_name, name = path.rsplit('.', 1)
+    state_class = getattr(importlib.import_module(module_name), name, None)
+
+    if not (inspect.isclass(state_class)
+            and issubclass(state_class, BaseState)):
+        raise Exception("Cannot load state {0}. Not a state class".format(path))
+
+    return state_class
+
+class LazySubstate(object):
+    '''Stands in for a lazy substate in the path trie of the root state, so
+       that its path can be resolved before its class is imported.
+    '''
+
+    __slots__ = ('name', 'path', 'parent_state')
+
+    def __init__(self, name, path, parent_state):
+        self.name = name
+        self.path = path
+        self.parent_state = parent_state
+
+def _register_state_path(state, register):
+    '''Indexes the path of state in its root state's path trie, clearing the
+       path caches of its parent states. If register is True, the state is
+       also registered with each of them.
+    '''
+    parent = state.parent_state
+    segments = [state.name]
+
+    while parent is not None:
+        if register:
+            parent._register_substate(state)
+        else:
+            parent._substate_path_cache = {}
+
+        if parent.parent_state is None:
+            if parent._substate_path_trie is None:
+                parent._substate_path_trie = StatePathTrie()
+            parent._substate_path_trie.add(state, segments)
+        else:
+            segments.append(parent.name)
+
+        parent = parent.parent_state
+
+def _unregister_state_path(state):
+    '''Removes the path of state from its root state's path trie, clearing
+       the path caches of its parent states.
+    '''
+    parent = state.parent_state
+    segments = [state.name]
+
+    while parent is not None:
+        parent._substate_path_cache = {}
+
+        if parent.parent_state is None:
+            if parent._substate_path_trie is not None:
+                parent._substate_path_trie.remove(state, segments)
+        else:
+            segments.append(parent.name)
+
+        parent = parent.parent_state
+
+def class_members(obj, cache, accept):
+    '''Returns (key, value) pairs for the attributes of obj that accept(key,
+       value) is true for, in the same order as iterating dir(obj).
+
+       Looking through dir() is done once per class, and the keys found are
+       kept in cache, which maps classes to keys. For each instance, only the
+       attributes found, its properties of the types registered with
+       register_property_type() and its own instance attributes are looked
+       at.
+    '''
+    cls = type(obj)
+    members = cache.get(cls)
+
+    if members is None:
+        keys = []
+        property_keys = []
+
+        for key in dir(cls):
+            if key == '__class__':
+                continue
+
+            try:
+                value = getattr(cls, key)
+            except AttributeError:
+                continue
+
+            if isinstance(value, _PROPERTY_TYPES):
+                property_keys.append(key)
+            elif accept(key, value):
+                keys.append(key)
+
+        members = cache[cls] = (keys, property_keys)
+
+    keys, property_keys = members
+    own_keys = getattr(obj, '__dict__', None)
+
+    if own_keys or property_keys:
+        keys = sorted(set(keys).union(property_keys, own_keys or ()))
+
+    pairs = []
+
+    for key in keys:
+        value = getattr(obj, key)
+        if accept(key, value):
+            pairs.append((key, value))
+
+    return pairs
+
+def register_property_type(property_type):
+    '''Has class_members() look up the attributes of a class that are
+       descriptors of property_type on each instance, as their values are
+       kept per instance. The Kivy adapter registers Kivy's Property.
+    '''
+    global _PROPERTY_TYPES
+
+    if property_type not in _PROPERTY_TYPES:
+        _PROPERTY_TYPES += (property_type,)
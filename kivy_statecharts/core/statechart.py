@@ -0,0 +1,2732 @@
+# ================================================================================
+# Project: kivy-statecharts - A Statechart Framework for Kivy
+# Copyright: (c) 2010, 2011 Michael Cohen, and contributors.
+# Python Port: Jeff Pittman, ported from SproutCore, SC.Statechart
+# ================================================================================
+
+from kivy_statecharts.core.futures import Async
+from kivy_statecharts.core.futures import StatechartFuture
+from kivy_statecharts.core.futures import as_future
+from kivy_statecharts.core.futures import future_exception
+from kivy_statecharts.core.state import BaseState
+from kivy_statecharts.core.state import EVENT_MEMO_SIZE
+from kivy_statecharts.core.state import NO_EVENT_HANDLER
+from kivy_statecharts.core.state import class_members
+from kivy_statecharts.core.state import is_lazy_substate
+from kivy_statecharts.core.history_state import BaseHistoryState
+from kivy_statecharts.core.lean_state import LeanState
+from kivy_statecharts.debug.flight_recorder import FlightRecorder
+from kivy_statecharts.debug.flight_recorder import ENTERED, EXITED
+from kivy_statecharts.debug.flight_recorder import HANDLED, UNHANDLED, DROPPED
+from kivy_statecharts.debug.startup_profile import ProfilePhase
+from kivy_statecharts.debug.startup_profile import StartupProfile
+from kivy_statecharts.private.event_cache import EventCache
+from kivy_statecharts.private.event_queue import EventQueue
+from kivy_statecharts.private.timer_queue import TimerQueue
+
+from collections import deque, OrderedDict
+from timeit import default_timer
+
+import inspect, logging, time, weakref
+
+# The logger of statecharts not running in Kivy.
+Logger = logging.getLogger('kivy_statecharts')
+Logger.addHandler(logging.NullHandler())
+
+'''
+  Authorship Details
+  ------------------
+
+  Michael Cohen wrote the javascript version in 2010-2011 as Ki:
+
+      https://github.com/FrozenCanuck/Ki/
+
+  which became SC.Statechart in 2011:
+
+      https://github.com/sproutcore/sproutcore/tree/master/frameworks/statechart
+
+  Jeff Pittman wrote the Python port in 2012, porting directly from
+  SC.Statechart, and prepared for incorporation into the Kivy project.
+
+  kivy-statecharts became part of the Kivy project in [TODO].
+
+  Introduction
+  ------------
+
+  This implementation of a statechart manager closely follows the concepts
+  stated in D. Harel's original paper "Statecharts: A Visual Formalism For
+  Complex Systems" (www.wisdom.weizmann.ac.il/~harel/papers/Statecharts.pdf).
+
+  The statechart allows for complex state heircharies by nesting states within
+  states, and allows for state orthogonality (independence) based on the use of
+  concurrent states or not.
+
+  A statechart must have one state: the root state. All other states in the
+  statechart are decendants (substates) of the root state.
+
+  An initial_state_key or states_are_concurrent must be set for each state.
+
+  If the root state of the statechart is declared separately, in a module or
+  package, provide it to the statechart as ``root_state_example_class``, and it
+  will be used to instantiate the root state.
+
+  A statechart may mix states containing concurrent substates that are fired to
+  synchronously with states that contain orthogonal substates that are
+  traversed independently.
+
+  Nesting of States
+  -----------------
+
+  You will read in Python circles that nesting classes is bad design, e.g. in
+  this dicussion:
+
+      http://code.activestate.com/lists/python-list/144727/
+
+  However, the mantra "Flat is better than nested" from the "Zen of Python"
+  PEP:
+
+      http://www.python.org/dev/peps/pep-0020/
+
+  does not apply here, because we are looking to build a statechart structure
+  that is inherently hierarchical.  Nesting is done to build the state
+  hierarchy in an efficient manner, and because it is a natural fit for the
+  problem.
+
+  You may be interested to study the nature of scoping within nested Python
+  classes. It works well to think of each state as an independent class, as if
+  it were defined in isolation.
+
+  Declaration of state classes is flexible, with these coding style choices
+  available:
+
+  * in a single code block "inline" in a main application file
+      - If the statechart has deeply nested substates, the indentation required
+        will likely extend beyond the pep8 80 char line length, so consider the
+        other options in these cases.
+  * in a single module .py file
+      - Assuming the module is called states.py, use an import of the form::
+
+            import states
+
+        Then, in code, declare states in a statechart like::
+
+            MyState = states.MyState
+
+        or use, from states import MyState, and set as MyState = MyState.
+  * in a package as separate files for individual state classes
+      - Assuming the package is called states (it is a package directory with
+        an empty __init__.py), use an import of the form:
+
+            from states.my_state import MyState
+
+        Then, in code, declare states as::
+
+            MyState = MyState
+
+  * as lazy states, loaded as the Factory code does
+      - Declare states with the dotted path of their class, named as the
+        state::
+
+            MyState = 'states.my_state.MyState'
+
+        The module is only imported, and the state created, when the state
+        is first looked up with get_state() or gone to, so that the states
+        of screens never visited cost nothing. Initial and concurrent
+        substates are loaded along with their parent state.
+
+'''
+
+class ObservedAttribute(object):
+    '''An attribute of BaseStatechartManager that calls the statechart's
+       method named observer, with the statechart and the new value, when it
+       is set to a different value, as binding to the Kivy property of
+       StatechartManager that replaces it does.
+    '''
+
+    __slots__ = ('name', 'default', 'observer')
+
+    def __init__(self, name, default, observer):
+        self.name = name
+        self.default = default
+        self.observer = observer
+
+    def __get__(self, obj, cls):
+        if obj is None:
+            return self
+        return obj.__dict__.get(self.name, self.default)
+
+    def __set__(self, obj, value):
+        old_value = obj.__dict__.get(self.name, self.default)
+        obj.__dict__[self.name] = value
+
+        if value != old_value:
+            getattr(obj, self.observer)(obj, value)
+
+def _merge_posted_events(queued, posted):
+    '''Coalesces a posted (event, arg1, arg2, time) item into the one queued,
+       keeping the time of the first post, from which latency is measured.
+    '''
+    return posted[:3] + queued[3:]
+
+class BaseStatechartManager(object):
+    '''The statechart machinery, without Kivy: attributes are plain, and
+       neither posted events nor timers are run by a clock. Headless
+       statecharts, in batch simulations and test workers, can use it
+       directly, with LeanState states, and call drain_posted_events() and
+       run_timers() from their own loop. StatechartManager is the Kivy
+       adapter, with properties and Clock integration.
+    '''
+
+    current_states = None
+    go_to_state_locked = ObservedAttribute(
+            'go_to_state_locked', False, '_go_to_state_active')
+    go_to_state_active = True
+    go_to_state_suspended_point = ObservedAttribute(
+            'go_to_state_suspended_point', None, '_go_to_state_suspended')
+    go_to_state_suspended = ObservedAttribute(
+            'go_to_state_suspended', False, '_go_to_state_suspended')
+    statechart_log_prefix = None
+    is_responder_context = True
+    '''Walk like a duck.'''
+
+    is_statechart = True
+    '''Walk like a duck.'''
+
+    statechart_is_initialized = False
+    '''This property is set by initialize_statechart(), and is checked before
+       state transitions are attempted.
+    '''
+
+    name = None
+    '''Optional name you can provide the statechart. If set this will be included
+       in tracing and error output as well as detail output. Useful for
+       debugging/diagnostic purposes.
+    '''
+
+    root_state_class = None
+    '''The root state of this statechart. All statecharts must have a root
+       state.
+
+       If this property is left unassigned, then when the statechart is
+       initialized it will use the root_state_example_class, initial_state_key,
+       and states_are_concurrent properties to construct a root state.
+
+       See root_state_example_class
+       See initial_state_key
+       See states_are_concurrent
+    '''
+
+    root_state_instance = None
+    '''The root_state_instance is set from the root_state_class normally.
+
+       See root_state_class.
+    '''
+
+    root_state_example_class = None
+    '''Represents the state used to construct a class that will be the root
+       state for this statechart. The class must derive from BaseState.
+
+       This property will only be used if the root_state_class property is not
+       assigned.
+    '''
+
+    initial_state_key = None
+    '''Indicates what state should be the initial state of this statechart. The
+       value assigned must be the name of a property on this object that
+       represents a state.  As well, the states_are_concurrent must be unset,
+       or set to False.
+
+       This property will only be used if the root_state_class property is not
+       assigned.
+
+       [PORT] This is a String in the original javascript, despite a
+              conditional in init_statechart that sets it to the actual state
+              in root_state, and despite a test that compares it to actual
+              class objects.  Here it is kept a String, and the conditional
+              commented out, and the tests changed to check against strings,
+              when either statechart.initial_state_key or
+              state.initial_substate_key are used.
+    '''
+
+    states_are_concurrent = False
+    '''Indicates if properties on this object representing states are
+       concurrent to each other.  If True then they are concurrent, otherwise
+       they are not. If True, then the initial_state_key property must not be
+       assigned.
+
+       This property will only be used if the root_state_class property is not
+       assigned.
+    '''
+
+    monitor_is_active = ObservedAttribute(
+            'monitor_is_active', False, '_monitor_is_active_did_change')
+    '''Indicates whether to use a monitor for the statechart's activities. If
+       true then the monitor will be active, otherwise the monitor will not be
+       used. Useful for debugging purposes.
+    '''
+
+    monitor = None
+    '''A statechart monitor that can be used to monitor this statechart. Useful
+       for debugging purposes.  A monitor will only be used if
+       monitor_is_active is true.
+    '''
+
+    monitor_capacity = ObservedAttribute(
+            'monitor_capacity', None, '_monitor_settings_did_change')
+    '''The number of records the monitor keeps, the latest states entered
+       and exited, in a ring buffer. None keeps them all.
+    '''
+
+    monitor_sink = ObservedAttribute(
+            'monitor_sink', None, '_monitor_settings_did_change')
+    '''An object the monitor sends every record to, with its
+       append(action, state) method, such as a MonitorFileSink, which
+       streams them to a file in batches. The statechart does not close it.
+    '''
+
+    transition_plan_cache_is_active = False
+    '''Indicates whether go_to_state should cache the exit and enter actions
+       it computes for a transition, and replay them when the same transition
+       is requested again from the same configuration of current states.
+
+       Plans are keyed by the current states, the current state the
+       transition starts from, the state to go to and use_history. Plans that
+       consulted history states are only replayed if those history states are
+       unchanged. The cache is cleared whenever the state tree changes, by
+       add_substate or destroy. See transition_plan_cache_hits and
+       transition_plan_cache_misses.
+    '''
+
+    transition_plan_cache_size = 256
+    '''The maximum number of transition plans kept when
+       transition_plan_cache_is_active is True. The least recently used plan
+       is dropped when the limit is reached.
+    '''
+
+    defer_state_property_changes = False
+    '''Indicates whether changes to the current_substates and
+       entered_substates lists of states, made while the statechart goes to a
+       state, are published to observers of those properties once, when the
+       state transition process completes or is suspended, instead of on
+       every change.
+
+       The lists themselves are always up to date; only the notifications
+       are deferred and coalesced, so observers see the end state of each
+       list.
+    '''
+
+    event_priorities = ObservedAttribute(
+            'event_priorities', None, '_event_queues_did_change')
+    '''Priorities of events, by event name. Queued events with a higher
+       priority are sent before those with a lower one, and events with the
+       same priority are sent in the order they were queued. Events not
+       listed have priority 0.
+    '''
+
+    internal_event_queue_capacity = ObservedAttribute(
+            'internal_event_queue_capacity', None, '_event_queues_did_change')
+    '''The maximum number of events queued by send_event() while the
+       statechart is busy handling an event or going to a state. When the
+       queue is full, event_queue_overflow decides which event is dropped.
+       None means no limit.
+    '''
+
+    external_event_queue_capacity = ObservedAttribute(
+            'external_event_queue_capacity', None, '_event_queues_did_change')
+    '''The maximum number of events queued by post_event() until the next
+       frame. When the queue is full, event_queue_overflow decides which
+       event is dropped. None means no limit.
+    '''
+
+    event_queue_overflow = ObservedAttribute(
+            'event_queue_overflow', 'drop_oldest', '_event_queues_did_change')
+    '''What to do when an event is queued on a full event queue:
+       'drop_oldest' drops the oldest queued event of the lowest priority,
+       unless it has a higher priority than the new event, 'drop_newest'
+       drops the new event, and 'coalesce' replaces the latest queued event
+       with the same name by the new one, or else drops the oldest. See
+       event_queue_stats().
+
+       State transitions requested while the statechart is busy are never
+       dropped, as that would leave the states inconsistent.
+    '''
+
+    coalesce_posted_events = False
+    '''Indicates whether an event posted with post_event() replaces an event
+       with the same name that was posted earlier and has not been sent yet,
+       so that only the latest arguments of each event are sent once per
+       frame. The replaced event keeps its place in the queue.
+    '''
+
+    coalesced_events = None
+    '''Posted events to coalesce, as coalesce_posted_events does for all
+       events, by event name. The value for an event is None, to coalesce by
+       name, or a function called with arg1 and arg2 of the event, returning
+       a hashable key, to coalesce only events with the same key. For
+       instance, {'touch_move': lambda touch, arg2: touch.uid} keeps the
+       latest move of each touch.
+
+       The number of events merged away is in the 'coalesced' entry of
+       event_queue_stats()['external'].
+    '''
+
+    trace = False
+    '''Indicates whether to trace the statecharts activities. If true then the
+       statechart will output its activites to the logger. Useful for debugging
+       purposes.
+    '''
+
+    statechart_owner_key = ObservedAttribute(
+            'statechart_owner_key', 'owner', '_owner_did_change')
+    '''Used to specify what property (key) on the statechart should be used as
+       the owner property. By default the property is 'owner'.
+    '''
+
+    owner = ObservedAttribute('owner', None, '_owner_did_change')
+    '''Sets who the owner is of this statechart. If None then the owner is this
+       object otherwise the owner is the assigned object.
+    '''
+
+    auto_init_statechart = True
+    '''Indicates if the statechart should be automatically initialized by this
+       object after it has been created. If True then init_statechart will be
+       called automatically, otherwise it will not.
+    '''
+
+    suppress_statechart_warnings = False
+    '''If yes, any warning messages produced by the statechart or any of its
+       states will not be logged, otherwise all warning messages will be
+       logged.
+
+       While designing and debugging your statechart, it's best to keep this
+       value false.  In production you can then suppress the warning messages.
+    '''
+
+    startup_profiler_is_active = False
+    '''Indicates whether init_statechart() should profile the start up of
+       the statechart: the wall time and allocations of each of its phases
+       and of the initialization of each state subtree. The profile is kept
+       as startup_profile, and logged if trace is True. Useful for tuning
+       the launch time of apps with big statecharts.
+    '''
+
+    startup_profile = None
+    '''The StartupProfile of init_statechart(), when
+       startup_profiler_is_active is True. Its report() method returns it as
+       sorted text, and as_dict() as a dict.
+    '''
+
+    # The StartupProfile being recorded, while init_statechart() runs.
+    _active_startup_profile = None
+
+    flight_recorder_capacity = ObservedAttribute(
+            'flight_recorder_capacity', 256,
+            '_flight_recorder_capacity_did_change')
+    '''The number of records kept by the flight recorder, the latest states
+       entered and exited, events handled, events no state handled and
+       events dropped by the event queues. None or 0 turns the recorder off.
+       See flight_recorder.
+    '''
+
+    flight_recorder = None
+    '''The FlightRecorder of the statechart, or None if
+       flight_recorder_capacity is None or 0. dump_flight_recorder() returns
+       its records as text, and it is dumped by
+       flight_recorder_did_catch_exception() when an exception escapes a
+       state. It is a plain attribute, not a Kivy property, so that
+       recording costs no more than an attribute lookup.
+    '''
+
+    # The exception last dumped by the flight recorder, so that an exception
+    # is only dumped once as it propagates.
+    _flight_recorder_exception = None
+
+    # A dictionary for holding statechart info, for debugging.
+    _state_handle_event_info = None
+
+    def __init__(self, **kw):
+        self._init_statechart_attributes(kw)
+
+        if self.auto_init_statechart == True:
+            self.init_statechart()
+
+    def _init_statechart_attributes(self, kw):
+        '''Sets up a new statechart's bookkeeping, then applies the keyword
+           arguments it was created with.
+        '''
+        self.current_states = []
+        self.coalesced_events = {}
+        self._state_handle_event_info = {}
+
+        # Events posted from any thread with post_event(), queued in the
+        # external event queue, which takes a lock.
+        self._posted_events = EventQueue(thread_safe=True)
+        self._posted_events.merge_items = _merge_posted_events
+        self._pending_sent_events = EventQueue()
+        self._pending_sent_events.merge_items = self._pending_event_was_replaced
+        self._pending_sent_events.dropped_event = self._event_was_dropped
+        self._posted_events.dropped_event = self._event_was_dropped
+        self._posted_events_are_scheduled = False
+        self.posted_events_handled = 0
+        self.posted_event_latency_max = 0
+        self._posted_event_latency_total = 0
+
+        # Timers from send_event_after() and the timeouts of states, run by
+        # run_timers() in the order of their deadlines.
+        self._timers = TimerQueue()
+        self._timers.cancelled_timer = self._timer_was_cancelled
+        self._state_timers = {}
+
+        self.event_priorities = {}
+        self._event_queues_did_change()
+        self._flight_recorder_capacity_did_change()
+
+        for k,v in kw.items():
+            setattr(self, k, v)
+
+    def _event_queues_did_change(self, *l):
+        for queue, capacity in (
+                (self._pending_sent_events, self.internal_event_queue_capacity),
+                (self._posted_events, self.external_event_queue_capacity)):
+            queue.capacity = capacity
+            queue.overflow = self.event_queue_overflow
+            queue.priorities = self.event_priorities
+
+    def _flight_recorder_capacity_did_change(self, *l):
+        capacity = self.flight_recorder_capacity
+        old_recorder = self.flight_recorder
+
+        if not capacity:
+            self.flight_recorder = None
+        else:
+            self.flight_recorder = FlightRecorder(int(capacity))
+            if old_recorder is not None:
+                for record in old_recorder.records():
+                    self.flight_recorder.append(record)
+
+    def _event_was_dropped(self, event, item):
+        recorder = self.flight_recorder
+        if recorder is not None:
+            recorder.append((default_timer(), DROPPED, None, event, 0))
+
+        self._pending_event_was_lost(item)
+
+    def _pending_event_was_replaced(self, queued, pushed):
+        '''Coalesces a pending event into the one queued, which is then never
+           handled.
+        '''
+        self._pending_event_was_lost(queued)
+        return pushed
+
+    def _pending_event_was_lost(self, pending):
+        '''Fails the future of a pending event sent with send_event_future()
+           that a full internal event queue dropped or replaced.
+        '''
+        future = pending.get('future') if type(pending) is dict else None
+
+        if future is not None:
+            future.set_exception(Exception(
+                    "Cannot handle event {0}. It was dropped by a full event "
+                    "queue".format(pending['event'])))
+
+    def _owner_did_change(self, *l):
+        if self.root_state_instance: # [PORT] root_state_class can be None
+            self.root_state_instance.statechart_owner_did_change()
+
+    def init_statechart(self):
+        '''Initializes the statechart. By initializing the statechart, it will
+           create all the states and register them with the statechart. Once
+           complete, the statechart can be used to go to states and can receive
+           events.
+        '''
+        if self.statechart_is_initialized:
+            return
+
+        if not self.startup_profiler_is_active:
+            self._init_statechart()
+            return
+
+        profile = self.startup_profile = StartupProfile()
+        self._active_startup_profile = profile
+        profile.start()
+
+        try:
+            self._init_statechart()
+        finally:
+            self._active_startup_profile = None
+            profile.stop()
+
+        if self.trace:
+            self.statechart_log_trace(profile.report())
+
+    def _init_statechart(self):
+        self.go_to_state_locked = False
+        self._send_event_locked = False
+        self._pending_state_transitions = deque()
+        self._macrostep_futures = []
+
+        self._transition_plan_cache = OrderedDict()
+        self._history_dependencies = None
+        self.transition_plan_cache_hits = 0
+        self.transition_plan_cache_misses = 0
+
+        # Bounded, as event names can be open ended.
+        self._event_responders = EventCache(EVENT_MEMO_SIZE)
+        self._event_routes = EventCache(EVENT_MEMO_SIZE)
+        self._current_states_version = 0
+        self._current_states_is_deferred = False
+        self._current_states_is_stale = False
+        self._changed_state_properties = OrderedDict()
+
+        self._states = []
+        self._current_state_flags = bytearray()
+        self._entered_state_flags = bytearray()
+        self._state_flags = {
+            'current_substates': self._current_state_flags,
+            'entered_substates': self._entered_state_flags
+        }
+        self._state_depths = []
+        self._state_chains = []
+        self._pivot_tables = None
+        self._untabled_states = {}
+
+        self.send_action = self.send_event
+
+        if self.monitor_is_active:
+            self.monitor = self._create_monitor()
+
+        msg = ''
+
+        if self.trace:
+            self.statechart_log_trace("BEGIN initialize statechart")
+
+        profile = self._active_startup_profile
+
+        if not self.root_state_class:
+            with ProfilePhase(profile, 'construct root state class'):
+                self.root_state_class = self._construct_root_state_class()
+
+        if (inspect.isclass(self.root_state_class)
+                and not issubclass(self.root_state_class, BaseState)):
+            msg = ("Unable to initialize statechart. Root state must be a "
+                   "state class")
+            self.statechart_log_error(msg)
+            raise Exception(msg)
+
+        with ProfilePhase(profile, 'create root state'):
+            root_state_instance = self.create_root_state(self.root_state_class,
+                                                         ROOT_STATE_NAME)
+
+        self.root_state_instance = root_state_instance
+
+        with ProfilePhase(profile, 'init state'):
+            root_state_instance.init_state()
+
+        self.statechart_is_initialized = True
+
+        with ProfilePhase(profile, 'go to initial states'):
+            self.go_to_state(root_state_instance)
+
+        if self.trace:
+            self.statechart_log_trace("END initialize statechart")
+
+    def _register_state(self, state):
+        '''Gives a state being initialized a dense integer id, its state_id,
+           which indexes this statechart's current and entered state flags.
+
+           _current_state_flags[state_id] counts how many times the state is
+           in its own current_substates list, and _entered_state_flags its
+           own entered_substates list, so that is_current_state and
+           is_entered_state are a single lookup.
+        '''
+        if state.state_id is not None:
+            return
+
+        state.state_id = len(self._states)
+        self._states.append(state)
+        self._current_state_flags.append(0)
+        self._entered_state_flags.append(0)
+
+        parent_state = state.parent_state
+        parent_id = parent_state.state_id if parent_state is not None else None
+        self._state_depths.append(
+                self._state_depths[parent_id] + 1
+                if parent_id is not None
+                else 0)
+        self._state_chains.append(None)
+
+        if self._pivot_tables is not None:
+            self._state_was_added_to_tree(state.state_id, parent_id)
+
+    def _unregister_state(self, state):
+        '''Clears the flags of a destroyed state. Its id is not reused.'''
+        state_id = state.state_id
+
+        if state_id is None or not self.statechart_is_initialized:
+            return
+
+        self._states[state_id] = None
+        self._current_state_flags[state_id] = 0
+        self._entered_state_flags[state_id] = 0
+        self._state_chains[state_id] = None
+        self._untabled_states.pop(state_id, None)
+        state.state_id = None
+
+    def create_root_state(self, state, name):
+        return state(statechart=self, name=name)
+
+    def _current_states(self, *l):
+        self._current_states_version += 1
+
+        if self._current_states_is_deferred:
+            self._current_states_is_stale = True
+            return
+
+        self._current_states_is_stale = False
+        self.current_states = self.root_state_instance.current_substates
+
+    def _live_current_states(self):
+        '''Returns the current states as they are now. current_states is not
+           updated while send_events() handles a batch, so the statechart
+           reads them from the root state instead.
+        '''
+        root_state = self.root_state_instance
+
+        return root_state.current_substates \
+                if root_state is not None \
+                else self.current_states
+
+    def state_is_current_state(self, state):
+        return self.root_state_instance.state_is_current_substate(state)
+
+    def entered_states(self):
+        return self.root_state_instance.entered_substates
+
+    def state_is_entered(self, state):
+        return self.root_state_instance.state_is_entered_substate(state)
+
+    def get_state(self, state):
+        if isinstance(state, basestring):
+            return self.root_state_instance \
+                    if self.root_state_instance.name == state \
+                    else self.root_state_instance.get_substate(state)
+        else:
+            return self.root_state_instance \
+                    if self.root_state_instance is state \
+                    else self.root_state_instance.get_substate(state)
+
+    def go_to_state(self, state, from_current_state=None, use_history=False, context=None):
+        '''When called, the statechart will proceed with making state
+           transitions in the statechart starting from a current state that
+           meets the statechart conditions. When complete, some or all of the
+           statechart's current states will be changed, and all states that
+           were part of the transition process will either be exited or entered
+           in a specific order.
+
+           The state that is given to go to will not necessarily be a current
+           state when the state transition process is complete. The final state
+           or states are dependent on factors such an initial substates,
+           concurrent states, and history states.
+
+           Because the statechart can have one or more current states, it may
+           be necessary to indicate what current state to start from. If no
+           current state to start from is provided, then the statechart will
+           default to using the first current state that it has; depending of
+           the make up of the statechart (no concurrent state vs.  with
+           concurrent states), the outcome may be unexpected. For a statechart
+           with concurrent states, it is best to provide a current state in
+           which to start from.
+
+           When using history states, the statechart will first make
+           transitions to the given state and then use that state's history
+           state and recursively follow each history state's history state
+           until there are no more history states to follow. If the given state
+           does not have a history state, then the statechart will continue
+           following state transition procedures.
+
+           Parameters:
+
+           * state {State|String} the state to go to (may not be the final
+             state in the transition process)
+           * from_current_state {State|String} Optional. The current state to
+             start the transition process from.
+           * use_history {Boolean} Optional. Indicates whether to include using
+             history states in the transition process
+           * context {dict} Optional. A context dict that will be passed to
+             all exited and entered states
+        '''
+        if not self.statechart_is_initialized:
+            msg = ("Cannot go to state {0}. Statechart has not yet been "
+                   "initialized.").format(state)
+            self.statechart_log_error(msg)
+            raise Exception(msg)
+
+        # [PORT] Removed isDestroyed check -- but this is a punt for a later time...
+        #if self.isDestroyed:
+            #self.statechart_log_error("Cannot go to state {0}. statechart is destroyed".format(this))
+            #return
+
+        param_state = state
+        param_from_current_state = from_current_state
+
+        state = self.get_state(state)
+
+        if state is None:
+            msg = ("Cannot to goto state {0}. Not a recognized state in "
+                   "statechart.{1}").format(
+                           param_state,
+                           self.root_state_instance._pending_lazy_substates_note())
+            self.statechart_log_error(msg)
+            raise Exception(msg)
+
+        if self.go_to_state_locked:
+            # There is a state transition currently happening. Add this requested state
+            # transition to the queue of pending state transitions. The request will
+            # be invoked after the current state transition is finished.
+            self._pending_state_transitions.append({
+              'state': state,
+              'from_current_state': from_current_state,
+              'use_history': use_history,
+              'context': context
+            })
+            return
+
+        # Lock the current state transition so that no other requested state
+        # transition interferes.
+        self.go_to_state_locked = True
+
+        if from_current_state is not None:
+            # Check to make sure the current state given is actually a current
+            # state of this statechart
+            from_current_state = self.get_state(from_current_state)
+            if (from_current_state is None
+                    or not from_current_state.is_current_state()):
+                msg = ("Cannot to goto state {0}. {1} is not a "
+                       "recognized current state in "
+                       "the statechart.").format(param_state,
+                                                 param_from_current_state)
+                self.statechart_log_error(msg)
+                self.go_to_state_locked = False
+                raise Exception(msg)
+        else:
+            # No explicit current state to start from; therefore, need to find a current state
+            # to transition from.
+            from_current_state = state.find_first_relative_current_state()
+            if from_current_state is None:
+                current_states = self.root_state_instance.current_substates
+                from_current_state = current_states[0] if current_states else None
+
+        if self.trace:
+            self.statechart_log_trace("BEGIN go_to_state: {0}".format(state))
+            msg = "starting from current state: {0}"
+            msg = msg.format(from_current_state if from_current_state else '---')
+            self.statechart_log_trace(msg)
+            msg = "current states before: {0}"
+            current_states = self._live_current_states()
+            msg = msg.format(current_states if current_states else '---')
+            self.statechart_log_trace(msg)
+
+        if self.transition_plan_cache_is_active:
+            go_to_state_actions = self._cached_go_to_state_actions(
+                    state, from_current_state, use_history)
+        else:
+            go_to_state_actions = self._create_go_to_state_actions(
+                    state, from_current_state, use_history)
+
+        # Collected all the state transition actions to be performed. Now execute them.
+        self._go_to_state_actions = go_to_state_actions
+        self._execute_go_to_state_actions(state, go_to_state_actions, None, context)
+
+    def _create_go_to_state_actions(self, state, from_current_state,
+                                    use_history):
+        '''Builds the list of exit and enter actions needed to go from the
+           given current state to the given state.
+        '''
+        exit_states = deque()
+
+        # If there is a current state to start the transition process from, then determine what
+        # states are to be exited
+        if from_current_state is not None:
+            exit_states = self._create_state_chain(from_current_state)
+
+        # Now determine the initial states to be entered
+        enter_states = self._create_state_chain(state)
+
+        # Get the pivot state to indicate when to go from exiting states to entering states
+        pivot_state = self._find_pivot_state(exit_states, enter_states)
+
+        if pivot_state is not None:
+            if self.trace:
+                self.statechart_log_trace("pivot state = {0}".format(pivot_state))
+            if pivot_state.substates_are_concurrent and pivot_state is not state:
+                msg = ("Cannot go to state {0} from {1}. Pivot state {2} has "
+                       "concurrent substates.").format(state,
+                                                       from_current_state,
+                                                       pivot_state)
+                self.statechart_log_error(msg)
+                self.go_to_state_locked = False
+                raise Exception(msg)
+
+        # Collect what actions to perform for the state transition process
+        go_to_state_actions = []
+
+        # Go ahead and find states that are to be exited
+        self._traverse_states_to_exit(
+                exit_states.popleft() if exit_states else None,
+                exit_states, pivot_state, go_to_state_actions)
+
+        # Now go find states that are to be entered
+        if pivot_state is not state:
+            self._traverse_states_to_enter(enter_states.pop(), enter_states,
+                                           pivot_state, use_history,
+                                           go_to_state_actions)
+        else:
+            self._traverse_states_to_exit(pivot_state,
+                                          deque(),
+                                          None,
+                                          go_to_state_actions)
+
+            self._traverse_states_to_enter(pivot_state,
+                                           None,
+                                           None,
+                                           use_history, go_to_state_actions)
+
+        return go_to_state_actions
+
+    def _cached_go_to_state_actions(self, state, from_current_state,
+                                    use_history):
+        '''Returns the go_to_state actions for the given transition from the
+           transition plan cache, building and storing them on a miss.
+        '''
+        key = (tuple(self.root_state_instance.current_substates),
+               from_current_state, state, bool(use_history))
+
+        plan = self._transition_plan_cache.pop(key, None)
+
+        if plan is not None:
+            actions, history_dependencies = plan
+            for dependent_state, history_state in history_dependencies:
+                if dependent_state.history_state is not history_state:
+                    plan = None
+                    break
+
+        if plan is None:
+            self.transition_plan_cache_misses += 1
+
+            self._history_dependencies = []
+            try:
+                actions = self._create_go_to_state_actions(
+                        state, from_current_state, use_history)
+                plan = (actions, self._history_dependencies)
+            finally:
+                self._history_dependencies = None
+
+            if len(self._transition_plan_cache) >= \
+                    self.transition_plan_cache_size:
+                self._transition_plan_cache.popitem(last=False)
+        else:
+            self.transition_plan_cache_hits += 1
+
+        # Re-inserting keeps the most recently used plans at the end.
+        self._transition_plan_cache[key] = plan
+
+        return plan[0]
+
+    def _note_history_dependency(self, state, history_state):
+        '''Records that the transition plan being built depends on the given
+           state's history state.
+        '''
+        if self._history_dependencies is not None:
+            self._history_dependencies.append((state, history_state))
+
+    def clear_transition_plan_cache(self):
+        '''Empties the transition plan cache. The hit and miss counters are
+           kept.
+        '''
+        if self.statechart_is_initialized:
+            self._transition_plan_cache.clear()
+
+    def state_tree_did_change(self):
+        '''Called by states when substates are added or destroyed, to drop
+           everything the statechart has worked out from the shape of the
+           state tree.
+        '''
+        if not self.statechart_is_initialized:
+            return
+
+        self.clear_transition_plan_cache()
+        self._event_responders.clear()
+        self._event_routes.clear()
+
+    def _go_to_state_active(self, *l):
+        '''Indicates if the statechart is in an active goto state process.'''
+        self.go_to_state_active = self.go_to_state_locked
+
+    def _go_to_state_suspended(self, *l):
+        '''Indicates if the statechart is in an active goto state process
+           that has been suspended.
+        '''
+        self.go_to_state_suspended = (self.go_to_state_locked
+                and self.go_to_state_suspended_point is not None)
+
+    def resume_go_to_state(self):
+        '''Resumes an active goto state transition process that has been
+           suspended.
+        '''
+        if not self.go_to_state_suspended:
+            msg = ("Cannot resume goto state since it has not been suspended.")
+            self.statechart_log_error(msg)
+            raise Exception(msg)
+
+        point = self.go_to_state_suspended_point
+        self._execute_go_to_state_actions(point['go_to_state'],
+                                          point['actions'],
+                                          point['marker'],
+                                          point['context'])
+
+    def _execute_go_to_state_actions(self, go_to_state,
+                                     actions, marker, context):
+        action = None
+        action_result = None
+
+        marker = 0 if marker is None else marker
+
+        number_of_actions = len(actions)
+        while marker < number_of_actions:
+            action = actions[marker]
+            self._current_go_to_state_action = action
+            try:
+                if action['action'] == EXIT_STATE:
+                    action_result = self._exit_state(action['state'], context)
+                elif action['action'] == ENTER_STATE:
+                    action_result = self._enter_state(action['state'], action['current_state'], context)
+            except Exception as exception:
+                self._flight_recorder_did_catch(exception)
+                raise
+
+            # Check if the state wants to perform an asynchronous action during
+            # the state transition process. If so, then we need to first
+            # suspend the state transition process and then invoke the
+            # asynchronous action. Once called, it is then up to the state or something
+            # else to resume this statechart's state transition process by calling the
+            # statechart's resume_go_to_state method.
+            #
+            # if action_result and inspect.isclass(action_result) and issubclass(action_result, Async):
+            if action_result and isinstance(action_result, Async):
+                self.go_to_state_suspended_point = {
+                    'go_to_state': go_to_state,
+                    'actions': actions,
+                    'marker': marker + 1,
+                    'context': context
+                }
+
+                self._publish_state_property_changes()
+
+                # [PORT] state arg must be object, not string key
+                action_result.try_to_perform(self.get_state(action['state']))
+                return
+
+            # A state may also return a future, in which case the state
+            # transition process is resumed when it is done.
+            future = as_future(action_result)
+
+            if future is not None:
+                self.go_to_state_suspended_point = {
+                    'go_to_state': go_to_state,
+                    'actions': actions,
+                    'marker': marker + 1,
+                    'context': context
+                }
+
+                self._publish_state_property_changes()
+
+                future.add_done_callback(self._action_future_did_complete)
+                return
+
+            marker += 1
+
+        #self.beginPropertyChanges()
+        #self.notifyPropertyChange('current_states') # [PORT] notify needed here in kivy?
+        #self.endPropertyChanges()
+        self._publish_state_property_changes()
+        self._current_states()
+
+        if self.trace:
+            self.statechart_log_trace("current states after: {0}".format(self._live_current_states()))
+            self.statechart_log_trace("END go_to_state: {0}".format(go_to_state))
+
+        self._clean_up_state_transition()
+
+    def _clean_up_state_transition(self):
+        self._current_go_to_state_action = None
+        self.go_to_state_suspended_point = None
+        self._go_to_state_actions = None
+        self.go_to_state_locked = False
+        self._flush_pending_state_transition()
+
+        if self._macrostep_futures and not self.go_to_state_locked:
+            self._complete_macrostep_futures()
+
+    def _action_future_did_complete(self, future):
+        '''Resumes the state transition process suspended by a state that
+           returned the given future from enter_state or exit_state, then
+           handles the events sent while it was suspended. Futures are
+           expected to complete on the thread running the statechart, as they
+           do on a Kivy event loop.
+
+           If the future failed, the rest of the state transition process is
+           abandoned, leaving the states entered so far as the current
+           states, the exception is logged, and the futures waiting for the
+           state transition fail with it.
+        '''
+        if not self.go_to_state_suspended:
+            return
+
+        exception = future_exception(future)
+
+        if exception is not None:
+            self._abandon_go_to_state(exception)
+        else:
+            self.resume_go_to_state()
+
+        if not self._send_event_locked and not self.go_to_state_locked:
+            self._flush_pending_sent_events()
+
+    def _abandon_go_to_state(self, exception):
+        point = self.go_to_state_suspended_point
+        action = self._current_go_to_state_action
+
+        self.statechart_log_error(
+                "{0!r} raised by the future of {1} state {2}, abandoning "
+                "go to state {3}".format(
+                        exception, action['action'], action['state'],
+                        point['go_to_state']))
+        self._flight_recorder_did_catch(exception)
+
+        self._current_states()
+
+        futures, self._macrostep_futures = self._macrostep_futures, []
+
+        self._clean_up_state_transition()
+
+        for future, result in futures:
+            future.set_exception(exception)
+
+    def _when_macrostep_completes(self, result):
+        '''Returns a StatechartFuture resolved with result once the
+           statechart has no state transition in progress.
+        '''
+        future = StatechartFuture()
+        self._resolve_when_macrostep_completes(future, result)
+
+        return future
+
+    def _resolve_when_macrostep_completes(self, future, result):
+        if self.go_to_state_locked:
+            self._macrostep_futures.append((future, result))
+        else:
+            future.set_result(result)
+
+    def _complete_macrostep_futures(self):
+        futures, self._macrostep_futures = self._macrostep_futures, []
+
+        for future, result in futures:
+            future.set_result(result)
+
+    def _exit_state(self, state, context):
+        parent_state = None
+
+        if self._current_state_flags[state.state_id]:
+            parent_state = state.parent_state
+            while parent_state is not None:
+                self._remove_state_list_item(parent_state,
+                                             'current_substates', state)
+                parent_state = parent_state.parent_state
+
+        # An entered state is listed by itself and each of its ancestors.
+        if self._entered_state_flags[state.state_id]:
+            parent_state = state
+            while parent_state is not None:
+                self._remove_state_list_item(parent_state,
+                                             'entered_substates', state)
+                parent_state = parent_state.parent_state
+
+        if self.trace:
+            self.statechart_log_trace("<-- exiting state: {0}".format(state))
+
+        self._clear_state_list(state, 'current_substates')
+
+        if self._state_timers:
+            self._cancel_state_timers(state)
+
+        result = self._call_exit_state(state, context)
+
+        setattr(state, '_traverse_states_to_exit_skip_state', False)
+
+        return result
+
+    def _call_exit_state(self, state, context):
+        '''Calls exit_state() for a state being exited, between its
+           state_will_become_exited and state_did_become_exited methods, and
+           tells the flight recorder and the monitor.
+        '''
+        state.state_will_become_exited(context)
+        recorder = self.flight_recorder
+        if recorder is None:
+            result = self.exit_state(state, context)
+        else:
+            start = default_timer()
+            result = self.exit_state(state, context)
+            recorder.append((start, EXITED, state.state_id, None,
+                             default_timer() - start))
+        state.state_did_become_exited(context)
+
+        if self.monitor_is_active:
+            self.monitor.append_exited_state(state)
+
+        return result
+
+    def exit_state(self, state, context):
+        '''Invokes a state's exit_state method.'''
+        return state.exit_state(context)
+
+    def _enter_state(self, state, current, context):
+        state = self.get_state(state) # [PORT] Insure this is an obj and not a string.
+        parent_state = state.parent_state
+        if parent_state and not state.is_concurrent_state():
+            parent_state.history_state = state
+
+        if current:
+            parent_state = state
+            while parent_state is not None:
+                self._append_state_list_item(parent_state,
+                                             'current_substates', state)
+                parent_state = parent_state.parent_state
+
+        parent_state = state;
+        while parent_state is not None:
+            self._append_state_list_item(parent_state,
+                                         'entered_substates', state)
+            parent_state = parent_state.parent_state
+
+        if self.trace:
+             self.statechart_log_trace("--> entering state: {0}".format(state))
+
+        return self._call_enter_state(state, context)
+
+    def _call_enter_state(self, state, context):
+        '''Calls enter_state() for a state being entered, between its
+           state_will_become_entered and state_did_become_entered methods, and
+           tells the flight recorder and the monitor.
+        '''
+        state.state_will_become_entered(context)
+        recorder = self.flight_recorder
+        if recorder is None:
+            result = self.enter_state(state, context)
+        else:
+            start = default_timer()
+            result = self.enter_state(state, context)
+            recorder.append((start, ENTERED, state.state_id, None,
+                             default_timer() - start))
+        state.state_did_become_entered(context)
+
+        if self.monitor_is_active:
+            self.monitor.append_entered_state(state)
+
+        return result
+
+    def _append_state_list_item(self, state, name, item):
+        '''Appends item to the state's current_substates or
+           entered_substates list, named by name. When
+           defer_state_property_changes is True, observers are not notified
+           until _publish_state_property_changes() is called.
+        '''
+        if state is item:
+            self._state_flags[name][state.state_id] += 1
+
+        if self.defer_state_property_changes:
+            list.append(getattr(state, name), item)
+            self._changed_state_properties[(state, name)] = True
+        else:
+            getattr(state, name).append(item)
+
+    def _remove_state_list_item(self, state, name, item):
+        '''Removes item from the state's current_substates or
+           entered_substates list, named by name. See
+           _append_state_list_item().
+        '''
+        if state is item:
+            self._state_flags[name][state.state_id] -= 1
+
+        if self.defer_state_property_changes:
+            list.remove(getattr(state, name), item)
+            self._changed_state_properties[(state, name)] = True
+        else:
+            getattr(state, name).remove(item)
+
+    def _clear_state_list(self, state, name):
+        '''Empties the state's current_substates or entered_substates list,
+           named by name. See _append_state_list_item().
+        '''
+        self._state_flags[name][state.state_id] = 0
+
+        if self.defer_state_property_changes:
+            items = getattr(state, name)
+            if items:
+                list.__delitem__(items, slice(None, None))
+                self._changed_state_properties[(state, name)] = True
+        else:
+            setattr(state, name, [])
+
+    def _publish_state_property_changes(self):
+        '''Notifies the observers of every current_substates and
+           entered_substates list changed since the last call, once per list.
+        '''
+        changed = self._changed_state_properties
+
+        if not changed:
+            return
+
+        self._changed_state_properties = OrderedDict()
+
+        for state, name in changed:
+            state._dispatch_property_change(name)
+
+    def enter_state(self, state, context):
+        '''Invokes a state's enter_state method.
+
+           Called during the state transition process whenever the go_to_state
+           method is invoked.
+        '''
+        return state.enter_state(context)
+
+    def go_to_history_state(self,
+                            state,
+                            from_current_state=None,
+                            recursive=False,
+                            context=None):
+        '''When called, the statechart will proceed to make transitions to the
+           given state then follow that state's history state.
+
+           You can either go to a given state's history recursively or
+           non-recursively. To go to a state's history recursively means to
+           following each history state's history state until no more history
+           states can be followed. Non-recursively means to just to the given
+           state's history state but do not recusively follow history states.
+           If the given state does not have a history state, then the
+           statechart will just follow normal procedures when making state
+           transitions.
+
+           Because a statechart can have one or more current states, depending
+           on if the statechart has any concurrent states, it is optional to
+           provided current state in which to start the state transition
+           process from. If no current state is provided, then the statechart
+           will default to the first current state that it has; which,
+           depending on the make up of that statechart, can lead to unexpected
+           outcomes. For a statechart with concurrent states, it is best to
+           explicitly supply a current state.
+
+           Parameters:
+
+           * state {State|String} The state to go to and follow it's history
+             state.
+           * from_current_state {State|String} Optional. The current state from
+             which to start the state transition process.
+           * recursive {Boolean} Optional. Whether to follow history states
+             recursively.
+        '''
+        if not self.statechart_is_initialized:
+            msg = ("Cannot go to state {0}'s history state. Statechart has "
+                   "not yet been initialized").format(state)
+            self.statechart_log_error(msg)
+            raise Exception(msg)
+
+        state = self.get_state(state)
+
+        if state is None:
+            note = self.root_state_instance._pending_lazy_substates_note()
+            msg = ("Cannot to goto state {0}'s history state. Not a "
+                   "recognized state in statechart{1}").format(
+                           state, '.' + note if note else '')
+            self.statechart_log_error(msg)
+            raise Exception(msg)
+
+        history_state = state.history_state
+
+        if not recursive:
+            if history_state is not None:
+                self.go_to_state(state=history_state, from_current_state=from_current_state, context=context)
+            else:
+                self.go_to_state(state=state, from_current_state=from_current_state, context=context)
+        else:
+            self.go_to_state(state=state, from_current_state=from_current_state, use_history=True, context=context)
+
+    def send_event(self, event, arg1=None, arg2=None):
+        '''Sends a given event to all the statechart's current states.
+
+           If a current state does cannot respond to the sent event, then the
+           current state's parent state will be tried. This process is
+           recursively done until no more parent state can be tried.
+
+           Note that a state will only be checked once if it can respond to an
+           event. Therefore, if there is a state S that handles event foo and S
+           has concurrent substates, then foo will only be invoked once; not as
+           many times as there are substates.
+
+           Parameters:
+
+           * event {String} name of the event
+           * arg1 {Object} optional argument
+           * arg2 {Object} optional argument
+
+           Returns the responder that handled it or None.
+
+           See state_will_try_to_handle_event().
+           See state_did_try_to_handle_event().
+        '''
+       # [PORT] Removed isDestroyed check -- but this is a punt for a later time...
+        #if self.isDestroyed:
+            #self.statechart_log_error("can send event {0}. statechart is destroyed".format(event))
+            #return
+
+        if self._send_event_locked or self.go_to_state_locked:
+            # Want to prevent any actions from being processed by the states until
+            # they have had a chance to handle the most immediate action or completed
+            # a state transition
+            self._pending_sent_events.push(event, {
+                'event': event,
+                'arg1': arg1,
+                'arg2': arg2
+            })
+
+            return
+
+        self._send_event_locked = True
+
+        statechart_handled_event = self._dispatch_event(event, arg1, arg2, {})
+
+        # Now that all the states have had a chance to process the
+        # first event, we can go ahead and flush any pending sent events.
+        self._send_event_locked = False
+
+        result = self._flush_pending_sent_events()
+
+        return self if statechart_handled_event else (self if result else None)
+
+    def send_event_future(self, event, arg1=None, arg2=None):
+        '''Sends the event as send_event() does, and returns a
+           StatechartFuture resolved with what send_event() returned, once
+           the state transitions the event caused are complete, including
+           those suspended by asynchronous enter_state or exit_state calls.
+
+           If the statechart is busy, the event is queued as send_event()
+           queues it, and the future is resolved once the event has been
+           handled: with the statechart if a state handled it, else None. The
+           future of a queued event dropped by a full internal queue fails
+           instead.
+        '''
+        if self._send_event_locked or self.go_to_state_locked:
+            future = StatechartFuture()
+            self._pending_sent_events.push(event, {
+                'event': event,
+                'arg1': arg1,
+                'arg2': arg2,
+                'future': future
+            })
+
+            return future
+
+        return self._when_macrostep_completes(
+                self.send_event(event, arg1, arg2))
+
+    def go_to_state_future(self, state, from_current_state=None,
+                           use_history=False, context=None):
+        '''Goes to the state as go_to_state() does, and returns a
+           StatechartFuture resolved once the state transition is complete.
+        '''
+        return self._when_macrostep_completes(
+                self.go_to_state(state, from_current_state, use_history,
+                                 context))
+
+    def send_events(self, events):
+        '''Sends a batch of events to the statechart's current states.
+
+           Each item of events is an event name or an (event, arg1, arg2)
+           tuple, where the arguments are optional. Events are handled one at
+           a time, as send_event would, and any events sent by states while
+           handling an event are handled before the next event of the batch
+           (run to completion).
+
+           The statechart is locked once for the whole batch, and the
+           current_states property is only updated at the end of the batch,
+           so observers of current_states are notified once.
+
+           If the statechart is busy handling an event or going to a state,
+           the events are queued as pending events and None is returned.
+
+           Returns a list with a boolean for each event, True if a state
+           handled the event.
+        '''
+        return self._send_events(events, None)
+
+    def _send_events(self, events, posted):
+        '''Sends a batch of events, as send_events() does. posted is None,
+           or a list of the times the events were posted with post_event(),
+           for the posted event stats, which count each posted event once it
+           has been handled.
+        '''
+        if self._send_event_locked or self.go_to_state_locked:
+            for index, item in enumerate(events):
+                event, arg1, arg2 = self._unpack_event(item)
+                pending = {
+                    'event': event,
+                    'arg1': arg1,
+                    'arg2': arg2
+                }
+                if posted is not None:
+                    pending['posted'] = posted[index]
+                self._pending_sent_events.push(event, pending)
+
+            return None
+
+        handled = []
+        checked_states = {}
+        pending_sent_events = self._pending_sent_events
+
+        self._send_event_locked = True
+        self._current_states_is_deferred = True
+
+        try:
+            for index, item in enumerate(events):
+                event, arg1, arg2 = self._unpack_event(item)
+
+                checked_states.clear()
+                handled.append(self._dispatch_event(event, arg1, arg2,
+                                                    checked_states))
+                if posted is not None:
+                    self._posted_event_was_handled(posted[index])
+
+                while pending_sent_events:
+                    pending = pending_sent_events.pop()
+                    checked_states.clear()
+                    pending_handled = self._dispatch_event(
+                            pending['event'], pending['arg1'],
+                            pending['arg2'], checked_states)
+                    if 'posted' in pending or 'future' in pending:
+                        self._pending_event_was_handled(pending,
+                                                        pending_handled)
+        finally:
+            self._send_event_locked = False
+            self._current_states_is_deferred = False
+            if self._current_states_is_stale:
+                self._current_states()
+
+        return handled
+
+    def post_event(self, event, arg1=None, arg2=None):
+        '''Sends an event to the statechart from any thread. The event is
+           queued, and sent by drain_posted_events(), along with every other
+           event posted before it is called. StatechartManager calls it on
+           the thread running the Kivy clock, once per frame.
+
+           Events are queued by priority, see event_priorities, and the queue
+           is bounded by external_event_queue_capacity. Events can be
+           coalesced, see coalesced_events and coalesce_posted_events.
+
+           Parameters:
+
+           * event {String} the event to send to the current states
+           * arg1 Optional. An argument to pass to the current states
+           * arg2 Optional. An argument to pass to the current states
+        '''
+        if not self._posted_events.push(event,
+                                        (event, arg1, arg2, time.time()),
+                                        self._coalescing_key(event, arg1,
+                                                             arg2)):
+            return
+
+        if not self._posted_events_are_scheduled:
+            self._posted_events_are_scheduled = True
+            self._schedule_posted_events()
+
+    def _schedule_posted_events(self):
+        '''Called when an event is posted while no call to
+           drain_posted_events() is scheduled. Statecharts not driven by a
+           clock call drain_posted_events() themselves.
+        '''
+        pass
+
+    def send_event_after(self, delay, event, arg1=None, arg2=None):
+        '''Sends the event to the statechart after delay seconds. Returns the
+           timer, which can be cancelled with its cancel() method.
+
+           States can use their own send_event_after() and
+           go_to_state_after() for timers that are cancelled when they are
+           exited.
+        '''
+        return self.schedule_timer(delay, self.send_event, (event, arg1, arg2))
+
+    def schedule_timer(self, delay, callback, args=(), state=None):
+        '''Calls callback with args after delay seconds, unless the timer
+           returned is cancelled first. If a state is given, the timer is
+           cancelled when the state is exited.
+
+           All timers are run by run_timers(), see next_timer_deadline().
+        '''
+        timer = self._timers.add(time.time() + delay, callback, args,
+                                 None if state is None else state.state_id)
+
+        if state is not None:
+            timers = self._state_timers.get(state.state_id)
+            if timers is None:
+                timers = self._state_timers[state.state_id] = set()
+            timers.add(timer)
+
+        self._schedule_timers()
+
+        return timer
+
+    def run_timers(self, now=None):
+        '''Calls the timers due at time now, by default the current time, in
+           the order of their deadlines. Called by the Kivy Clock in
+           StatechartManager, or directly by statecharts not driven by a
+           clock.
+
+           If a timer raises an exception, the timers due after it are put
+           back, to be called by the next run_timers(), which is scheduled
+           right away, and the exception is raised.
+
+           Returns the number of timers called.
+        '''
+        due = self._timers.pop_due(time.time() if now is None else now)
+        called = 0
+        index = 0
+
+        try:
+            while index < len(due):
+                timer = due[index]
+                index += 1
+
+                # An earlier timer may have exited the state of this one.
+                if timer.cancelled:
+                    continue
+
+                if timer.state_id is not None:
+                    self._discard_state_timer(timer)
+
+                timer.callback(*timer.args)
+                called += 1
+        finally:
+            if index < len(due):
+                self._timers.requeue(due[index:])
+
+            self._schedule_timers()
+
+        return called
+
+    def timers_depth(self):
+        '''Returns the number of timers waiting to fire.'''
+        return len(self._timers)
+
+    def next_timer_deadline(self):
+        '''Returns the time.time() at which run_timers() is next due, or None
+           if no timer is waiting to fire.
+        '''
+        return self._timers.next_deadline()
+
+    def _schedule_timers(self):
+        '''Called when the earliest deadline of the timers may have changed.
+           Statecharts not driven by a clock call run_timers() themselves, see
+           next_timer_deadline().
+        '''
+        pass
+
+    def _timer_was_cancelled(self, timer):
+        if timer.state_id is not None:
+            self._discard_state_timer(timer)
+
+    def _discard_state_timer(self, timer):
+        timers = self._state_timers.get(timer.state_id)
+
+        if timers is not None:
+            timers.discard(timer)
+            if not timers:
+                del self._state_timers[timer.state_id]
+
+    def _cancel_state_timers(self, state):
+        '''Cancels the timers scoped to the state, as it is exited.'''
+        timers = self._state_timers.pop(state.state_id, None)
+
+        if timers:
+            for timer in timers:
+                timer.cancel()
+
+    def _coalescing_key(self, event, arg1, arg2):
+        '''Returns the key a posted event is coalesced by, or None.'''
+        coalesced_events = self.coalesced_events
+
+        if event in coalesced_events:
+            key = coalesced_events[event]
+            if key is None:
+                return (event,)
+            return (event, key(arg1, arg2))
+
+        if self.coalesce_posted_events:
+            return (event,)
+
+        return None
+
+    def drain_posted_events(self, *l):
+        '''Sends the events posted with post_event(), by priority and in the
+           order they were posted. Called on the clock's thread once per
+           frame when events were posted, or directly by statecharts not
+           driven by the clock.
+
+           Events are counted in posted_events_handled, and their latency
+           measured, once handled: if the statechart is busy, they are only
+           queued, as send_events() does, and counted when sent from the
+           queue.
+
+           Returns the number of events sent.
+        '''
+        self._posted_events_are_scheduled = False
+
+        posted_events = self._posted_events
+        events = []
+
+        # Only take what is queued now, so that producers cannot keep this
+        # frame from ending.
+        for i in range(len(posted_events)):
+            event = posted_events.pop()
+            if event is None:
+                break
+            events.append(event)
+
+        if not events:
+            return 0
+
+        self._send_events([event[:3] for event in events],
+                          [event[3] for event in events])
+
+        return len(events)
+
+    def _posted_event_was_handled(self, posted):
+        '''Counts a posted event, posted at time posted, as handled.'''
+        latency = time.time() - posted
+        self._posted_event_latency_total += latency
+        if latency > self.posted_event_latency_max:
+            self.posted_event_latency_max = latency
+
+        self.posted_events_handled += 1
+
+    def _pending_event_was_handled(self, pending, handled):
+        '''Called once a pending event, queued with the time it was posted or
+           the future of send_event_future(), has been handled.
+        '''
+        posted = pending.get('posted')
+        if posted is not None:
+            self._posted_event_was_handled(posted)
+
+        future = pending.get('future')
+        if future is not None:
+            self._resolve_when_macrostep_completes(
+                    future, self if handled else None)
+
+    def posted_events_depth(self):
+        '''Returns the number of posted events waiting to be sent.'''
+        return len(self._posted_events)
+
+    def event_queue_stats(self):
+        '''Returns the metrics of the internal event queue, of events sent
+           while the statechart is busy, and of the external event queue, of
+           posted events, as a dict with 'internal' and 'external' entries.
+           Each has the current 'depth' and the 'max-depth' reached, and the
+           number of events 'pushed' onto the queue, 'dropped' because the
+           queue was full, and 'coalesced' into an event already queued.
+        '''
+        return {
+          'internal': self._pending_sent_events.stats(),
+          'external': self._posted_events.stats()
+        }
+
+    def posted_event_latency_mean(self):
+        '''Returns the average time, in seconds, from posting an event to
+           it being handled.
+        '''
+        if not self.posted_events_handled:
+            return 0
+
+        return (self._posted_event_latency_total
+                / float(self.posted_events_handled))
+
+    def _unpack_event(self, item):
+        '''Returns an (event, arg1, arg2) tuple for an item given to
+           send_events.
+        '''
+        if isinstance(item, basestring):
+            return item, None, None
+
+        item = tuple(item)
+
+        return item + (None,) * (3 - len(item))
+
+    def _dispatch_event(self, event, arg1, arg2, checked_states):
+        '''Gives the current states, and their parent states, the chance to
+           handle the given event. checked_states is a dict of the states that
+           have already been tried.
+
+           Returns True if a state handled the event.
+        '''
+        statechart_handled_event = False
+        recorder = self.flight_recorder
+
+        if self.trace:
+            self.statechart_log_trace("BEGIN send_event: '{0}'".format(event))
+
+        # Only current states with a state able to handle the event somewhere
+        # up their parent chain are visited, and the bubbling skips straight
+        # from one such state to the next. See _event_route().
+        for state, responder in self._event_route(event):
+            event_handled = False
+            if not state.is_current_state():
+                continue
+            state = responder
+            while not event_handled and state is not None:
+                if not state in checked_states:
+                    start = default_timer() if recorder is not None else 0
+                    try:
+                        event_handled = state.try_to_handle_event(event, arg1,
+                                                                  arg2)
+                    except Exception as exception:
+                        self._flight_recorder_did_catch(exception)
+                        raise
+                    if event_handled and recorder is not None:
+                        recorder.append((start, HANDLED, state.state_id,
+                                         event, default_timer() - start))
+                    checked_states[state] = True
+                if not event_handled:
+                    state = self._event_responder(event, state.parent_state)
+                else:
+                    statechart_handled_event = True
+
+        if not statechart_handled_event and recorder is not None:
+            recorder.append((default_timer(), UNHANDLED, None, event, 0))
+
+        if self.trace:
+            if not statechart_handled_event:
+                self.statechart_log_trace("No state was able handle event {0}".format(event))
+            self.statechart_log_trace("END send_event: '{0}'".format(event))
+
+        return statechart_handled_event
+
+    def _event_route(self, event):
+        '''Returns a list of (current state, responder) pairs for the given
+           event, where responder is the current state or its closest parent
+           state that may be able to handle the event. Current states with no
+           such responder are left out.
+
+           The route is worked out once per event for each configuration of
+           current states, and kept for the event names most recently sent.
+        '''
+        route = self._event_routes.get(event)
+
+        if route is not None and route[0] == self._current_states_version:
+            return route[1]
+
+        entries = []
+        for state in self.root_state_instance.current_substates:
+            responder = self._event_responder(event, state)
+            if responder is not None:
+                entries.append((state, responder))
+
+        self._event_routes.set(event, (self._current_states_version, entries))
+
+        return entries
+
+    def _event_responder(self, event, state):
+        '''Returns the given state or its closest parent state that may be
+           able to handle the given event, or None. Results are remembered
+           until the state tree changes, for the event names most recently
+           sent.
+        '''
+        if state is None:
+            return None
+
+        responders = self._event_responders.get(event)
+        if responders is None:
+            responders = {}
+            self._event_responders.set(event, responders)
+        elif state in responders:
+            return responders[state]
+
+        chain = []
+        responder = None
+
+        while state is not None:
+            if state in responders:
+                responder = responders[state]
+                break
+            chain.append(state)
+            if self._state_may_handle_event(state, event):
+                responder = state
+                break
+            state = state.parent_state
+
+        for state in chain:
+            responders[state] = responder
+
+        return responder
+
+    def _state_may_handle_event(self, state, event):
+        '''Returns True if try_to_handle_event on the given state could do
+           anything other than return False for the given event.
+        '''
+        # [PORT] A state class with its own try_to_handle_event is always
+        #        given the chance to handle events.
+        if (type(state).try_to_handle_event.__func__
+                is not BaseState.try_to_handle_event.__func__):
+            return True
+
+        return state._event_dispatch_kind(event) != NO_EVENT_HANDLER
+
+    def state_will_try_to_handle_event(self, state, event, handler):
+        '''Used to notify the statechart that a state will try to handle event
+           that has been passed to it.
+
+           * state {State} - The state that will try to handle the event.
+           * event {String} - The event the state will try to handle.
+           * handler {String} - The name of the method on the state that
+             will try to handle the event.
+        '''
+        self._state_handle_event_info = {
+            'state': state,
+            'event': event,
+            'handler': handler
+        }
+
+    def state_did_try_to_handle_event(self, state, event, handler, handled):
+        '''Used to notify the statechart that a state did try to handle event
+           that has been passed to it.
+
+           Parameters:
+
+           * state {State} - The state that did try to handle the event.
+           * event {String} - The event the state did try to handle.
+           * handler {String} - The name of the method on the state that did
+             try to handle the event.
+           * handled {Boolean} - Indicates if the handler was able to handle
+             the event.
+        '''
+        self._state_handle_event_info = {}
+
+    def _create_state_chain(self, state):
+        '''Creates a chain of states from the given state to the greatest
+           ancestor state (the root state). Used when perform state transitions.
+        '''
+        state_id = state.state_id if state is not None else None
+
+        if state_id is None:
+            chain = deque()
+
+            while state is not None:
+                chain.append(state)
+                state = state.parent_state
+
+            return chain
+
+        # The chain of a state never changes once the state is initialized, so
+        # it is built once, reusing the parent state's chain.
+        chain = self._state_chains[state_id]
+
+        if chain is None:
+            parent_state = state.parent_state
+            chain = (state,) + (tuple(self._create_state_chain(parent_state))
+                                if parent_state is not None
+                                else ())
+            self._state_chains[state_id] = chain
+
+        return deque(chain)
+
+    def _find_pivot_state(self, state_chain_1, state_chain_2):
+        '''Finds a pivot state from two given state chains. The pivot state is
+           the state indicating when states go from being exited to states
+           being entered during the state transition process. The value
+           returned is the fist matching state between the two given state
+           chains.
+        '''
+        if len(state_chain_1) == 0 or len(state_chain_2) == 0:
+            return None
+
+        # Chains made by _create_state_chain() run up to the root state, so
+        # the pivot is the lowest common ancestor of their first states.
+        id_1 = state_chain_1[0].state_id
+        id_2 = state_chain_2[0].state_id
+
+        if (id_1 is not None and id_2 is not None
+                and state_chain_1[-1] is state_chain_2[-1]):
+            return self._states[self._lowest_common_ancestor(id_1, id_2)]
+
+        for state in state_chain_1:
+            if state in state_chain_2:
+                return state
+
+    def _lowest_common_ancestor(self, id_1, id_2):
+        '''Returns the id of the lowest common ancestor of the states with the
+           given ids, answered in constant time from an Euler tour of the
+           state tree and a sparse table of depth minima over it.
+        '''
+        if id_1 == id_2:
+            return id_1
+
+        if self._pivot_tables is None:
+            self._build_pivot_tables()
+
+        # A state added since the tables were built is looked up by its
+        # nearest ancestor in them, unless both states are below that same
+        # ancestor.
+        untabled = self._untabled_states
+        if untabled:
+            anchor_1 = untabled.get(id_1, id_1)
+            anchor_2 = untabled.get(id_2, id_2)
+
+            if anchor_1 == anchor_2:
+                return self._lowest_common_ancestor_by_parents(id_1, id_2)
+
+            id_1 = anchor_1
+            id_2 = anchor_2
+
+        first_visits, sparse_table = self._pivot_tables
+        depths = self._state_depths
+
+        left = first_visits[id_1]
+        right = first_visits[id_2]
+        if left > right:
+            left, right = right, left
+
+        level = (right - left + 1).bit_length() - 1
+        row = sparse_table[level]
+        a = row[left]
+        b = row[right - (1 << level) + 1]
+
+        return a if depths[a] <= depths[b] else b
+
+    def _lowest_common_ancestor_by_parents(self, id_1, id_2):
+        states = self._states
+        depths = self._state_depths
+
+        while id_1 != id_2:
+            if depths[id_1] >= depths[id_2]:
+                id_1 = states[id_1].parent_state.state_id
+            else:
+                id_2 = states[id_2].parent_state.state_id
+
+        return id_1
+
+    def _state_was_added_to_tree(self, state_id, parent_id):
+        '''Extends the pivot tables with a state added after they were built,
+           such as a substate added with add_substate() or a lazy substate
+           loaded, by mapping it to its nearest ancestor in the tables.
+
+           The tables are only dropped, to be rebuilt on the next lookup,
+           once the states added outnumber half the states in them, and 64,
+           so a rebuild is paid for by as many additions as it takes.
+        '''
+        untabled = self._untabled_states
+        untabled[state_id] = untabled.get(parent_id, parent_id)
+
+        if len(untabled) > max(len(self._pivot_tables[0]) // 2, 64):
+            self._pivot_tables = None
+            untabled.clear()
+
+    def _build_pivot_tables(self):
+        '''Builds the Euler tour and sparse table used by
+           _lowest_common_ancestor(). States added later are mapped into the
+           tables by _state_was_added_to_tree(); destroying states leaves
+           them valid for the states left, as ids are not reused.
+        '''
+        self._untabled_states.clear()
+
+        depths = self._state_depths
+        first_visits = [None] * len(self._states)
+        tour = []
+
+        root = self.root_state_instance
+        stack = [(root, iter(root.substates))]
+        first_visits[root.state_id] = 0
+        tour.append(root.state_id)
+
+        while stack:
+            state, substates = stack[-1]
+            substate = next(substates, None)
+
+            while substate is not None and substate.state_id is None:
+                substate = next(substates, None)
+
+            if substate is None:
+                stack.pop()
+                if stack:
+                    tour.append(stack[-1][0].state_id)
+                continue
+
+            first_visits[substate.state_id] = len(tour)
+            tour.append(substate.state_id)
+            stack.append((substate, iter(substate.substates)))
+
+        sparse_table = [tour]
+        level = 1
+
+        while (1 << level) <= len(tour):
+            previous = sparse_table[-1]
+            half = 1 << (level - 1)
+            sparse_table.append([a if depths[a] <= depths[b] else b
+                                 for a, b in zip(previous, previous[half:])])
+            level += 1
+
+        self._pivot_tables = (first_visits, sparse_table)
+
+    def _traverse_states_to_exit(self, state, exit_state_path, stop_state,
+                                 go_to_state_actions):
+        '''Recursively follow states that are to be exited during a state
+           transition process. The exit process is to start from the given
+           state and work its way up to when either all exit states have been
+           reached based on a given exit path or when a stop state has been
+           reached.
+
+           Parameters:
+
+           * state {State} the state to be exited
+           * exit_state_path {collections.deque} a deque representing a path of
+             states that are to be exited
+           * stop_state {State} an explicit state in which to stop the exiting
+             process
+        '''
+        if state is None or state is stop_state:
+            return
+
+        # This state has concurrent substates. Therefore we have to make sure we
+        # exit them up to this state before we can go any further up the exit chain.
+        if state.substates_are_concurrent:
+            for current_state in state.current_substates:
+                if (hasattr(current_state,
+                            '_traverse_states_to_exit_skip_state')
+                        and current_state._traverse_states_to_exit_skip_state):
+                    continue
+                chain = self._create_state_chain(current_state)
+                self._traverse_states_to_exit(
+                        chain.popleft() \
+                        if chain \
+                        else None, chain, state, go_to_state_actions)
+
+        go_to_state_actions.append({ 'action': EXIT_STATE, 'state': state })
+        if state.is_current_state():
+            setattr(state, '_traverse_states_to_exit_skip_state', True)
+        self._traverse_states_to_exit(
+            exit_state_path.popleft() if exit_state_path else None,
+            exit_state_path,
+            stop_state,
+            go_to_state_actions)
+
+    def _traverse_states_to_enter(self, state, enter_state_path, pivot_state,
+                                  use_history, go_to_state_actions):
+        '''Recursively follow states that are to be entered during the state
+           transition process. The enter process is to start from the given
+           state and work its way down a given enter path. When the end of
+           enter path has been reached, then continue entering states based on
+           whether an initial substate is defined, there are concurrent
+           substates or history states are to be followed; when none of those
+           condition are met then the enter process is done.
+
+           Parameters:
+
+           * state {State} - The sate to be entered.
+           * enter_state_path {collection.deque} - A deque representing an
+             initial path of states that are to be entered.
+           * pivot_state {State} - The state pivoting when to go from exiting
+             states to entering states.
+           * use_history {Boolean} - Indicates whether to recursively follow
+             history states.
+        '''
+        if not state:
+            return
+
+        # We do not want to enter states in the enter path until the pivot
+        # state has been reached. After the pivot state has been reached, then
+        # we can go ahead and actually enter states.
+        if pivot_state:
+            if state is not pivot_state:
+                # [PORT] pop, now on deque
+                self._traverse_states_to_enter(enter_state_path.pop(),
+                        enter_state_path, pivot_state, use_history,
+                        go_to_state_actions)
+            else:
+                # [PORT] pop, now on deque
+                self._traverse_states_to_enter(enter_state_path.pop(),
+                        enter_state_path, None, use_history,
+                        go_to_state_actions)
+
+        # If no more explicit enter path instructions, then default to enter
+        # states based on other criteria
+        elif not enter_state_path or len(enter_state_path) == 0:
+            go_to_state_action = { 'action': ENTER_STATE, 'state': state,
+                    'current_state': False }
+            go_to_state_actions.append(go_to_state_action)
+
+            initial_substate_key = state.initial_substate_key \
+                    if hasattr(state, 'initial_substate_key') \
+                    else ''
+            history_state = state.history_state
+
+            # State has concurrent substates. Need to enter all of the substates
+            state_obj = self.get_state(state)
+            if use_history and not state_obj.substates_are_concurrent:
+                self._note_history_dependency(state_obj, history_state)
+
+            if state_obj.substates_are_concurrent:
+                self._traverse_concurrent_states_to_enter(state_obj.substates,
+                        None, use_history, go_to_state_actions)
+
+            # State has substates and we are instructed to recursively follow
+            # the state's history state if it has one.
+            elif state_obj.substates > 0 and history_state and use_history:
+                self._traverse_states_to_enter(history_state, None, None,
+                        use_history, go_to_state_actions)
+
+            # State has an initial substate to enter
+            elif initial_substate_key:
+                initial_substate_obj = \
+                        state_obj.get_substate(initial_substate_key)
+                if initial_substate_obj:
+                    if isinstance(initial_substate_obj, BaseHistoryState):
+                        self._note_history_dependency(
+                                state_obj, state_obj.history_state)
+                        if not use_history:
+                            use_history = initial_substate_obj.is_recursive
+                        initial_substate_obj = initial_substate_obj.state()
+                    self._traverse_states_to_enter(initial_substate_obj,
+                                                   None, None, use_history,
+                                                   go_to_state_actions)
+
+            # Looks like we hit the end of the road. Therefore the state has
+            # now become a current state of the statechart.
+            else:
+                go_to_state_action['current_state'] = True
+
+        # Still have an explicit enter path to follow, so keep moving through
+        # the path.
+        elif len(enter_state_path) > 0:
+            go_to_state_actions.append({ 'action': ENTER_STATE, 'state': state,
+                'current_state': False })
+            next_state = enter_state_path.pop() # [PORT] pop, now on deque
+            self._traverse_states_to_enter(next_state, enter_state_path, None,
+                    use_history, go_to_state_actions)
+
+            # We hit a state that has concurrent substates. Must go through
+            # each of the substates and enter them
+            if state.substates_are_concurrent:
+                self._traverse_concurrent_states_to_enter(state.substates,
+                        next_state, use_history, go_to_state_actions)
+
+    def responds_to(self, event):
+        '''Override as needed.
+
+            Returns True if the named event matches an executable function on
+            any of the statechart's current states or the statechart itself.
+        '''
+        for state in self._live_current_states():
+            while state is not None:
+                if (state.responds_to_event(event)):
+                    return True
+                state = state.parent_state
+
+        # None of the current states can respond. Now check the statechart
+        # itself.
+        if not hasattr(self, event):
+            return False
+
+        return inspect.ismethod(getattr(self, event))
+
+    def try_to_perform(self, event, arg1=None, arg2=None):
+        '''Override as needed.
+
+           Attempts to handle a given event against any of the statechart's
+           current states and the statechart itself. If any current state can
+           handle the event or the statechart itself can handle the event then
+           True is returned, otherwise False is returned.
+
+           Parameters:
+
+           * event {String} what to perform
+           * arg1 {Object} Optional
+           * arg2 {Object} Optional
+
+           Returns True if handled, False if not handled.
+        '''
+        if not self.responds_to(event):
+            return False
+
+        if hasattr(self, event) and inspect.ismethod(getattr(self, event)):
+            result = getattr(self, event)(arg1, arg2)
+            if result != None:
+                return True
+
+        return self.send_event(event, arg1, arg2) is not None
+
+    def invoke_state_method(self, method_name, *args):
+        '''Used to invoke a method on current states. If the method cannot be
+           executed on a current state, then the state's parent states will be
+           tried in order of closest ancestry.
+
+           A few notes:
+
+            1. Calling this is not the same as calling send_event or
+               send_action.  Rather, this should be seen as calling normal
+               methods on a state that will *not* call go_to_state or
+               go_to_history_state.
+            2. A state will only ever be invoked once per call. So if there are
+               two or more current states that have the same parent state, then
+               that parent state will only be invoked once if none of the
+               current states are able to invoke the given method.
+
+            When calling this method, you are able to supply zero ore more
+            arguments that can be pass onto the method called on the states. As
+            an example::
+
+                invoke_state_method('render', context, firstTime)
+
+            The above call will invoke the render method on the current states
+            and supply the context and firstTime arguments to the method.
+
+            Because a statechart can have more than one current state and the
+            method invoked may return a value, the addition of a callback
+            function may be provided in order to handle the returned value for
+            each state. As an example, let's say we want to call a calculate
+            method on the current states where the method will return a value
+            when invoked. We can handle the returned values like so::
+
+                def func(state, result):
+                    # .. handle the result returned from calculate that was
+                    #    invoked on the given state
+
+                invoke_state_method('calculate', value, func)
+
+            If the method invoked does not return a value and a callback
+            function is supplied, then result value will simply be undefined.
+            In all cases, if a callback function is given, it must be the last
+            value supplied to this method.
+
+            invoke_state_method() will return a value if only one state was
+            able to have the given method invoked on it, otherwise no value is
+            returned.
+
+            Parameters:
+
+            * method_name {String} method_name a method name
+            * args {Object...} Optional. any additional arguments
+            * func {Function} Optional. a callback function. Must be the last
+                   value supplied if provided.
+
+            Returns a value if the number of current states is one, otherwise
+            undefined is returned. The value is the result of the method that
+            got invoked on a state.
+        '''
+        if method_name == 'unknown_event':
+            self.statechart_log_error("Cannot invoke method unkown_event")
+            raise Exception("Cannot invoke method unkown_event")
+
+        callback = None
+        checked_states = {}
+        called_states = 0
+
+        # If last arg is a callback function, set it, popping it off args.
+        args = list(args) if args else None
+        if (args and
+                (inspect.isfunction(args[-1]) or inspect.ismethod(args[-1]))):
+            callback = args.pop()
+
+        # Search current states for methods matching method_name, call the
+        # method on each, and fire the callback on each, if it exists.
+        for state in self._live_current_states():
+            while state is not None:
+                if state.full_path in checked_states:
+                    break
+                checked_states[state.full_path] = True
+                method = getattr(state, method_name) \
+                        if hasattr(state, method_name) \
+                        else None
+                if (method
+                        and inspect.ismethod(method)
+                        and not (hasattr(method, 'is_event_handler')
+                            and not method.is_event_handler)):
+                    result = method(*tuple(args if args else []))
+                    if callback is not None:
+                        callback(state, result)
+                    called_states += 1
+                    break
+                state = state.parent_state
+
+        return result if called_states == 1 else None
+
+    def _traverse_concurrent_states_to_enter(self,
+                                             states,
+                                             exclude,
+                                             use_history,
+                                             go_to_state_actions):
+        '''Iterate over all the given concurrent states and enter them.'''
+        for i in range(len(states)):
+            state = states[i]
+            if state is not exclude:
+                self._traverse_states_to_enter(state, None, None, use_history,
+                        go_to_state_actions)
+
+    def _flush_pending_state_transition(self):
+        '''Called by go_to_state to flush a pending state transition at the
+           front of the pending queue.
+        '''
+
+        # [PORT] This, together with the context of the call to this method,
+        #        does not seem necessary. If there are pending transitions to
+        #        flush, flush them. Otherwise, return. So, commenting out.
+        #if not self._pending_state_transitions:
+        #    msg = ("Unable to flush pending state transition. "
+        #           "_pending_state_transitions is invalid.")
+        #    self.statechart_log_error(msg)
+        #    raise Exception(msg)
+
+        pending = None
+
+        if self._pending_state_transitions:
+            pending = self._pending_state_transitions.popleft()
+
+        if not pending:
+            return
+
+        self.go_to_state(state=pending['state'],
+                         from_current_state=pending['from_current_state'],
+                         use_history=pending['use_history'],
+                         context=pending['context'])
+
+    def _flush_pending_sent_events(self):
+        '''Called by send_event to flush a pending actions at the front of the
+           pending queue.
+        '''
+        pending = self._pending_sent_events.pop()
+
+        if not pending:
+            return None
+
+        if 'posted' not in pending and 'future' not in pending:
+            return self.send_event(pending['event'],
+                                   pending['arg1'],
+                                   pending['arg2'])
+
+        # A posted event, or one sent with send_event_future(), queued while
+        # the statechart was busy, is sent as send_event() would, and counted
+        # or resolved once handled.
+        if self._send_event_locked or self.go_to_state_locked:
+            self._pending_sent_events.push(pending['event'], pending)
+            return None
+
+        self._send_event_locked = True
+
+        statechart_handled_event = self._dispatch_event(
+                pending['event'], pending['arg1'], pending['arg2'], {})
+
+        self._send_event_locked = False
+        self._pending_event_was_handled(pending, statechart_handled_event)
+
+        result = self._flush_pending_sent_events()
+
+        return self if statechart_handled_event else (self if result else None)
+
+    def _monitor_is_active_did_change(self, *l):
+
+        if self.monitor_is_active and self.monitor is None:
+            self.monitor = self._create_monitor()
+
+    def dump_flight_recorder(self):
+        '''Returns the records of the flight recorder as text, oldest first,
+           with states named by their full paths, or None if the recorder is
+           off.
+        '''
+        if self.flight_recorder is None:
+            return None
+
+        return self.flight_recorder.dump(self._flight_recorder_state_name)
+
+    def _flight_recorder_state_name(self, state_id):
+        state = self._states[state_id] if state_id < len(self._states) else None
+
+        return state.full_path if state is not None else '<destroyed>'
+
+    def _flight_recorder_did_catch(self, exception):
+        if (self.flight_recorder is None
+                or exception is self._flight_recorder_exception):
+            return
+
+        self._flight_recorder_exception = exception
+        self.flight_recorder_did_catch_exception(exception)
+
+    def flight_recorder_did_catch_exception(self, exception):
+        '''Called with an exception raised by a state's event handler,
+           enter_state or exit_state, once, before it propagates out of the
+           statechart, while the flight recorder is on. Logs the flight
+           recorder as an error.
+        '''
+        self.statechart_log_error(
+                "{0!r} raised, flight recorder:\n{1}".format(
+                        exception, self.dump_flight_recorder()))
+
+    def _monitor_settings_did_change(self, *l):
+        if self.monitor is not None:
+            self.monitor.capacity = self.monitor_capacity
+            self.monitor.sink = self.monitor_sink
+
+    def _create_monitor(self):
+        from kivy_statecharts.debug.monitor_backend import \
+            BaseStatechartMonitor
+
+        return BaseStatechartMonitor(statechart=self,
+                                     capacity=self.monitor_capacity,
+                                     sink=self.monitor_sink)
+
+    def _construct_root_state_class(self):
+        '''Will return a newly constructed root state class. The root state
+           will have substates added to it based on properties found on this
+           state that derive from a State class. For the root state to be
+           successfully built, the following much be met:
+
+           * The root_state_example_class property must be defined with a class
+             that derives from State.
+           * Either the initial_state_key or states_are_concurrent property
+             must be set, but not both.
+           * There must be one or more states that can be added to the root
+             state.
+        '''
+        state_count = 0
+        attrs = {}
+
+        if (inspect.isclass(self.root_state_example_class)
+                and not issubclass(self.root_state_example_class, BaseState)):
+            self._log_statechart_creation_error("Invalid root state example")
+            raise Exception("Invalid root state example")
+
+        if self.states_are_concurrent and self.initial_state_key:
+            msg = "Cannot assign an initial state when states are concurrent"
+            self._log_statechart_creation_error(msg)
+            raise Exception(msg)
+        elif self.states_are_concurrent:
+            attrs['substates_are_concurrent'] = True
+        elif self.initial_state_key:
+            attrs['initial_substate_key'] = self.initial_state_key
+        else:
+            msg = ("Must either define initial state or assign states as "
+                   "concurrent")
+            self._log_statechart_creation_error(msg)
+            raise Exception(msg)
+
+        # Find the states:
+        for key, value in class_members(self, _STATECHART_MEMBERS,
+                                        _is_statechart_state):
+            # [PORT] Don't set this. The root state will only have
+            # initial_substate_key, not initial_state_key.
+            if key != 'initial_state_key':
+                attrs[key] = value
+            state_count += 1
+
+        if state_count == 0:
+            msg = "Must define one or more states"
+            self._log_statechart_creation_error(msg)
+            raise Exception(msg)
+
+        # [PORT] Using python type to make a new class...
+
+        if self.root_state_example_class is None:
+            return type("RootState", (self._root_state_base_class(),), attrs)
+        else:
+            return type("RootState", (self.root_state_example_class, ), attrs)
+
+    def _root_state_base_class(self):
+        '''Returns the state class the root state class is made from, when
+           no root_state_example_class is given.
+        '''
+        return LeanState
+
+    def _log_statechart_creation_error(self, msg):
+
+        # [PORT] Where does Logger.debug() go in Kivy?
+        msg = "Unable to create statechart for {0}: {1}.".format(self, msg)
+        self._log(msg)
+
+    def statechart_log_trace(self, msg):
+        '''Used to log a statechart trace message.'''
+        self._log("{0}: {1}".format(self._statechart_log_prefix(), msg))
+
+    def statechart_log_error(self, msg):
+        '''Used to log a statechart error message.'''
+        # [PORT] ditto?
+        msg = "ERROR {0}: {1}".format(self._statechart_log_prefix(), msg)
+        self._log(msg)
+
+    def statechart_log_warning(self, msg):
+        '''Used to log a statechart warning message.'''
+        if self.suppress_statechart_warnings:
+            return
+        self._log("WARN {0}: {1}".format(self._statechart_log_prefix(), msg))
+
+    def _log(self, msg):
+        Logger.info(msg)
+
+    def _statechart_log_prefix(self):
+        className = self.__class__.__name__
+
+        if self.name is None:
+            return "{0}".format(className)
+        else:
+            return "{0}<{1}".format(className, self.name)
+
+    def details(self):
+        '''Returns a dict containing current detailed information about
+           the statechart. This is primarily used for diagnostic/debugging
+           purposes.
+
+           Detailed information includes:
+
+           * current states
+           * state transtion information
+           * event handling information
+
+           [PORT] This was a property in javascript.
+        '''
+        details = { 'initialized': self.statechart_is_initialized }
+
+        if self.name:
+            details['name'] = getattr(self, 'name')
+
+        if not self.statechart_is_initialized:
+            return details
+
+        details['current-states'] = []
+        for state in self._live_current_states():
+            details['current-states'].append(state.full_path)
+
+        state_transition = {'active': self.go_to_state_active,
+                            'suspended': self.go_to_state_suspended}
+
+        if self._go_to_state_actions:
+            state_transition['transition-sequence'] = []
+
+            # [TODO] Fix in javascript version -- should be _gotoStateActions
+            for action in self._go_to_state_actions:
+                actionName = "enter" \
+                        if action['action'] == ENTER_STATE \
+                        else "exit"
+                actionName = "{0} {1}".format(actionName,
+                                              action['state'].full_path)
+                state_transition['transition-sequence'].append(actionName)
+
+            actionName = "enter" \
+                if self._current_go_to_state_action['action'] == ENTER_STATE \
+                else "exit"
+            actionName = "{0} {1}".format(
+                    actionName,
+                    self._current_go_to_state_action['state'].full_path)
+            state_transition['current-transition'] = actionName
+
+        details['state-transition'] = state_transition
+
+        if self.transition_plan_cache_is_active:
+            details['transition-plan-cache'] = {
+              'size': len(self._transition_plan_cache),
+              'hits': self.transition_plan_cache_hits,
+              'misses': self.transition_plan_cache_misses
+            }
+
+        stats = self.event_queue_stats()
+        if stats['internal']['pushed'] or stats['external']['pushed']:
+            details['event-queues'] = stats
+
+        if self._timers:
+            details['timers'] = {
+              'depth': self.timers_depth(),
+              'next-deadline': self._timers.next_deadline()
+            }
+
+        if self.posted_events_handled or self._posted_events:
+            details['posted-events'] = {
+              'depth': self.posted_events_depth(),
+              'handled': self.posted_events_handled,
+              'coalesced': self._posted_events.coalesced,
+              'latency-max': self.posted_event_latency_max,
+              'latency-mean': self.posted_event_latency_mean()
+            }
+
+        if self._state_handle_event_info:
+            info = self._state_handle_event_info
+            details['handling-event'] = {
+              'state': info['state'].full_path,
+              'event': info['event'],
+              'handler': info['handler']
+            }
+        else:
+            details['handling-event'] = False
+
+        return details
+
+    def to_string_with_details(self):
+        '''Returns a formatted string of detailed information about this
+           statechart.  Useful for diagnostic/debugging purposes.
+
+           See the details() method and the dict it returns.
+        '''
+        return "{0}\n{1}".format(
+                self, self._details_indented(self.details(), 2))
+
+    def _details_indented(self, hash_to_convert, indent):
+        details_indented = ''
+        for key in hash_to_convert:
+            value = hash_to_convert[key]
+            if isinstance(value, list):
+                details_indented += \
+                        self._value_indented(key, value, indent) + "\n";
+            elif isinstance(value, dict):
+                details_indented += "{0}{1}:\n".format(' ' * indent, key)
+                details_indented += self._details_indented(value, indent + 2)
+            else:
+                details_indented += \
+                        "{0}{1}: {2}\n".format(' ' * indent, key, value)
+
+        return details_indented
+
+    def _value_indented(self, key, l, indent):
+        if len(l) == 0:
+            return "{0}{1}: []".format(' ' * indent, key)
+
+        list_as_string = "{0}{1}: [\n".format(' ' * indent, key)
+
+        for item in l:
+            list_as_string += "{0}{1}\n".format(' ' * (indent + 2), item)
+
+        list_as_string += ' ' * indent + "]"
+
+        return list_as_string
+
+# The default name given to a statechart's root state.
+ROOT_STATE_NAME = "__ROOT_STATE__"
+
+# Constants used during the state transition process.
+EXIT_STATE = 0
+ENTER_STATE = 1
+
+# Names of the state classes of each statechart class, found by
+# _construct_root_state_class() when the first instance is initialized.
+_STATECHART_MEMBERS = weakref.WeakKeyDictionary()
+
+def _is_statechart_state(key, value):
+    # [PORT] We don't care about methods here -- States must be classes.
+    if key == 'root_state_example_class' or inspect.ismethod(value):
+        return False
+
+    if isinstance(value, basestring):
+        return is_lazy_substate(key, value)
+
+    return inspect.isclass(value) and issubclass(value, BaseState)
@@ -0,0 +1,501 @@
+# ================================================================================
+# Project: kivy-statecharts - A Statechart Framework for Kivy
+# Copyright: (c) 2010, 2011 Michael Cohen, and contributors.
+# Python Port: Jeff Pittman, ported from SproutCore, SC.Statechart
+# ================================================================================
+
+from kivy_statecharts.core.state import BaseState
+from kivy_statecharts.core.statechart import BaseStatechartManager
+from kivy_statecharts.core.statechart import ENTER_STATE, EXIT_STATE
+from collections import deque
+
+try:
+    import numpy
+except ImportError: #pragma: no cover
+    numpy = None
+
+# Entries of a definition's transition table, besides configuration ids.
+UNKNOWN_TRANSITION = -2
+PYTHON_TRANSITION = -1
+
+class StatechartDefinition(object):
+    '''A statechart definition is built once and then runs any number of
+       statechart instances.
+
+       StatechartManager builds a full tree of states for every statechart.
+       A definition builds one tree instead, and gives each instance created
+       with create_instance() a StatechartInstance record that only holds its
+       current and entered states, its history states and its data. When an
+       instance is sent an event or told to go to a state, its record is
+       loaded into the shared tree, and the statechart handles the request as
+       a StatechartManager would. Loading costs as much as the number of
+       entered states.
+
+       The states of a definition are shared by all instances. So they should
+       keep per instance values in the instance's data, which they reach with
+       self.statechart.instance, rather than on themselves.
+
+       A definition is built from the same arguments as a StatechartManager,
+       e.g.:
+
+           definition = StatechartDefinition(root_state_class=RootState)
+           entity = definition.create_instance(data={'hit_points': 10})
+           entity.send_event('hit')
+
+       Caveats:
+
+       * State transitions may not be suspended with an Async action, since
+         the shared tree moves on to other instances.
+       * Observers of the states' current_substates and entered_substates
+         lists are not notified when an instance is loaded.
+       * Timers, such as those of send_event_after() and the timeouts of
+         states, cannot be scheduled, as they would fire for whichever
+         instance is loaded when they are due.
+
+       An event sent to a whole population of instances can go through
+       broadcast_event(), which handles the event once per configuration
+       (current, entered and history states) when the states involved only
+       have State.transition_to() handlers for it.
+    '''
+
+    def __init__(self, **kwargs):
+        kwargs.setdefault('transition_plan_cache_is_active', True)
+        kwargs.setdefault('defer_state_property_changes', True)
+
+        self.statechart = SharedStatechart(**kwargs)
+        self.statechart.definition = self
+
+        if not self.statechart.statechart_is_initialized:
+            self.statechart.init_statechart()
+
+        self._is_running = False
+        self._pending_runs = deque()
+
+        self._configurations = []
+        self._configuration_ids = {}
+        self._transition_rows = {}
+        self._transition_callbacks = {}
+
+    def create_instance(self, data=None):
+        '''Returns a new StatechartInstance, after entering its initial
+           states.
+        '''
+        instance = StatechartInstance(self, data)
+        self._run(instance, 'go_to_state',
+                  (self.statechart.root_state_instance,))
+        return instance
+
+    def get_state(self, state):
+        return self.statechart.get_state(state)
+
+    def broadcast_event(self, instances, event):
+        '''Sends the event to each of the given instances.
+
+           Where the event is handled by State.transition_to() handlers only,
+           each instance is moved straight to the configuration the event
+           leads to. Then, for each state it exited and entered, in order,
+           the state's state_will_become_exited or entered, exit_state or
+           enter_state and state_did_become_exited or entered methods are
+           called, and the monitor and flight recorder are told, as a state
+           transition would. As that is what costs the most, it is skipped
+           where no state involved overrides those methods, unless the
+           monitor is active. Other instances are sent the event one by one.
+        '''
+        if self._is_running:
+            for instance in instances:
+                instance.send_event(event)
+            return
+
+        configuration_ids = [self.configuration_id(instance)
+                             for instance in instances]
+        next_ids, needs_callbacks = \
+                self.next_configuration_ids(configuration_ids, event)
+
+        if self.statechart.monitor_is_active:
+            needs_callbacks = [True] * len(instances)
+
+        for instance, configuration_id, next_id, callbacks in zip(
+                instances, configuration_ids, next_ids, needs_callbacks):
+            if next_id == PYTHON_TRANSITION:
+                instance.send_event(event)
+                continue
+
+            if next_id != configuration_id:
+                self._set_configuration(instance, next_id)
+
+            if callbacks:
+                self._run(instance, '_call_state_methods',
+                          (self._transition_callbacks[(configuration_id,
+                                                       event)],))
+
+    def configuration_id(self, instance):
+        '''Returns the id of the instance's configuration, the same for all
+           instances in the same current, entered and history states.
+        '''
+        if instance.configuration_id is None:
+            history = frozenset(instance.history.items())
+            key = (instance.current_states, instance.entered_states, history)
+
+            configuration_id = self._configuration_ids.get(key)
+            if configuration_id is None:
+                configuration_id = len(self._configurations)
+                self._configurations.append(key)
+                self._configuration_ids[key] = configuration_id
+
+            instance.configuration_id = configuration_id
+
+        return instance.configuration_id
+
+    def next_configuration_ids(self, configuration_ids, event):
+        '''Looks up the configurations that instances in the given
+           configurations move to when sent the event. Returns the ids of the
+           next configurations, or PYTHON_TRANSITION where the event has to
+           be sent to the instance, and flags telling where states override
+           the methods broadcast_event() calls for the states exited and
+           entered.
+
+           configuration_ids is a list, or a numpy array, in which case
+           numpy arrays are returned.
+        '''
+        is_array = (numpy is not None
+                    and isinstance(configuration_ids, numpy.ndarray))
+
+        next_ids, needs_callbacks = self._transition_row(event)
+
+        unique_ids = (numpy.unique(configuration_ids).tolist()
+                      if is_array
+                      else set(configuration_ids))
+
+        for configuration_id in unique_ids:
+            if (next_ids[configuration_id] == UNKNOWN_TRANSITION
+                    and not self._is_running):
+                self._compile_transition(configuration_id, event)
+
+        if is_array:
+            next_ids = numpy.asarray(next_ids)
+            next_ids[next_ids == UNKNOWN_TRANSITION] = PYTHON_TRANSITION
+            return (next_ids[configuration_ids],
+                    numpy.asarray(needs_callbacks, dtype=bool)[configuration_ids])
+
+        return ([max(next_ids[i], PYTHON_TRANSITION)
+                 for i in configuration_ids],
+                [needs_callbacks[i] for i in configuration_ids])
+
+    def _transition_row(self, event):
+        '''Returns the transition table row of the event, covering every
+           configuration known.
+        '''
+        row = self._transition_rows.get(event)
+
+        if row is None:
+            row = self._transition_rows[event] = ([], [])
+
+        missing = len(self._configurations) - len(row[0])
+        if missing > 0:
+            row[0].extend([UNKNOWN_TRANSITION] * missing)
+            row[1].extend([False] * missing)
+
+        return row
+
+    def _compile_transition(self, configuration_id, event):
+        '''Works out the transition table entry of the event for the
+           configuration, by sending the event to a stand-in instance in that
+           configuration, with the states exited and entered recorded rather
+           than exited and entered.
+        '''
+        sc = self.statechart
+        current_states, entered_states, history = \
+                self._configurations[configuration_id]
+
+        probe = StatechartInstance(self)
+        probe.current_states = current_states
+        probe.entered_states = entered_states
+        probe.history = dict(history)
+
+        self._load_instance(probe)
+
+        next_ids, needs_callbacks = self._transition_row(event)
+
+        for current_state, responder in sc._event_route(event):
+            if not self._handles_with_transition(responder, event):
+                next_ids[configuration_id] = PYTHON_TRANSITION
+                return
+
+        sc._state_method_calls = []
+        self._is_running = True
+
+        try:
+            self._run_instance(probe, 'send_event', (event, None, None))
+            calls = tuple(sc._state_method_calls)
+        finally:
+            sc._state_method_calls = None
+            self._is_running = False
+
+        next_id = self.configuration_id(probe)
+        next_ids, needs_callbacks = self._transition_row(event)
+        next_ids[configuration_id] = next_id
+        needs_callbacks[configuration_id] = any(
+                _overrides_state_methods(state, kind) for kind, state in calls)
+        self._transition_callbacks[(configuration_id, event)] = calls
+
+    def _handles_with_transition(self, state, event):
+        if _overrides_state_method(state, 'try_to_handle_event'):
+            return False
+
+        try:
+            kind, name, handler = state._event_dispatch_table[event]
+        except KeyError:
+            kind, name, handler = state._resolve_event_dispatch(event)
+
+        return getattr(handler, 'transition_target', None) is not None
+
+    def _set_configuration(self, instance, configuration_id):
+        if self.statechart.instance is instance:
+            self._unload_instance()
+
+        current_states, entered_states, history = \
+                self._configurations[configuration_id]
+
+        instance.current_states = current_states
+        instance.entered_states = entered_states
+        instance.history = dict(history)
+        instance.configuration_id = configuration_id
+
+    def transition_table_did_change(self):
+        '''Called when the state tree changes, as transitions found before
+           may no longer hold.
+        '''
+        self._transition_rows = {}
+        self._transition_callbacks = {}
+
+    def _run(self, instance, method, args):
+        '''Calls the statechart method named by method for the instance.
+
+           A state handling an event for one instance may send events to
+           another. Those calls are queued, and run once the current one is
+           done, in which case None is returned.
+        '''
+        if self._is_running:
+            if self.statechart.instance is instance:
+                return getattr(self.statechart, method)(*args)
+
+            self._pending_runs.append((instance, method, args))
+            return None
+
+        self._is_running = True
+
+        try:
+            result = self._run_instance(instance, method, args)
+
+            while self._pending_runs:
+                self._run_instance(*self._pending_runs.popleft())
+        finally:
+            self._is_running = False
+
+        return result
+
+    def _run_instance(self, instance, method, args):
+        sc = self.statechart
+
+        if sc.instance is not instance:
+            self._load_instance(instance)
+
+        try:
+            result = getattr(sc, method)(*args)
+        finally:
+            root_state = sc.root_state_instance
+            instance.current_states = tuple(root_state.current_substates)
+            instance.entered_states = tuple(root_state.entered_substates)
+            instance.configuration_id = None
+
+        if sc.go_to_state_suspended:
+            msg = ("Cannot suspend a state transition of a statechart "
+                   "instance")
+            sc.statechart_log_error(msg)
+            raise Exception(msg)
+
+        return result
+
+    def _unload_instance(self):
+        '''Clears the current and entered states, and the history states, of
+           the instance loaded in the shared state tree.
+        '''
+        sc = self.statechart
+        instance = sc.instance
+
+        if instance is None:
+            return
+
+        for state in instance.history:
+            state.history_state = None
+
+        for state in instance.entered_states:
+            list.__delitem__(state.current_substates, slice(None, None))
+            list.__delitem__(state.entered_substates, slice(None, None))
+            sc._current_state_flags[state.state_id] = 0
+            sc._entered_state_flags[state.state_id] = 0
+
+        sc.instance = None
+
+    def _load_instance(self, instance):
+        '''Makes the shared state tree reflect the instance: its current and
+           entered states, and its history states.
+        '''
+        sc = self.statechart
+        current_state_flags = sc._current_state_flags
+        entered_state_flags = sc._entered_state_flags
+
+        self._unload_instance()
+
+        for state, history_state in instance.history.items():
+            state.history_state = history_state
+
+        # Every current or entered state is listed by its ancestors in the
+        # same order as by the root state.
+        for state in instance.entered_states:
+            entered_state_flags[state.state_id] = 1
+
+            parent_state = state
+            while parent_state is not None:
+                list.append(parent_state.entered_substates, state)
+                parent_state = parent_state.parent_state
+
+        for state in instance.current_states:
+            current_state_flags[state.state_id] = 1
+
+            parent_state = state
+            while parent_state is not None:
+                list.append(parent_state.current_substates, state)
+                parent_state = parent_state.parent_state
+
+        sc.instance = instance
+        sc._current_states()
+
+class StatechartInstance(object):
+    '''One statechart run by a StatechartDefinition. Has the same methods as
+       a StatechartManager for sending events, going to states and checking
+       current states.
+
+       data holds the instance's own values, for its states to use.
+    '''
+
+    __slots__ = ('definition', 'data', 'current_states', 'entered_states',
+                 'history', 'configuration_id', '__weakref__')
+
+    def __init__(self, definition, data=None):
+        self.definition = definition
+        self.data = data if data is not None else {}
+        self.current_states = ()
+        self.entered_states = ()
+        self.history = {}
+        self.configuration_id = None
+
+    def send_event(self, event, arg1=None, arg2=None):
+        return self.definition._run(self, 'send_event', (event, arg1, arg2))
+
+    def send_events(self, events):
+        return self.definition._run(self, 'send_events', (events,))
+
+    def go_to_state(self, state, from_current_state=None, use_history=False,
+                    context=None):
+        return self.definition._run(
+                self, 'go_to_state',
+                (state, from_current_state, use_history, context))
+
+    def go_to_history_state(self, state, from_current_state=None,
+                            recursive=False, context=None):
+        return self.definition._run(
+                self, 'go_to_history_state',
+                (state, from_current_state, recursive, context))
+
+    def state_is_current_state(self, state):
+        return self.definition.get_state(state) in self.current_states
+
+    def state_is_entered(self, state):
+        return self.definition.get_state(state) in self.entered_states
+
+class SharedStatechart(BaseStatechartManager):
+    '''The statechart of a StatechartDefinition. instance is the
+       StatechartInstance whose states are loaded.
+    '''
+
+    def __init__(self, **kwargs):
+        self.instance = None
+        self.definition = None
+        self._state_method_calls = None
+        super(SharedStatechart, self).__init__(**kwargs)
+
+    def go_to_state(self, state, from_current_state=None, use_history=False,
+                    context=None):
+        # Initial states are entered by each instance, not the definition.
+        if self.instance is None:
+            return
+
+        super(SharedStatechart, self).go_to_state(
+                state, from_current_state, use_history, context)
+
+    def _call_enter_state(self, state, context):
+        parent_state = state.parent_state
+
+        if parent_state is not None and not state.is_concurrent_state():
+            self.instance.history[parent_state] = state
+
+        if self._state_method_calls is not None:
+            self._state_method_calls.append((ENTER_STATE, state))
+            return None
+
+        return super(SharedStatechart, self)._call_enter_state(state, context)
+
+    def _call_exit_state(self, state, context):
+        if self._state_method_calls is not None:
+            self._state_method_calls.append((EXIT_STATE, state))
+            return None
+
+        return super(SharedStatechart, self)._call_exit_state(state, context)
+
+    def schedule_timer(self, delay, callback, args=(), state=None):
+        msg = ("Cannot schedule a timer on the statechart of a "
+               "StatechartDefinition. Its states are shared by all instances")
+        self.statechart_log_error(msg)
+        raise Exception(msg)
+
+    def state_tree_did_change(self):
+        super(SharedStatechart, self).state_tree_did_change()
+
+        if self.definition is not None:
+            self.definition.transition_table_did_change()
+
+    def _call_state_methods(self, calls):
+        '''Calls what a state transition calls for each state exited and
+           entered, for the states an instance was moved through by
+           broadcast_event().
+        '''
+        manager = super(SharedStatechart, self)
+
+        for kind, state in calls:
+            if kind == ENTER_STATE:
+                manager._call_enter_state(state, None)
+            else:
+                manager._call_exit_state(state, None)
+
+# The methods broadcast_event() calls for a state exited or entered.
+STATE_METHODS = {
+    ENTER_STATE: ('state_will_become_entered', 'enter_state',
+                  'state_did_become_entered'),
+    EXIT_STATE: ('state_will_become_exited', 'exit_state',
+                 'state_did_become_exited')
+}
+
+def _overrides_state_method(state, name):
+    '''Tells if the state's class overrides the BaseState method named by
+       name.
+    '''
+    method = getattr(type(state), name)
+    return method.__func__ is not getattr(BaseState, name).__func__
+
+def _overrides_state_methods(state, kind):
+    '''Tells if the state's class overrides any of the methods called for it
+       when exited or entered, as given by kind, EXIT_STATE or ENTER_STATE.
+    '''
+    return any(_overrides_state_method(state, name)
+               for name in STATE_METHODS[kind])
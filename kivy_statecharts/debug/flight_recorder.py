@@ -0,0 +1,97 @@
+# ================================================================================
+# Project: kivy-statecharts - A Statechart Framework for Kivy
+# Copyright: (c) 2010, 2011 Michael Cohen, and contributors.
+# Python Port: Jeff Pittman, ported from SproutCore, SC.Statechart
+# ================================================================================
+
+from collections import deque
+
+'''
+  FlightRecorder
+  --------------
+
+  A statechart keeps its latest activity in a FlightRecorder, a ring buffer
+  of a fixed capacity, so that what led up to a failure can be looked at
+  after the fact, without running with trace on. It is on by default, see
+  flight_recorder_capacity, and is dumped to the log when an exception
+  escapes a state's event handler, enter_state or exit_state.
+
+  Each record is a tuple:
+
+      (time, kind, state id, event, duration)
+
+  where kind is one of:
+
+  * ENTERED: the state was entered, and duration is the time its
+    enter_state took
+  * EXITED: the state was exited, and duration is the time its exit_state
+    took
+  * HANDLED: the state handled the event, and duration is the time its
+    handler took
+  * UNHANDLED: no state handled the event
+  * DROPPED: the event was dropped by a full event queue
+
+  The state is kept by its state_id and the event by its name, so a record
+  holds no more than references to existing objects. state id is None, and
+  duration 0, for events no state handled or that were dropped, and event
+  is None for ENTERED and EXITED. Once the buffer is full, each record
+  replaces the oldest one.
+
+  Records are appended as they complete, so the HANDLED record of an event
+  follows those of the states its handler exited and entered; time is when
+  each started.
+
+  The statechart appends records with the append() method of the buffer
+  itself, which costs a fraction of a microsecond.
+'''
+
+ENTERED = 'entered'
+EXITED = 'exited'
+HANDLED = 'handled'
+UNHANDLED = 'unhandled'
+DROPPED = 'dropped'
+
+class FlightRecorder(object):
+    __slots__ = ('capacity', 'append', '_records')
+
+    def __init__(self, capacity):
+        self.capacity = capacity
+        self._records = deque(maxlen=capacity)
+
+        # Records are appended straight to the deque, which is safe from any
+        # thread.
+        self.append = self._records.append
+
+    def __len__(self):
+        return len(self._records)
+
+    def records(self):
+        '''Returns a list of the records, oldest first.'''
+        return list(self._records)
+
+    def clear(self):
+        self._records.clear()
+
+    def dump(self, state_name=None):
+        '''Returns the records as text, one line per record, oldest first.
+           state_name is called with a state id to name its state, by
+           default the id itself.
+        '''
+        lines = []
+
+        for time, kind, state_id, event, duration in list(self._records):
+            if state_id is None:
+                state = '-'
+            elif state_name is not None:
+                state = state_name(state_id)
+            else:
+                state = str(state_id)
+
+            lines.append("{0:.6f} {1:<9} {2:<40} {3:<24} {4:>10.1f}us".format(
+                    time, kind, state, event if event is not None else '-',
+                    duration * 1e6))
+
+        return '\n'.join(lines)
+
+    def __str__(self):
+        return self.dump()
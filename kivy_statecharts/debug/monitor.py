@@ -4,65 +4,46 @@
 # Python Port: Jeff Pittman, ported from SproutCore, SC.Statechart
 # ================================================================================
 
-import collections
+from kivy.clock import Clock
 from kivy.event import EventDispatcher
-from kivy.properties import ListProperty, NumericProperty, ObjectProperty
-from kivy_statecharts.debug.sequence_matcher import StatechartSequenceMatcher
-
-class StatechartMonitor(EventDispatcher):
+from kivy.properties import AliasProperty, ObjectProperty
+from kivy_statecharts.debug.monitor_backend import BaseStatechartMonitor
+
+'''
+  The Kivy adapter of BaseStatechartMonitor, keeping the statechart in a
+  Kivy property, and the length and sequence of the monitor in read-only
+  Kivy properties. See kivy_statecharts.debug.monitor_backend.
+
+  length and sequence are read from the records, so they are always up to
+  date when read. Observers bound to them are notified right away when the
+  monitor is reset, and at most once per frame, by a Clock trigger, as
+  records are appended, so that a state transition does not pay for a
+  property dispatch.
+'''
+
+class StatechartMonitor(BaseStatechartMonitor, EventDispatcher):
     statechart = ObjectProperty(None)
-    length = NumericProperty(0)
-    sequence = ListProperty([])
-
-    def __init__(self, statechart, **kwargs):
-        self.statechart = statechart
-        self.bind(sequence=self._length)
-        self.reset();
-        super(StatechartMonitor, self).__init__(**kwargs)
-
-    def reset(self):
-        #self.propertyWillChange('length') #[PORT]
-        self.sequence = []
-        #self.propertyDidChange('length') #[PORT]
-        self._length() # [PORT] length has changed
-
-    def _length(self, *l):
-        self.length = len(self.sequence)
-
-    def append_entered_state(self, state):
-        #self.propertyWillChange('length') #[PORT]
-        self.sequence.append({ 'action': 'entered', 'state': state })
-        #self.propertyDidChange('length') #[PORT]
-        self._length() # [PORT] length has changed
 
-    def append_exited_state(self, state):
-        #self.propertyWillChange('length') #[PORT]
-        self.sequence.append({ 'action': 'exited', 'state': state })
-        #self.propertyDidChange('length') #[PORT]
-        self._length() # [PORT] length has changed
+    def _get_length(self):
+        return len(self._records)
 
-    def match_sequence(self):
-        return StatechartSequenceMatcher(self) # [PORT] call was ({ statechart_monitor: self }), but __init__ on SSM was changed to take monitor
+    length = AliasProperty(_get_length, None)
 
-    # [PORT] Check how arguments is used in the call.
-    # [PORT] arguments, in javascript. so *arguments was added here
-    # [PORT] Removed check for None arg in expected, as None args are removed
-    def match_entered_states(self, *expected):
-        actual = self.statechart.entered_states()
-        matched = 0
+    def _get_sequence(self):
+        return BaseStatechartMonitor.sequence.fget(self)
 
-        if len(expected) != len(actual):
-            return False
+    sequence = AliasProperty(_get_sequence, None)
 
-        for item in expected:
-            if isinstance(item, basestring):
-                item = self.statechart.get_state(item)
-            if self.statechart.state_is_entered(item) and item.is_entered_state():
-                matched += 1
+    def __init__(self, statechart, capacity=None, sink=None, **kwargs):
+        self._records_did_change_trigger = Clock.create_trigger(
+                self._records_did_change)
+        BaseStatechartMonitor.__init__(self, statechart, capacity, sink)
+        EventDispatcher.__init__(self, **kwargs)
 
-        return matched == len(actual)
+    def _append(self, action, state):
+        BaseStatechartMonitor._append(self, action, state)
+        self._records_did_change_trigger()
 
-    def __str__(self):
-        return '[' + ', '.join(["{0} {1}".format(item['action'],
-                                                 item['state'].full_path)
-                                for item in self.sequence]) + ']'
+    def _records_did_change(self, *l):
+        self.property('length').dispatch(self)
+        self.property('sequence').dispatch(self)
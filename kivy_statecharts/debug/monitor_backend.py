@@ -0,0 +1,180 @@
+# ================================================================================
+# Project: kivy-statecharts - A Statechart Framework for Kivy
+# Copyright: (c) 2010, 2011 Michael Cohen, and contributors.
+# Python Port: Jeff Pittman, ported from SproutCore, SC.Statechart
+# ================================================================================
+
+from collections import deque
+from timeit import default_timer
+from kivy_statecharts.debug.flight_recorder import ENTERED, EXITED
+
+'''
+  BaseStatechartMonitor
+  ---------------------
+
+  The Kivy-free backend of StatechartMonitor, used as the monitor of
+  statecharts on the core. It records each state entered and exited, while
+  the statechart's monitor_is_active is True, as an (action, state) tuple,
+  where action is ENTERED or EXITED, as in the flight recorder.
+
+  A monitor can be given a capacity, the statechart's monitor_capacity, in
+  which case it keeps the latest capacity records only, in a ring buffer,
+  so that monitoring can stay on in long running soak tests. None keeps
+  every record, which tests matching whole sequences of state transitions
+  rely on.
+
+  A monitor can also be given a sink, the statechart's monitor_sink, which
+  is sent every record as it is made, whether or not the ring buffer keeps
+  it. MonitorFileSink writes them to a file, in batches.
+'''
+
+class BaseStatechartMonitor(object):
+    def __init__(self, statechart, capacity=None, sink=None):
+        self.statechart = statechart
+        self.sink = sink
+        self._capacity = capacity
+        self.reset()
+
+    @property
+    def capacity(self):
+        return self._capacity
+
+    @capacity.setter
+    def capacity(self, capacity):
+        '''Resizes the ring buffer, keeping the latest records.'''
+        self._capacity = capacity
+        self._records = deque(self._records,
+                              maxlen=int(capacity) if capacity else None)
+        self._records_did_change()
+
+    @property
+    def length(self):
+        '''The number of records kept.'''
+        return len(self._records)
+
+    @property
+    def sequence(self):
+        '''The records, oldest first, as {'action': action, 'state': state}
+           dicts.
+        '''
+        return [{ 'action': action, 'state': state }
+                for action, state in self._records]
+
+    @property
+    def dropped(self):
+        '''The number of records the ring buffer has dropped since the last
+           reset().
+        '''
+        return self.appended - len(self._records)
+
+    def records(self):
+        '''Returns a list of the (action, state) records, oldest first.'''
+        return list(self._records)
+
+    def reset(self):
+        '''Empties the ring buffer. The sink, if any, is left as it is.'''
+        capacity = self._capacity
+        self._records = deque(maxlen=int(capacity) if capacity else None)
+        self.appended = 0
+        self._records_did_change()
+
+    def _records_did_change(self):
+        '''Called when records are dropped all at once, by reset() or a
+           smaller capacity. Not called for each record appended, which would
+           cost as much as the append.
+        '''
+        pass
+
+    def append_entered_state(self, state):
+        self._append(ENTERED, state)
+
+    def append_exited_state(self, state):
+        self._append(EXITED, state)
+
+    def _append(self, action, state):
+        self._records.append((action, state))
+        self.appended += 1
+
+        if self.sink is not None:
+            self.sink.append(action, state)
+
+    def match_sequence(self):
+        # Imported here, so that the monitor of a statechart can be created
+        # without loading the matcher.
+        from kivy_statecharts.debug.sequence_matcher import \
+            StatechartSequenceMatcher
+
+        return StatechartSequenceMatcher(self) # [PORT] call was ({ statechart_monitor: self }), but __init__ on SSM was changed to take monitor
+
+    # [PORT] Check how arguments is used in the call.
+    # [PORT] arguments, in javascript. so *arguments was added here
+    # [PORT] Removed check for None arg in expected, as None args are removed
+    def match_entered_states(self, *expected):
+        actual = self.statechart.entered_states()
+        matched = 0
+
+        if len(expected) != len(actual):
+            return False
+
+        for item in expected:
+            if isinstance(item, basestring):
+                item = self.statechart.get_state(item)
+            if self.statechart.state_is_entered(item) and item.is_entered_state():
+                matched += 1
+
+        return matched == len(actual)
+
+    def __str__(self):
+        return '[' + ', '.join(["{0} {1}".format(action, state.full_path)
+                                for action, state in self._records]) + ']'
+
+class MonitorFileSink(object):
+    '''A monitor sink writing records to a file, one line per record:
+
+           <time> <action> <full path of the state>
+
+       Records are kept until batch_size of them are pending, then written
+       with one write and flushed, so that the file costs little while a
+       statechart runs. file is a path, opened for appending, or a file
+       object, which close() leaves open.
+    '''
+
+    def __init__(self, file, batch_size=1024):
+        if isinstance(file, basestring):
+            self.file = open(file, 'a')
+            self._owns_file = True
+        else:
+            self.file = file
+            self._owns_file = False
+
+        self.batch_size = batch_size
+        self.written = 0
+        self._pending = []
+
+    def append(self, action, state):
+        pending = self._pending
+        pending.append((default_timer(), action, state))
+
+        if len(pending) >= self.batch_size:
+            self.flush()
+
+    def flush(self):
+        '''Writes the pending records.'''
+        pending, self._pending = self._pending, []
+
+        if pending:
+            self.file.write(''.join(
+                    ["{0:.6f} {1} {2}\n".format(time, action, state.full_path)
+                     for time, action, state in pending]))
+            self.written += len(pending)
+
+        self.file.flush()
+
+    def close(self):
+        '''Writes the pending records, and closes the file if it was opened
+           from a path.
+        '''
+        self.flush()
+
+        if self._owns_file:
+            self.file.close()
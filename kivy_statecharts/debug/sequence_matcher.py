@@ -4,13 +4,12 @@
 # Python Port: Jeff Pittman, ported from SproutCore, SC.Statechart
 # ================================================================================
 
-from kivy_statecharts.system.state import State
-from kivy.properties import BooleanProperty
+from kivy_statecharts.core.state import BaseState
 
 MISMATCH = {}
 
 class StatechartSequenceMatcher:
-    match = BooleanProperty(False)
+    match = False
 
     def __init__(self, statechart_monitor):
         self.statechart_monitor = statechart_monitor
@@ -24,12 +23,15 @@ class StatechartSequenceMatcher:
     def end(self):
         self.end_sequence()
 
+        # The (action, state) records of the monitor, read once per match.
+        self._records = self.statechart_monitor.records()
+
         if len(self._stack) > 0:  # pragma: no cover
             raise "Can not match sequence. Sequence matcher has been left in an invalid state"
 
         result = False
 
-        if self._match_sequence(self._start, 0) == len(self.statechart_monitor.sequence):
+        if self._match_sequence(self._start, 0) == len(self._records):
             result = True
 
         self.match = result
@@ -83,7 +85,7 @@ class StatechartSequenceMatcher:
     def _match_sequence(self, sequence, marker):
         values = sequence['values']
 
-        if marker > len(self.statechart_monitor.sequence):
+        if marker > len(self._records):
             return MISMATCH
 
         # [PORT] values is hierarchical: {values: [{ values: [{ values: ...
@@ -95,10 +97,8 @@ class StatechartSequenceMatcher:
                         marker = self._match_sequence(val, marker)
                     elif val['token_type'] == 'concurrent':
                         marker = self._match_concurrent(val, marker)
-                elif ((marker > len(self.statechart_monitor.sequence)-1) or
-                      not self._match_items(
-                             val,
-                             self.statechart_monitor.sequence[marker])):
+                elif ((marker > len(self._records)-1) or
+                      not self._match_items(val, self._records[marker])):
                     return MISMATCH
                 else:
                     marker += 1
@@ -128,9 +128,8 @@ class StatechartSequenceMatcher:
         values = list(concurrent['values']) # copy
         temp_marker = marker
         match = False
-        monitor = self.statechart_monitor
 
-        if marker > len(monitor.sequence):
+        if marker > len(self._records):
             return MISMATCH
 
         # values is hierarchical, so that it is: {values: [{ values: [{ values: ... , token_type: 'sequence'}
@@ -143,10 +142,8 @@ class StatechartSequenceMatcher:
                             temp_marker = self._match_sequence(val, marker)
                         elif val['token_type'] == 'concurrent':
                             temp_marker = self._match_concurrent(val, marker)
-                    elif ((marker > len(self.statechart_monitor.sequence)-1) or
-                          not self._match_items(
-                                 val,
-                                 monitor.sequence[marker])):
+                    elif ((marker > len(self._records)-1) or
+                          not self._match_items(val, self._records[marker])):
                         temp_marker = MISMATCH
                     else:
                         temp_marker = marker + 1
@@ -163,17 +160,19 @@ class StatechartSequenceMatcher:
 
         return marker
 
-    def _match_items(self, matcher_item, monitor_item):
-        if matcher_item is None or monitor_item is None:  #pragma: no cover
+    def _match_items(self, matcher_item, monitor_record):
+        if matcher_item is None or monitor_record is None:  #pragma: no cover
             return False
 
-        if 'action' in matcher_item and matcher_item['action'] != monitor_item['action']:
+        action, state = monitor_record
+
+        if 'action' in matcher_item and matcher_item['action'] != action:
             return False
 
-        if 'state' in matcher_item and isinstance(matcher_item['state'], State) and matcher_item['state'] is monitor_item['state']:
+        if 'state' in matcher_item and isinstance(matcher_item['state'], BaseState) and matcher_item['state'] is state:
             return True
 
-        if 'state' in matcher_item and matcher_item['state'] == monitor_item['state'].name:
+        if 'state' in matcher_item and matcher_item['state'] == state.name:
             return True
 
         return False
@@ -0,0 +1,192 @@
+# ================================================================================
+# Project: kivy-statecharts - A Statechart Framework for Kivy
+# Copyright: (c) 2010, 2011 Michael Cohen, and contributors.
+# Python Port: Jeff Pittman, ported from SproutCore, SC.Statechart
+# ================================================================================
+
+from timeit import default_timer
+
+import gc
+
+'''
+  StartupProfile
+  --------------
+
+  With startup_profiler_is_active set, a statechart profiles its
+  init_statechart() in a StartupProfile, kept as its startup_profile. It
+  records the wall time and allocations of each phase of the start up:
+
+  * construct root state class: _construct_root_state_class(), when the
+    root state is built from the statechart's states
+  * create root state: creating the root state instance
+  * init state: the recursive init_state() of the whole state tree
+  * register paths: registering each state with its parent states, and
+    indexing its path, within init state
+  * full path: the full_path updates of State, as its name and parent state
+    are set, within create root state and init state
+  * go to initial states: entering the initial states
+
+  and of each state subtree, i.e. the init_state() of a state, including
+  its substates.
+
+  Allocations are counted as the net number of objects tracked by the
+  garbage collector that were created, which the collector counts in its
+  youngest generation. Collections are paused while profiling, so that the
+  count is not reset.
+'''
+
+class StartupProfile(object):
+    def __init__(self):
+        # Per phase: [calls, seconds, allocations], in the order first seen.
+        self.phases = {}
+        self._phase_order = []
+
+        # Per profiled state: (state path, states in the subtree, seconds,
+        # own seconds, allocations), in the order the subtrees completed.
+        self.subtrees = []
+
+        # [state, start time, start allocations, states, seconds of the
+        # child subtrees] for the subtrees being initialized.
+        self._stack = []
+        self._subtree_states = []
+
+        self.seconds = 0
+        self.allocations = 0
+        self._start = None
+        self._gc_was_enabled = False
+
+    def start(self):
+        self._gc_was_enabled = gc.isenabled()
+        gc.disable()
+        self._start = (default_timer(), gc.get_count()[0])
+
+    def stop(self):
+        start_time, start_allocations = self._start
+        self.seconds = default_timer() - start_time
+        self.allocations = gc.get_count()[0] - start_allocations
+
+        if self._gc_was_enabled:
+            gc.enable()
+
+        # States are named once the tree is built, so that profiling does not
+        # compute paths of its own.
+        self.subtrees = [(state.full_path,) + record
+                         for state, record in self._subtree_states]
+        self._subtree_states = []
+
+    def begin_phase(self):
+        '''Returns a token to pass to end_phase().'''
+        return (default_timer(), gc.get_count()[0])
+
+    def end_phase(self, name, token):
+        seconds = default_timer() - token[0]
+        allocations = gc.get_count()[0] - token[1]
+
+        phase = self.phases.get(name)
+        if phase is None:
+            phase = self.phases[name] = [0, 0, 0]
+            self._phase_order.append(name)
+
+        phase[0] += 1
+        phase[1] += seconds
+        phase[2] += allocations
+
+    def begin_subtree(self, state):
+        self._stack.append([state, default_timer(), gc.get_count()[0], 1, 0])
+
+    def end_subtree(self, state):
+        state, start_time, start_allocations, states, child_seconds = \
+                self._stack.pop()
+
+        seconds = default_timer() - start_time
+        allocations = gc.get_count()[0] - start_allocations
+
+        self._subtree_states.append(
+                (state, (states, seconds, seconds - child_seconds,
+                         allocations)))
+
+        if self._stack:
+            parent = self._stack[-1]
+            parent[3] += states
+            parent[4] += seconds
+
+    def as_dict(self):
+        '''Returns the profile as a dict, with phases and subtrees sorted by
+           time, longest first.
+        '''
+        phases = [{'phase': name,
+                   'calls': self.phases[name][0],
+                   'seconds': self.phases[name][1],
+                   'allocations': self.phases[name][2]}
+                  for name in self._phase_order]
+        phases.sort(key=lambda phase: phase['seconds'], reverse=True)
+
+        subtrees = [{'state': path,
+                     'states': states,
+                     'seconds': seconds,
+                     'own-seconds': own_seconds,
+                     'allocations': allocations}
+                    for path, states, seconds, own_seconds, allocations
+                    in self.subtrees]
+        subtrees.sort(key=lambda subtree: subtree['seconds'], reverse=True)
+
+        return {
+          'seconds': self.seconds,
+          'allocations': self.allocations,
+          'states': len(self.subtrees),
+          'phases': phases,
+          'subtrees': subtrees
+        }
+
+    def report(self, limit=20):
+        '''Returns the profile as text: the phases, then the limit slowest
+           subtrees, sorted by time.
+        '''
+        profile = self.as_dict()
+
+        lines = ["Startup profile: {0:.4f}s, {1} allocations, "
+                 "{2} states".format(profile['seconds'],
+                                     profile['allocations'],
+                                     profile['states']),
+                 "",
+                 "{0:<40} {1:>8} {2:>10} {3:>12}".format(
+                         'phase', 'calls', 'seconds', 'allocations')]
+
+        for phase in profile['phases']:
+            lines.append("{0:<40} {1:>8} {2:>10.4f} {3:>12}".format(
+                    phase['phase'], phase['calls'], phase['seconds'],
+                    phase['allocations']))
+
+        lines.extend(["",
+                      "{0:<40} {1:>8} {2:>10} {3:>10} {4:>12}".format(
+                              'subtree', 'states', 'seconds', 'own',
+                              'allocations')])
+
+        for subtree in profile['subtrees'][:limit]:
+            lines.append("{0:<40} {1:>8} {2:>10.4f} {3:>10.4f} {4:>12}".format(
+                    subtree['state'], subtree['states'], subtree['seconds'],
+                    subtree['own-seconds'], subtree['allocations']))
+
+        return '\n'.join(lines)
+
+    def __str__(self):
+        return self.report()
+
+class ProfilePhase(object):
+    '''A context manager profiling its block as the phase name of profile, a
+       StartupProfile, or doing nothing if profile is None.
+    '''
+
+    __slots__ = ('profile', 'name', 'token')
+
+    def __init__(self, profile, name):
+        self.profile = profile
+        self.name = name
+
+    def __enter__(self):
+        if self.profile is not None:
+            self.token = self.profile.begin_phase()
+
+    def __exit__(self, *exc_info):
+        if self.profile is not None:
+            self.profile.end_phase(self.name, self.token)
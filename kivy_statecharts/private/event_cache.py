@@ -0,0 +1,58 @@
+# ================================================================================
+# Project: kivy-statecharts - A Statechart Framework for Kivy
+# Copyright: (c) 2010, 2011 Michael Cohen, and contributors.
+# Python Port: Jeff Pittman, ported from SproutCore, SC.Statechart
+# ================================================================================
+
+'''
+  EventCache
+  ----------
+
+  The statechart remembers how each event is routed to the current states
+  in EventCaches. Event names can be open ended, as with regular expression
+  event handlers, so the caches are bounded, and drop the event names least
+  recently used.
+
+  Instead of reordering an OrderedDict on every hit, which would cost more
+  than the lookup it saves on the path of every sent event, an EventCache
+  keeps two generations of plain dicts. Values are set in the young
+  generation. Once it holds size event names, it becomes the old generation,
+  and the previous old generation is dropped. A value found in the old
+  generation is moved back to the young one. A cache so holds between size
+  and twice size of the event names most recently used.
+'''
+
+class EventCache(object):
+    __slots__ = ('size', '_young', '_old')
+
+    def __init__(self, size):
+        self.size = size
+        self._young = {}
+        self._old = {}
+
+    def __len__(self):
+        return len(self._young) + len(self._old)
+
+    def get(self, event):
+        '''Returns the value for the event, or None.'''
+        value = self._young.get(event)
+
+        if value is None:
+            value = self._old.pop(event, None)
+            if value is not None:
+                self.set(event, value)
+
+        return value
+
+    def set(self, event, value):
+        young = self._young
+
+        if len(young) >= self.size:
+            self._old = young
+            young = self._young = {}
+
+        young[event] = value
+
+    def clear(self):
+        self._young = {}
+        self._old = {}
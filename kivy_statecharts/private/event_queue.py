@@ -0,0 +1,205 @@
+# ================================================================================
+# Project: kivy-statecharts - A Statechart Framework for Kivy
+# Copyright: (c) 2010, 2011 Michael Cohen, and contributors.
+# Python Port: Jeff Pittman, ported from SproutCore, SC.Statechart
+# ================================================================================
+
+from collections import deque
+
+import bisect, threading
+
+'''
+  EventQueue
+  ----------
+
+  The statechart queues events in two EventQueues, as SCXML does: an
+  internal queue for events sent by states while the statechart is busy,
+  and an external queue for events posted from other threads. Internal
+  events are always handled before the next external event.
+
+  Events are handled first in first out, except that events with a higher
+  priority, as given by the priorities dict of event names, go first.
+
+  A queue can be given a capacity. When it is full, the overflow policy
+  decides what happens to an event pushed onto it:
+
+  * DROP_OLDEST drops the oldest of the events with the lowest priority, if
+    that priority is not higher than the pushed event's. Otherwise the
+    pushed event is dropped.
+  * DROP_NEWEST drops the pushed event.
+  * COALESCE replaces the latest queued event with the same name by the
+    pushed event, keeping its place in the queue, and otherwise behaves as
+    DROP_OLDEST.
+
+  Events can also be coalesced whether or not the queue is full, by pushing
+  them with a coalescing key: an event pushed with the same key as a queued
+  event replaces it, keeping its place in the queue.
+
+  A queue's dropped_event, if set, is called with the name and the item of
+  each event it drops. Its merge_items, if set, is called with the queued
+  item and the pushed item of each event coalesced, and returns the item to
+  keep, by default the pushed item.
+'''
+
+DROP_OLDEST = 'drop_oldest'
+DROP_NEWEST = 'drop_newest'
+COALESCE = 'coalesce'
+
+OVERFLOW_POLICIES = [DROP_OLDEST, DROP_NEWEST, COALESCE]
+
+class EventQueue(object):
+    '''A queue of events with priorities and an optional capacity. See the
+       module documentation.
+
+       Each queued event is kept as an [event name, item, coalescing key]
+       slot, where item is whatever the statechart pushed for the event,
+       returned by pop().
+    '''
+
+    def __init__(self, capacity=None, overflow=DROP_OLDEST, priorities=None,
+                 thread_safe=False):
+        self.capacity = capacity
+        self.overflow = overflow
+        self.priorities = priorities if priorities is not None else {}
+
+        self._lock = threading.Lock() if thread_safe else None
+
+        # Slots by priority, and the priorities with slots, as negated values
+        # kept sorted so that the highest priority comes first.
+        self._queues = {}
+        self._levels = []
+        self._length = 0
+
+        # The slot most recently queued for each event name, for coalescing
+        # on overflow, and the slot queued for each coalescing key.
+        self._latest = {}
+        self._coalescing = {}
+
+        self.dropped_event = None
+        self.merge_items = None
+
+        self.pushed = 0
+        self.dropped = 0
+        self.coalesced = 0
+        self.max_depth = 0
+
+    def __len__(self):
+        return self._length
+
+    def push(self, event, item, key=None):
+        '''Queues item for the event. If a hashable key is given, and an
+           event with the same key is queued, item replaces that event's
+           item instead. Returns False if the event was dropped.
+        '''
+        if self._lock is None:
+            return self._push(event, item, key)
+
+        with self._lock:
+            return self._push(event, item, key)
+
+    def pop(self):
+        '''Returns the item of the next event, or None if the queue is
+           empty.
+        '''
+        if self._lock is None:
+            return self._pop()
+
+        with self._lock:
+            return self._pop()
+
+    def stats(self):
+        return {
+          'depth': self._length,
+          'max-depth': self.max_depth,
+          'pushed': self.pushed,
+          'dropped': self.dropped,
+          'coalesced': self.coalesced
+        }
+
+    def _push(self, event, item, key):
+        self.pushed += 1
+        priority = self.priorities.get(event, 0)
+
+        if key is not None:
+            slot = self._coalescing.get(key)
+            if slot is not None:
+                self._replace_slot(slot, item, key)
+                return True
+
+        if self.capacity is not None and self._length >= self.capacity:
+            if self.overflow == COALESCE:
+                slot = self._latest.get(event)
+                if slot is not None:
+                    self._replace_slot(slot, item, key)
+                    return True
+
+            if (self.overflow == DROP_NEWEST
+                    or not self._levels
+                    or -self._levels[-1] > priority):
+                self.dropped += 1
+                if self.dropped_event is not None:
+                    self.dropped_event(event, item)
+                return False
+
+            dropped = self._remove_slot(-self._levels[-1])
+            self.dropped += 1
+            if self.dropped_event is not None:
+                self.dropped_event(dropped[0], dropped[1])
+
+        slot = [event, item, key]
+
+        queue = self._queues.get(priority)
+        if queue is None:
+            queue = self._queues[priority] = deque()
+            bisect.insort(self._levels, -priority)
+
+        queue.append(slot)
+        self._latest[event] = slot
+        if key is not None:
+            self._coalescing[key] = slot
+        self._length += 1
+
+        if self._length > self.max_depth:
+            self.max_depth = self._length
+
+        return True
+
+    def _pop(self):
+        if not self._levels:
+            return None
+
+        return self._remove_slot(-self._levels[0])[1]
+
+    def _remove_slot(self, priority):
+        '''Removes and returns the oldest slot of the given priority.'''
+        queue = self._queues[priority]
+        slot = queue.popleft()
+
+        if not queue:
+            del self._queues[priority]
+            self._levels.remove(-priority)
+
+        if self._latest.get(slot[0]) is slot:
+            del self._latest[slot[0]]
+
+        if slot[2] is not None and self._coalescing.get(slot[2]) is slot:
+            del self._coalescing[slot[2]]
+
+        self._length -= 1
+
+        return slot
+
+    def _replace_slot(self, slot, item, key):
+        '''Coalesces an event into a queued slot.'''
+        if slot[2] is not None and self._coalescing.get(slot[2]) is slot:
+            del self._coalescing[slot[2]]
+
+        if self.merge_items is not None:
+            item = self.merge_items(slot[1], item)
+
+        slot[1] = item
+        slot[2] = key
+        if key is not None:
+            self._coalescing[key] = slot
+
+        self.coalesced += 1
@@ -4,8 +4,7 @@
 # Python Port: Jeff Pittman, ported from SproutCore, SC.Statechart
 # ================================================================================
 
-from kivy.event import EventDispatcher
-from kivy.properties import ListProperty, StringProperty, ObjectProperty
+from collections import OrderedDict
 
 '''
   Authorship Details
@@ -71,12 +70,24 @@ from kivy.properties import ListProperty, StringProperty, ObjectProperty
     foo.bar~mah
 
     foo~bar.mah
+
+  Each expression is compiled once into a program, a tuple of the steps
+  matching the expression's parts from the last to the first, kept in a
+  module-level least recently used cache shared by all matchers.
 '''
-class StatePathMatcher(EventDispatcher):
-    tokens = ListProperty([])
-    '''A parsed set of tokens from the matcher's given expression.'''
 
-    last_part = StringProperty(None)
+# How many compiled expressions are kept.
+EXPRESSION_CACHE_SIZE = 512
+
+# Program steps: (_BASIC, name), (_EXPAND, start, end) and (_THIS,).
+_BASIC = 0
+_EXPAND = 1
+_THIS = 2
+
+_compiled_expressions = OrderedDict()
+
+class StatePathMatcher(object):
+    __slots__ = ('state', 'expression', 'last_part', '_program')
 
     def __init__(self, state=None, expression=None):
         self.state = state
@@ -89,58 +100,11 @@ class StatePathMatcher(EventDispatcher):
            given state paths.
         '''
 
-        self.bind(tokens=self._last_part)
-
-        self._parse_expression()
-
-    def _parse_expression(self):
-        '''Will parse the matcher's given expession by creating tokens and
-           chaining them together.
-
-           .. Note:: Because the DSL for state path expressions is tiny, a
-                     simple hand-crafted parser is being used. However, if the
-                     DSL becomes any more complex, then it will probably be
-                     necessary to refactor the logic in order follow a more
-                     conventional type of parser.
+        self._program, self.last_part = compile_expression(expression)
+        '''The last part of the expression. So if the expression is
+           'foo.bar' or 'foo~bar' then 'bar' is the last part in both cases.
+           If the expression is 'self' then 'self' is the last part.
         '''
-        parts = self.expression.split('.') if self.expression else []
-        tokens = []
-
-        index = 0
-        for part in parts:
-            if '~' in part:
-                part = part.split('~')
-                if len(part) > 2:
-                    raise Exception("Invalid use of '~' at part {0}".format(index))
-                token = _ExpandToken(start=part[0], end=part[1])
-            elif part == 'self':
-                if len(tokens) > 0:
-                    raise Exception("Invalid use of 'self' at part {0}".format(index))
-                token = _ThisToken()
-            else:
-                token = _BasicToken(value=part)
-
-            token.owning_matcher = self
-            tokens.append(token)
-            index += 1
-
-        self.tokens = tokens
-
-        stack = list(tokens)
-        chain = stack.pop() if stack else None
-        self._chain = chain
-        token = stack.pop() if stack else None
-        while token:
-            chain.next_token = token
-            chain = token
-            token = stack.pop() if stack else None
-
-    def _last_part(self, *l):
-        '''Returns the last part of the expression. So if the
-           expression is 'foo.bar' or 'foo~bar' then 'bar' is returned in both
-           cases. If the expression is 'self' then 'self' is returned.
-        '''
-        self.last_part = self.tokens[-1].last_part if self.tokens else None
 
     def match(self, path):
         '''Will make a state path against this matcher's expression.
@@ -150,140 +114,104 @@ class StatePathMatcher(EventDispatcher):
 
            Return True if there is a match, otherwise False.
         '''
+        # An empty expression has nothing to match with.
+        if not self._program:
+            raise Exception("Cannot match with an empty expression")
+
         # Bug out if path is None or is '' or if path is not a string.
-        if path is None or not path or not isinstance(path, basestring):
+        if not path or not isinstance(path, basestring):
             return False
 
-        # When this matcher starts a match run, set self._stack. For example,
-        # for path A.B.C, the stack witll be [ A, B, C ]. The related _pop method
-        # will pop them off as C, then B, then A, during match operations.
-        #
-        # Set self._stack to None if path is None.
-        #
-        self._stack = path.split('.') if path else None
-
-        # self._chain is the head of a linked-list of chained tokens. Kick off a
-        # traversal of the tokens by firing on the head.
-        return self._chain.match()
-
-    def _pop(self):
-        self._last_popped = self._stack.pop() if self._stack else None
-        return self._last_popped
-
-class _Token(EventDispatcher):
-    '''Base class used to represent a token the expression.'''
-
-    last_part = StringProperty(None)
-    '''The last part the token represents, which is either a valid state
-       name or representation of a state
-    '''
-
-    owning_matcher = ObjectProperty(None)
-    '''The state path matcher that owns this token.'''
-
-    next_token = ObjectProperty(None)
-    '''The next token in the matching chain.'''
-
-    def __init__(self, token_type):
-        self.token_type = token_type
-        super(_Token, self).__init__()
-
-    def match(self):  #pragma: no cover
-        '''Used to match against what is currently on the owning_matcher's
-           current path stack
-        '''
-        raise NotImplementedError
-
-class _BasicToken(_Token):
-    '''Represents a basic name of a state in the expression. Ex 'foo'.
+        return _run_program(self._program, path.split('.'), self.state)
 
-       A match is true if the matcher's current path stack is popped and the
-       result matches this token's value.
+def compile_expression(expression):
+    '''Returns the program and the last part of a state path match
+       expression, compiled once and then taken from a least recently used
+       cache.
     '''
+    compiled = _compiled_expressions.pop(expression, None)
 
-    value = StringProperty(None)
-
-    def __init__(self, value):
-        self.bind(value=self._last_part)
-
-        self.value = value
-
-        super(_BasicToken, self).__init__(token_type='basic')
+    if compiled is None:
+        compiled = _compile_expression(expression)
 
-    def _last_part(self, *l):
-        self.last_part = self.value
+        if len(_compiled_expressions) >= EXPRESSION_CACHE_SIZE:
+            _compiled_expressions.popitem(last=False)
 
-    def match(self):
-        # Pop the next available part of the owning_matcher's expression part stack.
-        # So that if we start with path A.B.C, we will first pop C, then B, then A.
-        part = self.owning_matcher._pop() if self.owning_matcher else None
+    _compiled_expressions[expression] = compiled
 
-        # This is a bottom-up procedure, working from leaf toward root, such that
-        # if value of this token doesn't match the last popped expression part, we
-        # return back up the chain with False.
-        if self.value != part:
-            return False
-
-        # self.value matches part, but if there are other parts, try to match them.
-        return self.next_token.match() if self.next_token else True
+    return compiled
 
-class _ExpandToken(_Token):
-    '''Represents an expanding path based on the use of the '<start>~<end>'
-       syntax.  <start> represents the start and <end> represents the end.
+def _compile_expression(expression):
+    '''Will parse an expression into its program, the steps for its parts in
+       reverse order, as matching works from the end of a path to its start.
 
-       A match is True if the matcher's current path stack is first popped to
-       match <end> and eventually is popped to match <start>. If neither <end>
-       nor <start> are satisfied then False is returned.
+       .. Note:: Because the DSL for state path expressions is tiny, a
+                 simple hand-crafted parser is being used. However, if the
+                 DSL becomes any more complex, then it will probably be
+                 necessary to refactor the logic in order follow a more
+                 conventional type of parser.
     '''
-
-    start = StringProperty(None)
-    end = StringProperty(None)
-
-    def __init__(self, start=None, end=None):
-        self.bind(end=self._last_part)
-
-        self.start = start
-        self.end = end
-
-        super(_ExpandToken, self).__init__(token_type='expand')
-
-    def _last_part(self, *l):
-        self.last_part = self.end
-
-    def match(self):
-        part = self.owning_matcher._pop() if self.owning_matcher else None
-        if part != self.end:
-            return False
-
-        while part:
-            if part == self.start:
-                return self.next_token.match() if self.next_token else True
-            part = self.owning_matcher._pop() if self.owning_matcher else None
-
-        return False
-
-class _ThisToken(_Token):
-    '''Represents a this token, which is used to represent the owning_matcher's
-       `state` property.
-
-       A match is true if the last path part popped from the owning_matcher's
-       current path stack is an immediate substate of the state this token
-       represents.
+    parts = expression.split('.') if expression else []
+    steps = []
+    last_part = None
+
+    for index, part in enumerate(parts):
+        if '~' in part:
+            part = part.split('~')
+            if len(part) > 2:
+                raise Exception("Invalid use of '~' at part {0}".format(index))
+            steps.append((_EXPAND, part[0], part[1]))
+            last_part = part[1]
+        elif part == 'self':
+            if len(steps) > 0:
+                raise Exception("Invalid use of 'self' at part {0}".format(index))
+            steps.append((_THIS,))
+            last_part = 'self'
+        else:
+            steps.append((_BASIC, part))
+            last_part = part
+
+    steps.reverse()
+
+    return tuple(steps), last_part
+
+def _run_program(program, parts, state):
+    '''Matches a compiled expression against the parts of a path, which are
+       popped off as C, then B, then A for path A.B.C.
     '''
+    last_popped = None
 
-    def __init__(self):
-        self.last_part = 'self'
+    for step in program:
+        kind = step[0]
 
-        super(_ThisToken, self).__init__(token_type='this')
+        if kind == _THIS:
+            # A match is true if the last path part popped is an immediate
+            # substate of the matcher's state, and no parts are left.
+            if last_popped is None or parts:
+                return False
 
-    def match(self):
-        part = self.owning_matcher._last_popped
+            for substate in state.substates:
+                if substate.name == last_popped:
+                    return True
 
-        if part is None or len(self.owning_matcher._stack) != 0:
             return False
 
-        for substate in self.owning_matcher.state.substates:
-            if substate.name == part:
-                return True
+        part = last_popped = parts.pop() if parts else None
+
+        if kind == _BASIC:
+            if step[1] != part:
+                return False
+        else:
+            # An expansion matches <end>, then pops parts until the nearest
+            # <start>.
+            if part != step[2]:
+                return False
+
+            while part:
+                if part == step[1]:
+                    break
+                part = last_popped = parts.pop() if parts else None
+            else:
+                return False
 
-        return False
+    return True
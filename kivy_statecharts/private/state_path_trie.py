@@ -0,0 +1,246 @@
+# ================================================================================
+# Project: kivy-statecharts - A Statechart Framework for Kivy
+# Copyright: (c) 2010, 2011 Michael Cohen, and contributors.
+# Python Port: Jeff Pittman, ported from SproutCore, SC.Statechart
+# ================================================================================
+
+from kivy_statecharts.private.state_path_matcher import _BASIC, _THIS
+
+'''
+  StatePathTrie
+  -------------
+
+  The root state of a state tree indexes the paths of all the states below
+  it in one StatePathTrie, a trie of the path segments in reverse order: the
+  trie's first level holds the names of the states, the second level the
+  names of their parent states, and so on, up to the children of the root
+  state. A state is kept at the node its whole path leads to.
+
+  Since a state path match expression is matched from the end of a path to
+  its start, a compiled expression, see StatePathMatcher, is resolved by
+  walking the trie, one level per path part. get_substate() of any state
+  then keeps the states found below that state.
+
+  So that neither step walks whole subtrees of the trie, each node also
+  indexes the nodes below it by name, which '~' expansions use to jump to
+  the nearest nodes named by their start, and the states kept at or below
+  it, which are then checked for being below the state looked up from. Both
+  indexes cost as much memory as the trie times the depth of the paths,
+  which are short, and are updated as states are added and removed.
+'''
+
+class _Node(object):
+    __slots__ = ('children', 'state', 'order', 'parent', 'segment', 'depth',
+                 'named', 'states')
+
+    def __init__(self, parent=None, segment=None):
+        self.children = None
+        self.state = None
+        self.order = None
+        self.parent = parent
+        self.segment = segment
+        self.depth = parent.depth + 1 if parent is not None else 0
+
+        # The nodes below this one by segment, and the nodes of the states
+        # kept at or below it by state.
+        self.named = None
+        self.states = None
+
+class StatePathTrie(object):
+    __slots__ = ('_root', '_added')
+
+    def __init__(self):
+        self._root = _Node()
+        self._added = 0
+
+    def add(self, state, segments):
+        '''Indexes a state by its path segments, the names from the state up
+           to, but not including, the root state.
+        '''
+        node = self._root
+        path = []
+
+        for segment in segments:
+            children = node.children
+            if children is None:
+                children = node.children = {}
+
+            child = children.get(segment)
+            if child is None:
+                child = children[segment] = _Node(node, segment)
+
+                for ancestor in path:
+                    if ancestor.named is None:
+                        ancestor.named = {}
+                    ancestor.named.setdefault(segment, set()).add(child)
+
+            node = child
+            path.append(node)
+
+        replaced = node.state
+        node.state = state
+        node.order = self._added
+        self._added += 1
+
+        for ancestor in path:
+            if ancestor.states is None:
+                ancestor.states = {}
+            elif replaced is not None:
+                ancestor.states.pop(replaced, None)
+            ancestor.states[state] = node
+
+    def remove(self, state, segments):
+        '''Removes a state indexed by add(), and the nodes left empty.'''
+        nodes = [self._root]
+
+        for segment in segments:
+            children = nodes[-1].children
+            node = children.get(segment) if children else None
+            if node is None:
+                return
+            nodes.append(node)
+
+        if nodes[-1].state is not state:
+            return
+
+        nodes[-1].state = None
+
+        for node in nodes[1:]:
+            del node.states[state]
+
+        for index in range(len(segments), 0, -1):
+            node = nodes[index]
+            if node.state is not None or node.children:
+                break
+            del nodes[index - 1].children[segments[index - 1]]
+
+            for ancestor in nodes[1:index]:
+                named = ancestor.named[node.segment]
+                named.discard(node)
+                if not named:
+                    del ancestor.named[node.segment]
+
+    def find(self, program, state, depth):
+        '''Returns a list of (substate, relative depth) tuples for the
+           substates of state, which is depth levels below the root state,
+           whose paths relative to state match the compiled expression
+           program.
+        '''
+        ends = []
+        self._walk(program, 0, self._root, ends)
+
+        matches = []
+        for node, exact in ends:
+            consumed = node.depth
+            for substate, relative_depth, order in self._states_below(
+                    node, state, depth):
+                # The parts consumed must all be below state.
+                if relative_depth < consumed:
+                    continue
+                if exact and relative_depth != consumed:
+                    continue
+                matches.append((substate, relative_depth))
+
+        return matches
+
+    def relative_paths(self, name, state, depth):
+        '''Returns the paths, relative to state, of its substates named
+           name.
+        '''
+        node = self._root.children.get(name) if self._root.children else None
+
+        if node is None:
+            return []
+
+        found = []
+        for substate, relative_depth, order in self._states_below(node, state,
+                                                                  depth):
+            names = []
+            while relative_depth:
+                names.append(substate.name)
+                substate = substate.parent_state
+                relative_depth -= 1
+            names.reverse()
+            found.append((order, '.'.join(names)))
+
+        # [PORT] Listed as the keys of a dict filled in the order the states
+        #        were added, the order ambiguity messages have always used.
+        found.sort()
+        paths = {}
+        for order, path in found:
+            paths[path] = True
+
+        return list(paths)
+
+    def _walk(self, program, index, node, ends):
+        '''Follows the steps of program from node, adding to ends a (node,
+           exact) tuple for each node where the program completes. The depth
+           of a node is the number of path parts consumed to reach it. exact
+           is True when no further path parts may be left.
+        '''
+        if index == len(program):
+            ends.append((node, False))
+            return
+
+        step = program[index]
+        kind = step[0]
+
+        if kind == _THIS:
+            # The last part consumed must be a substate of the matcher's
+            # state, with no parts left.
+            if node.depth:
+                ends.append((node, True))
+            return
+
+        children = node.children
+        if not children:
+            return
+
+        if kind == _BASIC:
+            child = children.get(step[1])
+            if child is not None:
+                self._walk(program, index + 1, child, ends)
+            return
+
+        start, end = step[1], step[2]
+
+        child = children.get(end)
+        if child is None:
+            return
+
+        if end == start:
+            self._walk(program, index + 1, child, ends)
+            return
+
+        # Jump down each branch to the nearest part named start.
+        named = child.named.get(start) if child.named else None
+        if not named:
+            return
+
+        for below in list(named):
+            parent = below.parent
+            while parent is not child and parent.segment != start:
+                parent = parent.parent
+
+            if parent is child:
+                self._walk(program, index + 1, below, ends)
+
+    def _states_below(self, node, state, depth):
+        '''Yields a (substate, relative depth, order added) tuple for each
+           state kept at node or below it that is a substate of state, which
+           is depth levels below the root state.
+        '''
+        if not node.states:
+            return
+
+        for indexed, state_node in list(node.states.items()):
+            relative_depth = state_node.depth - depth
+            if relative_depth <= 0:
+                continue
+
+            parent = indexed
+            for i in range(relative_depth):
+                parent = parent.parent_state
+
+            if parent is state:
+                yield indexed, relative_depth, state_node.order
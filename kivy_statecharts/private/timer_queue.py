@@ -0,0 +1,122 @@
+# ================================================================================
+# Project: kivy-statecharts - A Statechart Framework for Kivy
+# Copyright: (c) 2010, 2011 Michael Cohen, and contributors.
+# Python Port: Jeff Pittman, ported from SproutCore, SC.Statechart
+# ================================================================================
+
+import heapq, itertools
+
+'''
+  TimerQueue
+  ----------
+
+  The timers of a statechart, from send_event_after() and the timeouts of
+  states, are kept in one TimerQueue, a heap ordered by deadline, so that
+  the statechart only needs one Kivy Clock event, for the earliest deadline,
+  however many timers are running.
+
+  Cancelled timers are left in the heap, and skipped when they come up. The
+  heap is rebuilt without them when they make up most of it. A queue's
+  cancelled_timer, if set, is called with each timer cancelled before it
+  fires.
+'''
+
+# The heap is only rebuilt when it holds at least this many cancelled timers.
+COMPACT_THRESHOLD = 64
+
+class Timer(object):
+    '''A callback to call with args at the deadline, unless cancelled.
+       state_id is the id of the state the timer is scoped to, or None.
+    '''
+
+    __slots__ = ('deadline', 'callback', 'args', 'state_id', 'cancelled',
+                 '_queue')
+
+    def __init__(self, deadline, callback, args, state_id, queue):
+        self.deadline = deadline
+        self.callback = callback
+        self.args = args
+        self.state_id = state_id
+        self.cancelled = False
+        self._queue = queue
+
+    def cancel(self):
+        '''Keeps the timer from firing. Cancelling a timer that has fired or
+           was cancelled does nothing.
+        '''
+        if self.cancelled:
+            return
+
+        self.cancelled = True
+
+        if self._queue is not None:
+            self._queue._timer_was_cancelled(self)
+            self._queue = None
+
+class TimerQueue(object):
+    def __init__(self):
+        self._heap = []
+        self._sequence = itertools.count()
+        self._cancelled = 0
+        self.cancelled_timer = None
+
+    def __len__(self):
+        '''Returns the number of timers waiting to fire.'''
+        return len(self._heap) - self._cancelled
+
+    def add(self, deadline, callback, args=(), state_id=None):
+        '''Returns a new Timer calling callback with args at deadline.'''
+        timer = Timer(deadline, callback, args, state_id, self)
+        heapq.heappush(self._heap, (deadline, next(self._sequence), timer))
+        return timer
+
+    def requeue(self, timers):
+        '''Puts back timers returned by pop_due() that were not called, to
+           be returned again by the next pop_due().
+        '''
+        for timer in timers:
+            if timer.cancelled:
+                continue
+            timer._queue = self
+            heapq.heappush(self._heap,
+                           (timer.deadline, next(self._sequence), timer))
+
+    def next_deadline(self):
+        '''Returns the earliest deadline of the timers waiting to fire, or
+           None.
+        '''
+        heap = self._heap
+
+        while heap and heap[0][2].cancelled:
+            heapq.heappop(heap)
+            self._cancelled -= 1
+
+        return heap[0][0] if heap else None
+
+    def pop_due(self, now):
+        '''Removes and returns the timers due at time now, earliest first.'''
+        heap = self._heap
+        due = []
+
+        while heap and heap[0][0] <= now:
+            timer = heapq.heappop(heap)[2]
+            if timer.cancelled:
+                self._cancelled -= 1
+            else:
+                timer._queue = None
+                due.append(timer)
+
+        return due
+
+    def _timer_was_cancelled(self, timer):
+        self._cancelled += 1
+
+        if self.cancelled_timer is not None:
+            self.cancelled_timer(timer)
+
+        if (self._cancelled >= COMPACT_THRESHOLD
+                and self._cancelled * 2 > len(self._heap)):
+            self._heap = [entry for entry in self._heap
+                          if not entry[2].cancelled]
+            heapq.heapify(self._heap)
+            self._cancelled = 0
@@ -4,21 +4,11 @@
 # Python Port: Jeff Pittman, ported from SproutCore, SC.Statechart
 # ================================================================================
 
+from kivy_statecharts.core.empty_state import BaseEmptyState
+from kivy_statecharts.core.empty_state import EMPTY_STATE_NAME
 from kivy_statecharts.system.state import State
 
-# The default name given to an empty state
-EMPTY_STATE_NAME = "__EMPTY_STATE__"
-
-class EmptyState(State):
+class EmptyState(BaseEmptyState, State):
     '''Represents an empty state that gets assigned as a state's initial
        substate if the state does not have an initial substate defined.
     '''
-
-    def __init__(self, **kwargs):
-        kwargs['name'] = EMPTY_STATE_NAME
-        super(EmptyState, self).__init__(**kwargs)
-
-    def enter_state(self, context=None):
-        msg = ("No initial substate was defined for state {0}. "
-               "Entering default empty state")
-        self.state_log_warning(msg.format(self.parent_state))
@@ -5,10 +5,11 @@
 # ================================================================================
 
 from kivy.properties import BooleanProperty, ObjectProperty, StringProperty
+from kivy_statecharts.core.history_state import BaseHistoryState
 from kivy_statecharts.system.state import State
 
 
-class HistoryState(State):
+class HistoryState(BaseHistoryState, State):
     '''Represents a history state that can be assigned to a State object's
        initial_substate property.
 
@@ -51,22 +52,3 @@ class HistoryState(State):
        :data:`default` is a :class:`~kivy.properties.StringProperty`,
        default is None.
     '''
-
-    def __init__(self, **kwargs):
-        super(HistoryState, self).__init__(**kwargs)
-
-    def state(self):
-        '''Used by the statechart during a state transition process.
-
-           Returns a state to enter based on whether the parent state has its
-           history_state property assigned. If not then this object's assigned
-           default state is returned.
-
-           PORT: This was a computed property, so it could be observed.
-                 Here, we make it a dynamic method.
-        '''
-
-        default_state = self.get_state(self.default_state)
-        history_state = self.parent_state.history_state
-
-        return history_state if history_state else default_state
@@ -0,0 +1,15 @@
+# ================================================================================
+# Project: kivy-statecharts - A Statechart Framework for Kivy
+# Copyright: (c) 2010, 2011 Michael Cohen, and contributors.
+# Python Port: Jeff Pittman, ported from SproutCore, SC.Statechart
+# ================================================================================
+
+
+from kivy_statecharts.core.lean_state import LeanState
+from kivy_statecharts.core.lean_state import LeanEmptyState
+from kivy_statecharts.core.lean_state import LeanHistoryState
+
+'''
+   [PORT] LeanState does not use Kivy, and moved to kivy_statecharts.core.
+          It is imported here for code written against this module.
+'''
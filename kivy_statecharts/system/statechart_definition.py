@@ -0,0 +1,17 @@
+# ================================================================================
+# Project: kivy-statecharts - A Statechart Framework for Kivy
+# Copyright: (c) 2010, 2011 Michael Cohen, and contributors.
+# Python Port: Jeff Pittman, ported from SproutCore, SC.Statechart
+# ================================================================================
+
+from kivy_statecharts.core.statechart_definition import StatechartDefinition
+from kivy_statecharts.core.statechart_definition import StatechartInstance
+from kivy_statecharts.core.statechart_definition import SharedStatechart
+from kivy_statecharts.core.statechart_definition import PYTHON_TRANSITION
+from kivy_statecharts.core.statechart_definition import UNKNOWN_TRANSITION
+
+'''
+   [PORT] StatechartDefinition does not use Kivy, and moved to
+          kivy_statecharts.core. It is imported here for code written against
+          this module.
+'''
@@ -0,0 +1,129 @@
+'''
+Statechart tests, headless statecharts on the Kivy-free core
+===========
+'''
+
+import os
+import subprocess
+import sys
+import time
+import unittest
+
+import kivy_statecharts
+from kivy_statecharts.core.empty_state import EMPTY_STATE_NAME
+from kivy_statecharts.core.lean_state import LeanEmptyState
+from kivy_statecharts.core.lean_state import LeanHistoryState
+from kivy_statecharts.core.lean_state import LeanState
+from kivy_statecharts.core.statechart import BaseStatechartManager
+
+class Statechart_1(BaseStatechartManager):
+    initial_state_key = 'A'
+
+    class A(LeanState):
+        def to_B(self, arg1=None, arg2=None):
+            self.go_to_state('B')
+
+    class B(LeanState):
+        class InitialSubstate(LeanHistoryState):
+            default_state = 'C'
+
+        def enter_state(self, context=None):
+            self.go_to_state_after(5, 'A')
+
+        class C(LeanState):
+            def to_D(self, arg1=None, arg2=None):
+                self.go_to_state('D')
+
+        class D(LeanState):
+            class E(LeanState):
+                pass
+
+class Owner(object):
+    pass
+
+class CoreHeadlessTestCase(unittest.TestCase):
+    def setUp(self):
+        global statechart_1
+        global root_state_1
+
+        statechart_1 = Statechart_1()
+        root_state_1 = statechart_1.root_state_instance
+
+    def test_core_imports_without_kivy(self):
+        package_dir = os.path.dirname(os.path.dirname(kivy_statecharts.__file__))
+        env = dict(os.environ)
+        env['PYTHONPATH'] = package_dir
+
+        code = ("import sys\n"
+                "import kivy_statecharts.core.statechart\n"
+                "import kivy_statecharts.core.lean_state\n"
+                "import kivy_statecharts.core.futures\n"
+                "import kivy_statecharts.core.statechart_definition\n"
+                "print(sorted(m for m in sys.modules\n"
+                "             if m == 'kivy' or m.startswith('kivy.')\n"
+                "             or m.startswith('kivy_statecharts.system')))\n")
+
+        output = subprocess.check_output([sys.executable, '-c', code], env=env)
+
+        self.assertEqual(output.strip(), b'[]')
+
+    def test_root_state_is_lean(self):
+        self.assertTrue(isinstance(root_state_1, LeanState))
+        self.assertTrue(statechart_1.state_is_current_state('A'))
+
+        root_state_1.A.add_substate('F')
+        self.assertTrue(isinstance(root_state_1.A.F, LeanState))
+
+        self.assertTrue(isinstance(statechart_1.get_state('B').D.get_substate(EMPTY_STATE_NAME),
+                                   LeanEmptyState))
+
+    def test_history_state(self):
+        statechart_1.send_event('to_B')
+        self.assertTrue(statechart_1.state_is_current_state('C'))
+
+        statechart_1.send_event('to_D')
+        statechart_1.go_to_state('A')
+
+        state_B = statechart_1.get_state('B')
+        self.assertTrue(isinstance(state_B.InitialSubstate, LeanHistoryState))
+        self.assertEqual(state_B.InitialSubstate.state(), state_B.D)
+
+        statechart_1.go_to_history_state('B')
+
+        self.assertTrue(statechart_1.state_is_entered('D'))
+
+    def test_posted_events_are_drained_by_the_caller(self):
+        statechart_1.post_event('to_B')
+
+        self.assertTrue(statechart_1.state_is_current_state('A'))
+        self.assertEqual(statechart_1.drain_posted_events(), 1)
+        self.assertTrue(statechart_1.state_is_current_state('C'))
+
+    def test_timers_are_run_by_the_caller(self):
+        self.assertIsNone(statechart_1.next_timer_deadline())
+
+        statechart_1.send_event('to_B')
+        deadline = statechart_1.next_timer_deadline()
+
+        self.assertTrue(deadline > time.time())
+        self.assertEqual(statechart_1.run_timers(deadline - 1), 0)
+        self.assertEqual(statechart_1.run_timers(deadline), 1)
+        self.assertTrue(statechart_1.state_is_current_state('A'))
+
+    def test_observed_attributes(self):
+        self.assertTrue(root_state_1.owner is statechart_1)
+
+        owner = Owner()
+        statechart_1.owner = owner
+
+        self.assertTrue(root_state_1.A.owner is owner)
+
+        statechart_1.go_to_state_locked = True
+        self.assertTrue(statechart_1.go_to_state_active)
+        statechart_1.go_to_state_locked = False
+        self.assertFalse(statechart_1.go_to_state_active)
+
+        statechart_1.external_event_queue_capacity = 1
+        statechart_1.post_event('to_B')
+        statechart_1.post_event('to_B')
+        self.assertEqual(statechart_1.event_queue_stats()['external']['dropped'], 1)
@@ -0,0 +1,133 @@
+'''
+Statechart tests, flight recorder
+===========
+'''
+
+import unittest
+
+from kivy_statecharts.debug.flight_recorder import FlightRecorder
+from kivy_statecharts.debug.flight_recorder import ENTERED, EXITED
+from kivy_statecharts.debug.flight_recorder import HANDLED, UNHANDLED, DROPPED
+from kivy_statecharts.system.state import State
+from kivy_statecharts.system.statechart import StatechartManager
+
+class Statechart_1(StatechartManager):
+    initial_state_key = 'A'
+
+    def __init__(self, **kwargs):
+        self.errors = []
+        super(Statechart_1, self).__init__(**kwargs)
+
+    def statechart_log_error(self, msg):
+        self.errors.append(msg)
+
+    class A(State):
+        def to_B(self, arg1=None, arg2=None):
+            self.go_to_state('B')
+
+    class B(State):
+        def fail(self, arg1=None, arg2=None):
+            raise ValueError('fail')
+
+        def to_C(self, arg1=None, arg2=None):
+            self.go_to_state('C')
+
+    class C(State):
+        def enter_state(self, context=None):
+            raise KeyError('C')
+
+class FlightRecorderTestCase(unittest.TestCase):
+    def setUp(self):
+        global statechart_1
+        global recorder_1
+
+        statechart_1 = Statechart_1()
+        recorder_1 = statechart_1.flight_recorder
+
+    def kinds(self):
+        return [(kind, statechart_1._flight_recorder_state_name(state_id)
+                       if state_id is not None else None, event)
+                for time, kind, state_id, event, duration
+                in recorder_1.records()]
+
+    def test_records(self):
+        statechart_1.send_event('to_B')
+        statechart_1.send_event('nothing')
+
+        self.assertEqual(self.kinds(),
+                         [(ENTERED, '__ROOT_STATE__', None),
+                          (ENTERED, 'A', None),
+                          (EXITED, 'A', None),
+                          (ENTERED, 'B', None),
+                          (HANDLED, 'A', 'to_B'),
+                          (UNHANDLED, None, 'nothing')])
+
+        for record in recorder_1.records():
+            self.assertEqual(len(record), 5)
+            self.assertTrue(record[4] >= 0)
+
+    def test_capacity(self):
+        statechart_1.flight_recorder_capacity = 3
+        recorder = statechart_1.flight_recorder
+
+        self.assertEqual(len(recorder), 2)
+
+        for i in range(3):
+            statechart_1.send_event('nothing')
+
+        self.assertEqual(len(recorder), 3)
+        self.assertEqual([record[1] for record in recorder.records()],
+                         [UNHANDLED] * 3)
+
+        statechart_1.flight_recorder_capacity = 0
+        self.assertIsNone(statechart_1.flight_recorder)
+        self.assertIsNone(statechart_1.dump_flight_recorder())
+
+        statechart_1.send_event('to_B')
+        self.assertTrue(statechart_1.state_is_current_state('B'))
+
+    def test_dropped_events(self):
+        statechart_1.external_event_queue_capacity = 1
+        statechart_1.event_queue_overflow = 'drop_newest'
+        statechart_1.post_event('first')
+        statechart_1.post_event('second')
+
+        self.assertEqual(self.kinds()[-1], (DROPPED, None, 'second'))
+
+        statechart_1.event_queue_overflow = 'drop_oldest'
+        statechart_1.post_event('third')
+
+        self.assertEqual(self.kinds()[-1], (DROPPED, None, 'first'))
+
+    def test_dump_on_exception(self):
+        statechart_1.send_event('to_B')
+
+        self.assertRaises(ValueError, statechart_1.send_event, 'fail')
+        self.assertEqual(len(statechart_1.errors), 1)
+
+        lines = statechart_1.errors[0].split('\n')
+        self.assertTrue(lines[0].endswith("ValueError('fail',) raised, "
+                                          "flight recorder:"))
+        self.assertEqual(lines[1:], statechart_1.dump_flight_recorder().split('\n'))
+        self.assertTrue(' handled   A ' in lines[-1])
+
+    def test_dump_on_exception_in_enter_state(self):
+        statechart_1.send_event('to_B')
+
+        self.assertRaises(KeyError, statechart_1.go_to_state, 'C')
+        self.assertEqual(len(statechart_1.errors), 1)
+        self.assertTrue(' exited    B ' in statechart_1.errors[0])
+
+    def test_dump(self):
+        recorder = FlightRecorder(2)
+        recorder.append((1.5, ENTERED, 0, None, 0.000002))
+        recorder.append((2.5, HANDLED, 1, 'event', 0.00001))
+        recorder.append((3.5, DROPPED, None, 'other', 0))
+
+        lines = recorder.dump(lambda state_id: 'S{0}'.format(state_id)).split('\n')
+
+        self.assertEqual(len(lines), 2)
+        self.assertEqual(lines[0].split(), ['2.500000', 'handled', 'S1',
+                                            'event', '10.0us'])
+        self.assertEqual(lines[1].split(), ['3.500000', 'dropped', '-',
+                                            'other', '0.0us'])
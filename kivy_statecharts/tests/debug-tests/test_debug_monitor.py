@@ -0,0 +1,186 @@
+'''
+Statechart tests, bounded and streaming monitor
+===========
+'''
+
+import os
+import shutil
+import tempfile
+import unittest
+
+from StringIO import StringIO
+
+from kivy.clock import Clock
+
+from kivy_statecharts.core.lean_state import LeanState
+from kivy_statecharts.core.statechart import BaseStatechartManager
+from kivy_statecharts.debug.monitor import StatechartMonitor
+from kivy_statecharts.debug.monitor_backend import BaseStatechartMonitor
+from kivy_statecharts.debug.monitor_backend import MonitorFileSink
+from kivy_statecharts.debug.monitor_backend import ENTERED, EXITED
+from kivy_statecharts.system.state import State
+from kivy_statecharts.system.statechart import StatechartManager
+
+class Statechart_1(StatechartManager):
+    def __init__(self, **kwargs):
+        kwargs['initial_state_key'] = 'A'
+        kwargs['monitor_is_active'] = True
+        super(Statechart_1, self).__init__(**kwargs)
+
+    class A(State):
+        def toggle(self, arg1=None, arg2=None):
+            self.go_to_state('B')
+
+    class B(State):
+        def toggle(self, arg1=None, arg2=None):
+            self.go_to_state('A')
+
+class Statechart_2(BaseStatechartManager):
+    initial_state_key = 'A'
+
+    class A(LeanState):
+        def toggle(self, arg1=None, arg2=None):
+            self.go_to_state('B')
+
+    class B(LeanState):
+        def toggle(self, arg1=None, arg2=None):
+            self.go_to_state('A')
+
+class MonitorTestCase(unittest.TestCase):
+    def setUp(self):
+        global statechart_1
+        global monitor_1
+
+        statechart_1 = Statechart_1()
+        monitor_1 = statechart_1.monitor
+        monitor_1.reset()
+
+    def test_unbounded_by_default(self):
+        self.assertTrue(isinstance(monitor_1, StatechartMonitor))
+        self.assertIsNone(monitor_1.capacity)
+
+        for i in range(10):
+            statechart_1.send_event('toggle')
+
+        self.assertEqual(monitor_1.length, 20)
+        self.assertEqual(monitor_1.dropped, 0)
+        self.assertEqual(monitor_1.sequence[0],
+                         { 'action': EXITED,
+                           'state': statechart_1.get_state('A') })
+
+    def test_capacity(self):
+        statechart_1.monitor_capacity = 4
+
+        for i in range(10):
+            statechart_1.send_event('toggle')
+
+        self.assertEqual(monitor_1.capacity, 4)
+        self.assertEqual(monitor_1.length, 4)
+        self.assertEqual(monitor_1.appended, 20)
+        self.assertEqual(monitor_1.dropped, 16)
+
+        state_A = statechart_1.get_state('A')
+        state_B = statechart_1.get_state('B')
+        self.assertEqual(monitor_1.records(),
+                         [(EXITED, state_A), (ENTERED, state_B),
+                          (EXITED, state_B), (ENTERED, state_A)])
+        self.assertTrue(monitor_1.match_sequence()
+                                 .begin()
+                                 .exited('A').entered('B')
+                                 .exited('B').entered('A')
+                                 .end())
+
+        statechart_1.monitor_capacity = 2
+        self.assertEqual(monitor_1.records(),
+                         [(EXITED, state_B), (ENTERED, state_A)])
+
+        monitor_1.reset()
+        self.assertEqual(monitor_1.length, 0)
+        self.assertEqual(monitor_1.dropped, 0)
+
+    def test_core_monitor_is_kivy_free(self):
+        statechart_2 = Statechart_2(monitor_is_active=True,
+                                    monitor_capacity=2)
+        monitor = statechart_2.monitor
+
+        self.assertTrue(type(monitor) is BaseStatechartMonitor)
+
+        statechart_2.send_event('toggle')
+
+        self.assertEqual(monitor.length, 2)
+        self.assertEqual(str(monitor), '[exited A, entered B]')
+
+    def test_length_and_sequence_are_bindable(self):
+        lengths = []
+        sequences = []
+        monitor_1.bind(length=lambda monitor, length: lengths.append(length))
+        monitor_1.bind(
+                sequence=lambda monitor, sequence: sequences.append(sequence))
+
+        statechart_1.send_event('toggle')
+        statechart_1.send_event('toggle')
+
+        # Read from the records, but only dispatched once per frame.
+        self.assertEqual(monitor_1.length, 4)
+        self.assertEqual(len(monitor_1.sequence), 4)
+        self.assertEqual(lengths, [])
+
+        Clock.tick()
+
+        self.assertEqual(lengths, [4])
+        self.assertEqual([item['action'] for item in sequences[0]],
+                         [EXITED, ENTERED, EXITED, ENTERED])
+
+        monitor_1.reset()
+
+        self.assertEqual(lengths, [4, 0])
+        self.assertEqual(sequences[-1], [])
+
+class MonitorFileSinkTestCase(unittest.TestCase):
+    def setUp(self):
+        global statechart_1
+
+        statechart_1 = Statechart_1()
+        statechart_1.monitor.reset()
+
+    def test_batches(self):
+        output = StringIO()
+        sink = MonitorFileSink(output, batch_size=3)
+        statechart_1.monitor_capacity = 1
+        statechart_1.monitor_sink = sink
+
+        statechart_1.send_event('toggle')
+
+        self.assertEqual(output.getvalue(), '')
+        self.assertEqual(sink.written, 0)
+
+        statechart_1.send_event('toggle')
+
+        lines = output.getvalue().splitlines()
+        self.assertEqual([line.split()[1:] for line in lines],
+                         [[EXITED, 'A'], [ENTERED, 'B'], [EXITED, 'B']])
+        self.assertEqual(sink.written, 3)
+        self.assertEqual(statechart_1.monitor.length, 1)
+
+        sink.close()
+
+        self.assertEqual(sink.written, 4)
+        self.assertEqual(output.getvalue().splitlines()[-1].split()[1:],
+                         [ENTERED, 'A'])
+        self.assertFalse(output.closed)
+
+    def test_path(self):
+        directory = tempfile.mkdtemp()
+        try:
+            path = os.path.join(directory, 'monitor.log')
+            sink = MonitorFileSink(path)
+            statechart_1.monitor_sink = sink
+
+            statechart_1.send_event('toggle')
+            sink.close()
+
+            self.assertTrue(sink.file.closed)
+            with open(path) as f:
+                self.assertEqual(len(f.read().splitlines()), 2)
+        finally:
+            shutil.rmtree(directory)
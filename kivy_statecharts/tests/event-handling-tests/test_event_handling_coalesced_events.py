@@ -0,0 +1,100 @@
+'''
+Statechart tests, event handling, coalesced events
+===========
+'''
+
+import time
+import unittest
+
+from kivy_statecharts.system.state import State
+from kivy_statecharts.system.statechart import StatechartManager
+
+class Statechart_1(StatechartManager):
+    def __init__(self, **kwargs):
+        kwargs['root_state_class'] = self.RootState
+        super(Statechart_1, self).__init__(**kwargs)
+
+    class RootState(State):
+        def __init__(self, **kwargs):
+            kwargs['initial_substate_key'] = 'A'
+            self.handled = []
+            super(Statechart_1.RootState, self).__init__(**kwargs)
+
+        def resize_deflector(self, arg1=None, arg2=None):
+            self.handled.append(('resize_deflector', arg1, arg2))
+
+        def touch_move(self, arg1=None, arg2=None):
+            self.handled.append(('touch_move', arg1, arg2))
+
+        def collision(self, arg1=None, arg2=None):
+            self.handled.append(('collision', arg1, arg2))
+
+        class A(State):
+            pass
+
+class EventHandlingCoalescedEventsTestCase(unittest.TestCase):
+    def setUp(self):
+        global statechart_1
+        global root_state_1
+
+        statechart_1 = Statechart_1()
+        root_state_1 = statechart_1.root_state_instance
+
+    def test_events_are_not_coalesced_by_default(self):
+        for i in range(3):
+            statechart_1.post_event('resize_deflector', i)
+
+        self.assertEqual(statechart_1.drain_posted_events(), 3)
+
+    def test_coalesce_by_event_name_and_key(self):
+        statechart_1.coalesced_events = {
+            'resize_deflector': None,
+            'touch_move': lambda touch, pos: touch
+        }
+
+        statechart_1.post_event('resize_deflector', 10)
+        statechart_1.post_event('touch_move', 'touch 1', 1)
+        statechart_1.post_event('touch_move', 'touch 2', 1)
+        statechart_1.post_event('collision', 'ball')
+        statechart_1.post_event('resize_deflector', 20)
+        statechart_1.post_event('touch_move', 'touch 1', 2)
+        statechart_1.post_event('collision', 'ball')
+
+        self.assertEqual(statechart_1.drain_posted_events(), 5)
+        self.assertEqual(root_state_1.handled, [
+            ('resize_deflector', 20, None),
+            ('touch_move', 'touch 1', 2),
+            ('touch_move', 'touch 2', 1),
+            ('collision', 'ball', None),
+            ('collision', 'ball', None)
+        ])
+        self.assertEqual(statechart_1.event_queue_stats()['external']['coalesced'], 2)
+        self.assertEqual(statechart_1.details()['posted-events']['coalesced'], 2)
+
+        # The next frame starts afresh.
+        statechart_1.post_event('resize_deflector', 30)
+        self.assertEqual(statechart_1.drain_posted_events(), 1)
+
+    def test_coalesce_all_posted_events(self):
+        statechart_1.coalesce_posted_events = True
+
+        for i in range(100):
+            statechart_1.post_event('resize_deflector', i)
+            statechart_1.post_event('collision', i)
+
+        self.assertEqual(statechart_1.drain_posted_events(), 2)
+        self.assertEqual(root_state_1.handled, [
+            ('resize_deflector', 99, None),
+            ('collision', 99, None)
+        ])
+
+    def test_coalesced_events_keep_the_first_post_time(self):
+        statechart_1.coalesce_posted_events = True
+
+        statechart_1.post_event('collision', 0)
+        time.sleep(0.05)
+        statechart_1.post_event('collision', 1)
+
+        self.assertEqual(statechart_1.drain_posted_events(), 1)
+        self.assertEqual(root_state_1.handled, [('collision', 1, None)])
+        self.assertTrue(statechart_1.posted_event_latency_max >= 0.05)
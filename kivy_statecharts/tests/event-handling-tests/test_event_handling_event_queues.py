@@ -0,0 +1,78 @@
+'''
+Statechart tests, event handling, event queues
+===========
+'''
+
+import unittest
+
+from kivy_statecharts.system.state import State
+from kivy_statecharts.system.statechart import StatechartManager
+
+class Statechart_1(StatechartManager):
+    def __init__(self, **kwargs):
+        kwargs['root_state_class'] = self.RootState
+        kwargs['event_priorities'] = {'collision': 1}
+        kwargs['internal_event_queue_capacity'] = 3
+        kwargs['external_event_queue_capacity'] = 2
+        super(Statechart_1, self).__init__(**kwargs)
+
+    class RootState(State):
+        def __init__(self, **kwargs):
+            kwargs['initial_substate_key'] = 'A'
+            self.handled = []
+            super(Statechart_1.RootState, self).__init__(**kwargs)
+
+        def flood(self, arg1=None, arg2=None):
+            for i in range(5):
+                self.statechart.send_event('move', i)
+            self.statechart.send_event('collision')
+
+        def move(self, arg1=None, arg2=None):
+            self.handled.append(('move', arg1))
+
+        def collision(self, arg1=None, arg2=None):
+            self.handled.append(('collision', arg1))
+
+        class A(State):
+            pass
+
+class EventHandlingEventQueuesTestCase(unittest.TestCase):
+    def setUp(self):
+        global statechart_1
+        global root_state_1
+
+        statechart_1 = Statechart_1()
+        root_state_1 = statechart_1.root_state_instance
+
+    def test_internal_queue_is_bounded_and_prioritized(self):
+        statechart_1.send_event('flood')
+
+        self.assertEqual(root_state_1.handled,
+                         [('collision', None), ('move', 3), ('move', 4)])
+
+        stats = statechart_1.event_queue_stats()['internal']
+        self.assertEqual(stats['pushed'], 6)
+        self.assertEqual(stats['dropped'], 3)
+        self.assertEqual(stats['max-depth'], 3)
+        self.assertEqual(stats['depth'], 0)
+        self.assertEqual(statechart_1.details()['event-queues']['internal'],
+                         stats)
+
+    def test_external_queue_is_bounded(self):
+        statechart_1.event_queue_overflow = 'drop_newest'
+
+        for i in range(4):
+            statechart_1.post_event('move', i)
+        statechart_1.post_event('collision', 'c')
+
+        self.assertEqual(statechart_1.posted_events_depth(), 2)
+        self.assertEqual(statechart_1.drain_posted_events(), 2)
+        self.assertEqual(root_state_1.handled, [('move', 0), ('move', 1)])
+        self.assertEqual(statechart_1.event_queue_stats()['external']['dropped'], 3)
+
+    def test_capacity_can_be_changed(self):
+        statechart_1.internal_event_queue_capacity = None
+        statechart_1.send_event('flood')
+
+        self.assertEqual(len(root_state_1.handled), 6)
+        self.assertEqual(root_state_1.handled[0], ('collision', None))
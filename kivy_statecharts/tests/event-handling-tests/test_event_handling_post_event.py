@@ -0,0 +1,94 @@
+'''
+Statechart tests, posting events from other threads
+===========
+'''
+
+import threading
+import unittest
+
+from kivy.clock import Clock
+from kivy_statecharts.system.state import State
+from kivy_statecharts.system.statechart import StatechartManager
+
+class Statechart_1(StatechartManager):
+    def __init__(self, **kwargs):
+        kwargs['root_state_class'] = self.RootState
+        super(Statechart_1, self).__init__(**kwargs)
+
+    class RootState(State):
+        def __init__(self, **kwargs):
+            kwargs['initial_substate_key'] = 'A'
+            self.readings = []
+            super(Statechart_1.RootState, self).__init__(**kwargs)
+
+        def reading(self, arg1=None, arg2=None):
+            self.readings.append((arg1, arg2))
+
+        class A(State):
+            def to_B(self, arg1=None, arg2=None):
+                self.go_to_state('B')
+
+        class B(State):
+            pass
+
+class EventHandlingPostEventTestCase(unittest.TestCase):
+    def setUp(self):
+        global statechart_1
+        global root_state_1
+
+        statechart_1 = Statechart_1()
+        root_state_1 = statechart_1.root_state_instance
+
+    def test_events_posted_from_threads(self):
+        def produce(producer):
+            for i in range(500):
+                statechart_1.post_event('reading', producer, i)
+
+        threads = [threading.Thread(target=produce, args=(producer,))
+                   for producer in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(statechart_1.posted_events_depth(), 2000)
+        self.assertEqual(root_state_1.readings, [])
+
+        self.assertEqual(statechart_1.drain_posted_events(), 2000)
+
+        self.assertEqual(len(root_state_1.readings), 2000)
+        for producer in range(4):
+            self.assertEqual([i for p, i in root_state_1.readings if p == producer],
+                             list(range(500)))
+
+        self.assertEqual(statechart_1.posted_events_depth(), 0)
+        self.assertEqual(statechart_1.posted_events_handled, 2000)
+        self.assertTrue(statechart_1.posted_event_latency_max >= statechart_1.posted_event_latency_mean())
+        self.assertEqual(statechart_1.details()['posted-events']['handled'], 2000)
+
+    def test_events_are_drained_by_the_clock(self):
+        statechart_1.post_event('to_B')
+        statechart_1.post_event('reading', 1)
+
+        self.assertTrue(statechart_1.state_is_current_state('A'))
+
+        Clock.tick()
+
+        self.assertTrue(statechart_1.state_is_current_state('B'))
+        self.assertEqual(root_state_1.readings, [(1, None)])
+        self.assertEqual(statechart_1.drain_posted_events(), 0)
+
+    def test_posted_events_are_counted_once_handled(self):
+        statechart_1._send_event_locked = True
+        statechart_1.post_event('reading', 'queued')
+
+        self.assertEqual(statechart_1.drain_posted_events(), 1)
+        self.assertEqual(root_state_1.readings, [])
+        self.assertEqual(statechart_1.posted_events_handled, 0)
+
+        statechart_1._send_event_locked = False
+        statechart_1._flush_pending_sent_events()
+
+        self.assertEqual(root_state_1.readings, [('queued', None)])
+        self.assertEqual(statechart_1.posted_events_handled, 1)
+        self.assertTrue(statechart_1.posted_event_latency_max > 0)
@@ -0,0 +1,115 @@
+'''
+Statechart tests, event routing, with concurrent states
+===========
+'''
+
+import unittest
+
+from kivy_statecharts.core.state import EVENT_MEMO_SIZE
+from kivy_statecharts.system.state import State
+from kivy_statecharts.system.statechart import StatechartManager
+
+tried_states = []
+
+class RoutedState(State):
+    def try_to_handle_event(self, event, arg1=None, arg2=None):
+        tried_states.append(self.name)
+        return super(RoutedState, self).try_to_handle_event(event, arg1, arg2)
+
+class Statechart_1(StatechartManager):
+    def __init__(self, **kwargs):
+        kwargs['root_state_class'] = self.RootState
+        kwargs['monitor_is_active'] = True
+        super(Statechart_1, self).__init__(**kwargs)
+
+    class RootState(State):
+        def __init__(self, **kwargs):
+            kwargs['substates_are_concurrent'] = True
+            super(Statechart_1.RootState, self).__init__(**kwargs)
+
+        class A(State):
+            def __init__(self, **kwargs):
+                kwargs['initial_substate_key'] = 'C'
+                super(Statechart_1.RootState.A, self).__init__(**kwargs)
+
+            def event_A(self, arg1=None, arg2=None):
+                self.go_to_state('D')
+
+            class C(State):
+                pass
+
+            class D(State):
+                def event_A(self, arg1=None, arg2=None):
+                    return False
+
+        class B(State):
+            def __init__(self, **kwargs):
+                kwargs['initial_substate_key'] = 'E'
+                super(Statechart_1.RootState.B, self).__init__(**kwargs)
+
+            class E(State):
+                def event_E(self, arg1=None, arg2=None):
+                    self.go_to_state('F')
+
+            class F(RoutedState):
+                pass
+
+class EventHandlingRoutingTestCase(unittest.TestCase):
+    def setUp(self):
+        global statechart_1
+        global monitor_1
+
+        del tried_states[:]
+
+        statechart_1 = Statechart_1()
+        monitor_1 = statechart_1.monitor
+
+    def test_route_skips_states_that_cannot_handle_the_event(self):
+        route = statechart_1._event_route('event_A')
+
+        self.assertEqual([(state.name, responder.name) for state, responder in route],
+                         [('C', 'A')])
+        self.assertEqual(statechart_1._event_route('event_B'), [])
+        self.assertIsNone(statechart_1.send_event('event_B'))
+
+    def test_send_event_bubbles_past_unhandled_responders(self):
+        statechart_1.send_event('event_A')
+
+        self.assertTrue(statechart_1.state_is_current_state('D'))
+
+        monitor_1.reset()
+        statechart_1.send_event('event_A')
+
+        self.assertTrue(monitor_1.match_sequence().begin().exited('D').entered('D').end())
+        self.assertTrue(statechart_1.state_is_current_state('D'))
+        self.assertTrue(statechart_1.state_is_current_state('E'))
+
+    def test_route_follows_current_states(self):
+        statechart_1.send_event('event_E')
+
+        self.assertTrue(statechart_1.state_is_current_state('F'))
+        self.assertEqual([(state.name, responder.name) for state, responder in statechart_1._event_route('event_A')],
+                         [('C', 'A'), ('F', 'F')])
+
+        statechart_1.send_event('event_X')
+
+        # F overrides try_to_handle_event, so it is always visited.
+        self.assertEqual(tried_states, ['F'])
+
+    def test_add_substate_clears_routes(self):
+        statechart_1._event_route('event_A')
+
+        statechart_1.get_state('B').add_substate('G')
+
+        self.assertEqual(len(statechart_1._event_routes), 0)
+        self.assertEqual(len(statechart_1._event_responders), 0)
+
+    def test_routes_are_bounded(self):
+        for i in range(3 * EVENT_MEMO_SIZE):
+            statechart_1.send_event('event_{0}'.format(i))
+
+        self.assertTrue(len(statechart_1._event_routes) <= 2 * EVENT_MEMO_SIZE)
+        self.assertTrue(len(statechart_1._event_responders) <= 2 * EVENT_MEMO_SIZE)
+
+        statechart_1.send_event('event_A')
+        self.assertTrue(statechart_1.state_is_current_state('D'))
@@ -0,0 +1,93 @@
+'''
+Statechart tests, batched event handling with send_events
+===========
+'''
+
+import unittest
+
+from kivy_statecharts.system.state import State
+from kivy_statecharts.system.statechart import StatechartManager
+
+class Statechart_1(StatechartManager):
+    def __init__(self, **kwargs):
+        kwargs['root_state_class'] = self.RootState
+        kwargs['monitor_is_active'] = True
+        super(Statechart_1, self).__init__(**kwargs)
+
+    class RootState(State):
+        def __init__(self, **kwargs):
+            kwargs['initial_substate_key'] = 'A'
+            self.events = []
+            super(Statechart_1.RootState, self).__init__(**kwargs)
+
+        def log(self, arg1=None, arg2=None):
+            self.events.append((arg1, arg2))
+
+        class A(State):
+            def to_B(self, arg1=None, arg2=None):
+                self.statechart.send_event('log', 'from A')
+                self.go_to_state('B')
+
+        class B(State):
+            def to_A(self, arg1=None, arg2=None):
+                self.go_to_state('A')
+
+            def probe(self, arg1=None, arg2=None):
+                sc = self.statechart
+                self.parent_state.events.append(
+                        (sc.responds_to('to_A'),
+                         sc.invoke_state_method('name_of_state'),
+                         sc.details()['current-states']))
+
+            def name_of_state(self):
+                return self.name
+
+class EventHandlingSendEventsTestCase(unittest.TestCase):
+    def setUp(self):
+        global statechart_1
+        global root_state_1
+        global monitor_1
+
+        statechart_1 = Statechart_1()
+        root_state_1 = statechart_1.root_state_instance
+        monitor_1 = statechart_1.monitor
+
+    def test_send_events_returns_handled_flags(self):
+        handled = statechart_1.send_events([
+            'to_B',
+            ('log', 1),
+            ('to_B',),
+            ('log', 2, 3),
+            'to_A'])
+
+        self.assertEqual(handled, [True, True, False, True, True])
+        self.assertEqual(root_state_1.events, [('from A', None), (1, None), (2, 3)])
+        self.assertTrue(statechart_1.state_is_current_state('A'))
+
+    def test_current_states_is_updated_once(self):
+        changes = []
+        statechart_1.bind(current_states=lambda *l: changes.append(l[1][:]))
+
+        monitor_1.reset()
+        statechart_1.send_events(['to_B', 'to_A', 'to_B'])
+
+        self.assertTrue(monitor_1.match_sequence().begin().exited('A').entered('B').exited('B').entered('A').exited('A').entered('B').end())
+        self.assertEqual(changes, [[statechart_1.get_state('B')]])
+        self.assertEqual(statechart_1.current_states, [statechart_1.get_state('B')])
+
+    def test_send_events_while_locked_queues_events(self):
+        statechart_1._send_event_locked = True
+
+        self.assertIsNone(statechart_1.send_events(['to_B', ('log', 4)]))
+        self.assertEqual(len(statechart_1._pending_sent_events), 2)
+
+        statechart_1._send_event_locked = False
+        statechart_1._flush_pending_sent_events()
+
+        self.assertEqual(root_state_1.events, [(4, None), ('from A', None)])
+        self.assertTrue(statechart_1.state_is_current_state('B'))
+
+    def test_helpers_see_the_states_of_the_batch(self):
+        statechart_1.send_events(['to_B', 'probe'])
+
+        self.assertEqual(root_state_1.events[-1], (True, 'B', ['B']))
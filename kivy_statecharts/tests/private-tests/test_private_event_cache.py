@@ -0,0 +1,41 @@
+'''
+Statechart tests, private, event cache
+===========
+'''
+
+import unittest
+
+from kivy_statecharts.private.event_cache import EventCache
+
+class PrivateEventCacheTestCase(unittest.TestCase):
+    def test_get_and_set(self):
+        cache = EventCache(2)
+        cache.set('a', 1)
+
+        self.assertEqual(cache.get('a'), 1)
+        self.assertIsNone(cache.get('b'))
+
+    def test_least_recently_used_are_dropped(self):
+        cache = EventCache(2)
+        cache.set('a', 1)
+        cache.set('b', 2)
+        cache.set('c', 3)
+
+        # a was used again, so it outlives b.
+        self.assertEqual(cache.get('a'), 1)
+        cache.set('d', 4)
+
+        self.assertIsNone(cache.get('b'))
+        self.assertEqual(cache.get('a'), 1)
+        self.assertEqual(cache.get('c'), 3)
+        self.assertEqual(cache.get('d'), 4)
+
+    def test_size_is_bounded(self):
+        cache = EventCache(4)
+        for i in range(100):
+            cache.set(i, i)
+
+        self.assertTrue(len(cache) <= 8)
+
+        cache.clear()
+        self.assertEqual(len(cache), 0)
@@ -0,0 +1,111 @@
+'''
+Statechart tests, private, event queue
+===========
+'''
+
+import unittest
+
+from kivy_statecharts.private.event_queue import EventQueue
+from kivy_statecharts.private.event_queue import COALESCE
+from kivy_statecharts.private.event_queue import DROP_NEWEST
+from kivy_statecharts.private.event_queue import DROP_OLDEST
+
+class PrivateEventQueueTestCase(unittest.TestCase):
+    def _pop_all(self, queue):
+        items = []
+        while queue:
+            items.append(queue.pop())
+        return items
+
+    def test_queue_is_first_in_first_out(self):
+        queue = EventQueue()
+        for i in range(5):
+            self.assertTrue(queue.push('move', i))
+
+        self.assertEqual(len(queue), 5)
+        self.assertEqual(self._pop_all(queue), [0, 1, 2, 3, 4])
+        self.assertIsNone(queue.pop())
+
+    def test_higher_priorities_go_first(self):
+        queue = EventQueue(priorities={'collision': 10, 'move': -1})
+        queue.push('move', 'move 1')
+        queue.push('tick', 'tick 1')
+        queue.push('collision', 'collision 1')
+        queue.push('move', 'move 2')
+        queue.push('collision', 'collision 2')
+
+        self.assertEqual(self._pop_all(queue),
+                         ['collision 1', 'collision 2', 'tick 1', 'move 1',
+                          'move 2'])
+
+    def test_drop_oldest(self):
+        queue = EventQueue(capacity=3, overflow=DROP_OLDEST,
+                           priorities={'reset_level': 1})
+        for i in range(4):
+            queue.push('move', i)
+
+        self.assertTrue(queue.push('reset_level', 'reset'))
+        self.assertEqual(len(queue), 3)
+
+        # Low priority events cannot push out higher ones.
+        queue.push('reset_level', 'reset 2')
+        queue.push('reset_level', 'reset 3')
+        self.assertFalse(queue.push('move', 4))
+
+        self.assertEqual(self._pop_all(queue), ['reset', 'reset 2', 'reset 3'])
+        self.assertEqual(queue.stats(), {
+          'depth': 0,
+          'max-depth': 3,
+          'pushed': 8,
+          'dropped': 5,
+          'coalesced': 0
+        })
+
+    def test_drop_newest(self):
+        queue = EventQueue(capacity=2, overflow=DROP_NEWEST)
+        for i in range(4):
+            queue.push('move', i)
+
+        self.assertEqual(self._pop_all(queue), [0, 1])
+        self.assertEqual(queue.dropped, 2)
+
+    def test_coalesce(self):
+        queue = EventQueue(capacity=2, overflow=COALESCE)
+        queue.push('move', 0)
+        queue.push('tick', 't')
+        queue.push('move', 1)
+        queue.push('move', 2)
+
+        # The first move keeps its place, with the latest payload.
+        self.assertEqual(len(queue), 2)
+        self.assertEqual(queue.pop(), 2)
+
+        queue.push('move', 3)
+        queue.push('resize', 'r')
+
+        # resize has nothing to coalesce with, so drops the oldest event.
+        self.assertEqual(self._pop_all(queue), [3, 'r'])
+        self.assertEqual(queue.coalesced, 2)
+        self.assertEqual(queue.dropped, 1)
+
+    def test_coalescing_keys(self):
+        queue = EventQueue()
+        queue.push('touch_move', (1, 'a'), ('touch_move', 1))
+        queue.push('touch_move', (2, 'a'), ('touch_move', 2))
+        queue.push('touch_up', (1, 'b'))
+        queue.push('touch_move', (1, 'c'), ('touch_move', 1))
+
+        self.assertEqual(self._pop_all(queue), [(1, 'c'), (2, 'a'), (1, 'b')])
+        self.assertEqual(queue.coalesced, 1)
+
+        # Popped events are no longer coalesced into.
+        queue.push('touch_move', (1, 'd'), ('touch_move', 1))
+        self.assertEqual(self._pop_all(queue), [(1, 'd')])
+
+    def test_merge_items(self):
+        queue = EventQueue()
+        queue.merge_items = lambda queued, pushed: (pushed[0], queued[1])
+        queue.push('move', (1, 'first'), 'move')
+        queue.push('move', (2, 'second'), 'move')
+
+        self.assertEqual(self._pop_all(queue), [(2, 'first')])
@@ -12,6 +12,7 @@ from kivy.properties import ObjectProperty, StringProperty, BooleanProperty, Num
 from kivy_statecharts.system.state import State
 from kivy_statecharts.system.statechart import StatechartManager
 from kivy_statecharts.private.state_path_matcher import StatePathMatcher
+from kivy_statecharts.private import state_path_matcher
 
 import os, inspect
 
@@ -157,3 +158,39 @@ class StatePathMatcherTestCase(unittest.TestCase):
         self.assertFalse(spm.match(''))
         self.assertFalse(spm.match(dict))
 
+
+    # Test matching with an empty expression
+    def test_with_empty_expression(self):
+        for expression in [None, '']:
+            spm = StatePathMatcher(expression=expression)
+
+            self.assertIsNone(spm.last_part)
+
+            with self.assertRaises(Exception) as cm:
+                spm.match('A')
+
+            msg = "Cannot match with an empty expression"
+            self.assertEqual(str(cm.exception), msg)
+
+    # Test that expansions stop at the nearest start
+    def test_expansion_uses_nearest_start(self):
+        spm = StatePathMatcher(expression='X.A~B')
+
+        self.assertTrue(spm.match('X.A.Y.B'))
+        self.assertFalse(spm.match('X.A.A.B'))
+
+    # Test that expressions are compiled once
+    def test_compiled_expressions_are_cached(self):
+        spm_1 = StatePathMatcher(expression='self.A~B')
+        spm_2 = StatePathMatcher(expression='self.A~B')
+
+        self.assertIs(spm_1._program, spm_2._program)
+        self.assertEqual(spm_1.last_part, 'B')
+        self.assertIn('self.A~B', state_path_matcher._compiled_expressions)
+
+        size = state_path_matcher.EXPRESSION_CACHE_SIZE
+        for i in range(size):
+            StatePathMatcher(expression='S{0}'.format(i))
+
+        self.assertEqual(len(state_path_matcher._compiled_expressions), size)
+        self.assertNotIn('self.A~B', state_path_matcher._compiled_expressions)
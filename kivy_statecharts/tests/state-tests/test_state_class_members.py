@@ -0,0 +1,87 @@
+'''
+Statechart tests, state, class members
+===========
+'''
+
+import unittest
+
+from kivy_statecharts.system.state import State
+from kivy_statecharts.system.state import _STATE_MEMBERS
+from kivy_statecharts.system.statechart import StatechartManager
+
+class ExtraState(State):
+    pass
+
+class Statechart_1(StatechartManager):
+    def __init__(self, **kwargs):
+        kwargs['root_state_class'] = self.RootState
+        super(Statechart_1, self).__init__(**kwargs)
+
+    class RootState(State):
+        def __init__(self, **kwargs):
+            kwargs['initial_substate_key'] = 'A'
+            super(Statechart_1.RootState, self).__init__(**kwargs)
+
+        class A(State):
+            @State.event_handler(['foo', 'bar'])
+            def handle(self, event, arg1=None, arg2=None):
+                pass
+
+            def plain(self, arg1=None, arg2=None):
+                pass
+
+        class B(State):
+            pass
+
+        class C(State):
+            def __init__(self, **kwargs):
+                self.Z = ExtraState
+                self.D = None
+                super(Statechart_1.RootState.C, self).__init__(**kwargs)
+
+            class D(State):
+                pass
+
+            class E(State):
+                pass
+
+class StateClassMembersTestCase(unittest.TestCase):
+    def setUp(self):
+        global statechart_1
+
+        statechart_1 = Statechart_1()
+
+    def test_substates_in_dir_order(self):
+        root_state = statechart_1.root_state_instance
+
+        self.assertEqual([state.name for state in root_state.substates],
+                         ['A', 'B', 'C'])
+
+    def test_event_handlers_are_registered(self):
+        state = statechart_1.get_state('A')
+
+        self.assertEqual(list(state._registered_event_handlers.keys()), ['handle'])
+        self.assertEqual(sorted(state._registered_string_event_handlers.keys()),
+                         ['bar', 'foo'])
+
+    def test_instance_attributes_are_found(self):
+        state = statechart_1.get_state('C')
+
+        # Z is only set on the instance, and D is hidden by an instance
+        # attribute.
+        self.assertEqual([substate.name for substate in state.substates],
+                         ['E', 'Z', '__EMPTY_STATE__'])
+
+    def test_members_are_found_once_per_class(self):
+        cls = Statechart_1.RootState.A
+
+        keys, property_keys = _STATE_MEMBERS[cls]
+        self.assertEqual(keys, ['handle'])
+        self.assertTrue('name' in property_keys)
+
+        _STATE_MEMBERS[cls] = ([], property_keys)
+        statechart_2 = Statechart_1()
+
+        self.assertEqual(statechart_2.get_state('A')._registered_event_handlers, {})
+
+        del _STATE_MEMBERS[cls]
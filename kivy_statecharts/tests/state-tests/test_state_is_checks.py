@@ -76,3 +76,22 @@ class StateIsCurrentStateTestCase(unittest.TestCase):
     # check if state is root substate?
     def test_if_state_is_root_state(self):
         self.assertTrue(root_state_1.is_root_state())
+
+    # check that the state flags agree with the state lists
+    def test_state_flags_agree_with_state_lists(self):
+        for state in (root_state_1, state_A, state_B):
+            self.assertEqual(statechart_1._states[state.state_id], state)
+
+        for name in ('B', 'A', 'B'):
+            statechart_1.go_to_state(name)
+            for state in statechart_1._states:
+                self.assertEqual(state.is_current_state(),
+                                 state in state.current_substates)
+                self.assertEqual(state.is_entered_state(),
+                                 state in state.entered_substates)
+                self.assertEqual(root_state_1.state_is_current_substate(state),
+                                 state in root_state_1.current_substates)
+
+        self.assertTrue(state_B.is_current_state())
+        self.assertFalse(state_A.is_entered_state())
+        self.assertFalse(state_A.state_is_current_substate(state_B))
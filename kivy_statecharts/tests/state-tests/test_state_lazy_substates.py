@@ -0,0 +1,161 @@
+'''
+Statechart tests, lazy substates
+===========
+'''
+
+import os, shutil, sys, tempfile
+import unittest
+
+from kivy_statecharts.system.state import State
+from kivy_statecharts.system.statechart import StatechartManager
+
+SCREENS = """
+from kivy_statecharts.system.state import State
+
+class Settings(State):
+    def __init__(self, **kwargs):
+        kwargs['initial_substate_key'] = 'General'
+        super(Settings, self).__init__(**kwargs)
+
+    class General(State):
+        def to_home(self, arg1=None, arg2=None):
+            self.go_to_state('Home')
+
+    class Sound(State):
+        pass
+
+class Home(State):
+    def to_settings(self, arg1=None, arg2=None):
+        self.go_to_state('Settings')
+
+class Shop(State):
+    pass
+
+class About(object):
+    pass
+
+class Options(State):
+    def __init__(self, **kwargs):
+        kwargs['initial_substate_key'] = 'Inner'
+        super(Options, self).__init__(**kwargs)
+
+    class Inner(State):
+        pass
+"""
+
+class Statechart_1(StatechartManager):
+    def __init__(self, **kwargs):
+        kwargs['initial_state_key'] = 'Home'
+        super(Statechart_1, self).__init__(**kwargs)
+
+    Home = 'lazy_screens.Home'
+    Settings = 'lazy_screens.Settings'
+    Shop = 'lazy_screens.Shop'
+    About = 'lazy_screens.About'
+
+    # Not a lazy substate: the path does not end with the attribute's name.
+    title = 'lazy_screens.Title'
+
+class Statechart_2(StatechartManager):
+    def __init__(self, **kwargs):
+        kwargs['initial_state_key'] = 'A'
+        super(Statechart_2, self).__init__(**kwargs)
+
+    class A(State):
+        pass
+
+    # All of B's substates are lazy.
+    class B(State):
+        Options = 'lazy_screens.Options'
+
+class StateLazySubstatesTestCase(unittest.TestCase):
+    def setUp(self):
+        global statechart_1
+        global root_state_1
+
+        self.path = tempfile.mkdtemp()
+        with open(os.path.join(self.path, 'lazy_screens.py'), 'w') as f:
+            f.write(SCREENS)
+        sys.path.insert(0, self.path)
+
+        statechart_1 = Statechart_1()
+        root_state_1 = statechart_1.root_state_instance
+
+    def tearDown(self):
+        sys.path.remove(self.path)
+        sys.modules.pop('lazy_screens', None)
+        shutil.rmtree(self.path)
+
+    def test_lazy_substates_are_loaded_on_first_lookup(self):
+        self.assertEqual([state.name for state in root_state_1.substates],
+                         ['Home'])
+        self.assertTrue(statechart_1.state_is_current_state('Home'))
+        self.assertEqual(root_state_1.Shop, 'lazy_screens.Shop')
+
+        # The substates of lazy substates are not known by name alone.
+        self.assertIsNone(statechart_1.get_state('General'))
+
+        statechart_1.send_event('to_settings')
+
+        self.assertTrue(statechart_1.state_is_current_state('General'))
+        self.assertEqual(sorted(state.name for state in root_state_1.substates),
+                         ['Home', 'Settings'])
+        self.assertEqual(statechart_1.get_state('Settings.Sound').full_path,
+                         'Settings.Sound')
+
+        statechart_1.send_event('to_home')
+
+        self.assertTrue(statechart_1.state_is_current_state('Home'))
+        self.assertIs(statechart_1.get_state('Shop'), root_state_1.Shop)
+        self.assertEqual(len(root_state_1.substates), 3)
+
+    def test_bad_lazy_substates(self):
+        with self.assertRaises(Exception) as cm:
+            statechart_1.get_state('About')
+
+        self.assertEqual(str(cm.exception),
+                         "Cannot load state lazy_screens.About. Not a state class")
+        self.assertIsNone(statechart_1.get_state('title'))
+
+    def test_destroyed_lazy_substates(self):
+        root_state_1.destroy()
+
+        self.assertEqual(root_state_1._lazy_substates, None)
+
+    def test_paths_through_lazy_substates_load_them(self):
+        state = statechart_1.get_state('Settings.Sound')
+
+        self.assertEqual(state.full_path, 'Settings.Sound')
+        self.assertIs(statechart_1.get_state('Sound'), state)
+        self.assertIsNone(statechart_1.get_state('Settings.Missing'))
+        self.assertIsNone(root_state_1._load_lazy_substate('title'))
+
+    def test_unknown_states_name_the_lazy_substates(self):
+        with self.assertRaises(Exception) as cm:
+            statechart_1.go_to_state('Sound')
+
+        self.assertEqual(str(cm.exception),
+                         "Cannot to goto state Sound. Not a recognized state "
+                         "in statechart. States declared in lazy substates "
+                         "not loaded yet, About, Settings, Shop, are only "
+                         "known by their paths through them.")
+
+    def test_state_with_only_lazy_substates(self):
+        statechart_2 = Statechart_2()
+
+        def current_states():
+            return sorted(state.full_path
+                          for state in statechart_2.current_states)
+
+        state_B = statechart_2.get_state('B')
+        self.assertEqual(state_B.initial_substate_key, '__EMPTY_STATE__')
+
+        statechart_2.go_to_state('B')
+        self.assertEqual(current_states(), ['B.__EMPTY_STATE__'])
+
+        statechart_2.go_to_state('Options')
+        self.assertEqual(current_states(), ['B.Options.Inner'])
+
+        statechart_2.go_to_state('B')
+        self.assertEqual(current_states(), ['B.__EMPTY_STATE__'])
+        self.assertFalse(state_B.is_current_state())
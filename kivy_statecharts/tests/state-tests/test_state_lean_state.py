@@ -0,0 +1,116 @@
+'''
+Statechart tests, lean states
+===========
+'''
+
+import unittest
+
+from kivy.event import EventDispatcher
+from kivy_statecharts.system.state import State
+from kivy_statecharts.system.lean_state import LeanState
+from kivy_statecharts.system.statechart import StatechartManager
+
+class Leaf(LeanState):
+    __slots__ = ()
+
+class Statechart_1(StatechartManager):
+    def __init__(self, **kwargs):
+        kwargs['root_state_class'] = self.RootState
+        kwargs['monitor_is_active'] = True
+        super(Statechart_1, self).__init__(**kwargs)
+
+    class RootState(LeanState):
+        def __init__(self, **kwargs):
+            kwargs['initial_substate_key'] = 'A'
+            super(Statechart_1.RootState, self).__init__(**kwargs)
+
+        class A(LeanState):
+            def __init__(self, **kwargs):
+                kwargs['initial_substate_key'] = 'C'
+                super(Statechart_1.RootState.A, self).__init__(**kwargs)
+
+            def foo(self, arg1=None, arg2=None):
+                self.go_to_state('B')
+
+            class C(Leaf):
+                __slots__ = ()
+
+            class D(Leaf):
+                pass
+
+        class B(LeanState):
+            def __init__(self, **kwargs):
+                kwargs['substates_are_concurrent'] = True
+                super(Statechart_1.RootState.B, self).__init__(**kwargs)
+
+            def enter_state(self, context=None):
+                self.entered = True
+
+            @LeanState.event_handler(['bar', 'baz'])
+            def handle(self, event, arg1=None, arg2=None):
+                self.handled = event
+                self.go_to_state('D')
+
+            class E(Leaf):
+                pass
+
+            class F(State):
+                pass
+
+class StateLeanStateTestCase(unittest.TestCase):
+    def setUp(self):
+        global statechart_1
+        global root_state_1
+        global monitor_1
+
+        statechart_1 = Statechart_1()
+        root_state_1 = statechart_1.root_state_instance
+        monitor_1 = statechart_1.monitor
+
+    def test_lean_states_are_plain_objects(self):
+        state_C = statechart_1.get_state('C')
+
+        self.assertFalse(isinstance(root_state_1, EventDispatcher))
+        self.assertFalse(hasattr(state_C, '__dict__'))
+        self.assertEqual(state_C.full_path, 'A.C')
+        self.assertEqual(str(state_C), 'A.C')
+        self.assertEqual(state_C.owner, statechart_1)
+        self.assertFalse(state_C.trace)
+
+        statechart_1.trace = True
+        self.assertTrue(state_C.trace)
+
+    def test_transitions_and_events(self):
+        self.assertTrue(statechart_1.state_is_current_state('C'))
+        self.assertTrue(statechart_1.get_state('C').is_current_state())
+
+        monitor_1.reset()
+        statechart_1.send_event('foo')
+
+        self.assertTrue(monitor_1.match_sequence().begin().exited('C', 'A').entered('B', 'E', 'F').end())
+        self.assertTrue(statechart_1.get_state('B').entered)
+        self.assertEqual(sorted(state.name for state in statechart_1.current_states),
+                         ['E', 'F'])
+        self.assertTrue(root_state_1.B.E.is_current_state())
+
+        statechart_1.send_event('baz')
+
+        self.assertEqual(statechart_1.get_state('B').handled, 'baz')
+        self.assertTrue(statechart_1.state_is_current_state('D'))
+        self.assertFalse(statechart_1.get_state('E').is_entered_state())
+
+    def test_deferred_state_property_changes(self):
+        statechart_1.defer_state_property_changes = True
+
+        statechart_1.go_to_state('B')
+
+        self.assertTrue(statechart_1.state_is_current_state('E'))
+        self.assertEqual(statechart_1._changed_state_properties, {})
+
+    def test_add_substate(self):
+        state = statechart_1.get_state('A').add_substate('G', Leaf)
+
+        self.assertEqual(state.full_path, 'A.G')
+
+        statechart_1.go_to_state('G')
+        self.assertTrue(statechart_1.state_is_current_state('G'))
@@ -0,0 +1,120 @@
+'''
+Statechart tests, state, regular expression event handlers
+===========
+'''
+
+import unittest, re
+
+from kivy_statecharts.core import state as state_module
+from kivy_statecharts.system.state import State
+from kivy_statecharts.system.statechart import StatechartManager
+
+class Statechart_1(StatechartManager):
+    def __init__(self, **kwargs):
+        kwargs['initial_state_key'] = 'FOO'
+        super(Statechart_1, self).__init__(**kwargs)
+
+    class FOO(State):
+        def __init__(self, **kwargs):
+            self.handled = []
+            super(Statechart_1.FOO, self).__init__(**kwargs)
+
+        @State.event_handler([re.compile(r'adjust_group_(?P<group>\d+)$')])
+        def adjust_group(self, event, arg1, arg2):
+            self.handled.append(('adjust_group', event))
+
+        @State.event_handler([re.compile(r'adjust_(\w+)$'),
+                              re.compile(r'(a)(d)just')])
+        def adjust(self, event, arg1, arg2):
+            self.handled.append(('adjust', event))
+
+        @State.event_handler([re.compile(r'pulse|pulsate')])
+        def pulsing(self, event, arg1, arg2):
+            self.handled.append(('pulsing', event))
+
+    class BAR(State):
+        @State.event_handler([re.compile(r'(\w)\1')])
+        def double(self, event, arg1, arg2):
+            pass
+
+        @State.event_handler([re.compile(r'x')])
+        def ex(self, event, arg1, arg2):
+            pass
+
+class StateRegExpEventHandlersTestCase(unittest.TestCase):
+    def setUp(self):
+        global statechart_1
+        global foo
+        global bar
+
+        statechart_1 = Statechart_1()
+        foo = statechart_1.get_state('FOO')
+        bar = statechart_1.get_state('BAR')
+
+    def _handler_for(self, event):
+        handler = foo._match_reg_exp_event_handler(event)
+        return handler['name'] if handler else None
+
+    # Handlers are fused into one expression, and matched in registration order
+    def test_handlers_are_fused(self):
+        self.assertIsNotNone(foo._reg_exp_event_matcher)
+
+        # The registration order of handlers follows dir(), so compare with
+        # trying each expression in turn.
+        for event in ['adjust_group_3', 'adjust_x', 'adjustment', 'pulsate',
+                      'pulse', 'nothing', 'adjust_group_']:
+            expected = None
+            for handler in foo._registered_reg_exp_event_handlers:
+                if handler['regexp'].match(event):
+                    expected = handler['name']
+                    break
+            self.assertEqual(self._handler_for(event), expected)
+
+    # Expressions using numbered backreferences are not fused
+    def test_backreferences_are_not_fused(self):
+        self.assertIsNone(bar._reg_exp_event_matcher)
+        self.assertEqual(bar._match_reg_exp_event_handler('aab')['name'], 'double')
+        self.assertEqual(bar._match_reg_exp_event_handler('xab')['name'], 'ex')
+        self.assertIsNone(bar._match_reg_exp_event_handler('ab'))
+
+    # Sending events through the statechart uses the fused expression
+    def test_send_event(self):
+        statechart_1.send_event('adjust_group_12')
+        statechart_1.send_event('pulsate')
+
+        self.assertEqual(foo.handled[-1], ('pulsing', 'pulsate'))
+        self.assertTrue('adjust_group_12' in foo._event_memo)
+
+    # The event memo is bounded and keeps the most recently used events
+    def test_event_memo_is_bounded(self):
+        size = state_module.EVENT_MEMO_SIZE
+        state_module.EVENT_MEMO_SIZE = 3
+        try:
+            for event in ['pulse', 'adjust_group_1', 'adjust_group_2', 'pulse',
+                          'adjust_group_3']:
+                foo.try_to_handle_event(event)
+        finally:
+            state_module.EVENT_MEMO_SIZE = size
+
+        self.assertEqual(list(foo._event_memo.keys()),
+                         ['adjust_group_2', 'pulse', 'adjust_group_3'])
+
+    # Memoized events are resolved before probing the state's attributes
+    def test_event_memo_is_checked_first(self):
+        entry = foo._resolve_event_dispatch('adjust_group_7')
+        probed = []
+
+        def probing_hasattr(obj, name):
+            probed.append(name)
+            return False
+
+        state_module.hasattr = probing_hasattr
+        try:
+            self.assertEqual(foo._resolve_event_dispatch('adjust_group_7'),
+                             entry)
+            self.assertEqual(probed, [])
+
+            foo._resolve_event_dispatch('adjust_group_8')
+            self.assertTrue('adjust_group_8' in probed)
+        finally:
+            del state_module.hasattr
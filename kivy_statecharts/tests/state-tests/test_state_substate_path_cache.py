@@ -0,0 +1,81 @@
+'''
+Statechart tests, substate path cache
+===========
+'''
+
+import unittest
+
+from kivy_statecharts.system.state import State
+from kivy_statecharts.system.statechart import StatechartManager
+
+class Statechart_1(StatechartManager):
+    def __init__(self, **kwargs):
+        kwargs['root_state_class'] = self.RootState
+        super(Statechart_1, self).__init__(**kwargs)
+
+    class RootState(State):
+        def __init__(self, **kwargs):
+            kwargs['initial_substate_key'] = 'A'
+            super(Statechart_1.RootState, self).__init__(**kwargs)
+
+        class A(State):
+            def __init__(self, **kwargs):
+                kwargs['initial_substate_key'] = 'X'
+                super(Statechart_1.RootState.A, self).__init__(**kwargs)
+
+            class X(State):
+                pass
+
+        class B(State):
+            pass
+
+class StateSubstatePathCacheTestCase(unittest.TestCase):
+    def setUp(self):
+        global statechart_1
+        global root_state_1
+        global state_A
+        global state_X
+
+        statechart_1 = Statechart_1()
+        root_state_1 = statechart_1.root_state_instance
+        state_A = statechart_1.get_state('A')
+        state_X = statechart_1.get_state('A.X')
+
+    def test_resolutions_are_cached(self):
+        self.assertEqual(root_state_1.get_substate('X'), state_X)
+        self.assertEqual(root_state_1._substate_path_cache['X'],
+                         (state_X, None))
+
+        self.assertIsNone(root_state_1.get_substate('Q'))
+        self.assertEqual(root_state_1._substate_path_cache['Q'], (None, None))
+
+        root_state_1._substate_path_cache['X'] = (state_A, None)
+        self.assertEqual(root_state_1.get_substate('X'), state_A)
+
+    def test_cache_is_cleared_when_substates_are_added(self):
+        self.assertEqual(root_state_1.get_substate('X'), state_X)
+
+        state_B = statechart_1.get_state('B')
+        state_B.add_substate('X')
+
+        self.assertEqual(root_state_1._substate_path_cache, {})
+        self.assertRaises(Exception, root_state_1.get_substate, 'X')
+        self.assertEqual(sorted(root_state_1._substate_path_cache['X'][1]),
+                         ['A.X', 'B.X'])
+
+        # Ambiguity is cached too, and still handed to the callback.
+        keys = []
+        root_state_1.get_substate('X', lambda state, value, paths: keys.append(paths))
+        self.assertEqual([sorted(paths) for paths in keys], [['A.X', 'B.X']])
+
+        self.assertEqual(root_state_1.get_substate('B.X'),
+                         statechart_1.get_state('B.X'))
+
+    def test_cache_is_cleared_when_substates_are_destroyed(self):
+        root_state_1.get_substate('X')
+        state_A.get_substate('X')
+
+        state_X.destroy()
+
+        self.assertEqual(root_state_1._substate_path_cache, {})
+        self.assertEqual(state_A._substate_path_cache, {})
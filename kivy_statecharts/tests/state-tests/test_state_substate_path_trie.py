@@ -0,0 +1,134 @@
+'''
+Statechart tests, substate path trie
+===========
+'''
+
+import random
+import unittest
+
+from kivy_statecharts.system.state import State
+from kivy_statecharts.system.statechart import StatechartManager
+from kivy_statecharts.private.state_path_matcher import StatePathMatcher
+
+NAMES = ['A', 'B', 'C', 'D']
+
+class Statechart_1(StatechartManager):
+    def __init__(self, **kwargs):
+        kwargs['root_state_class'] = self.RootState
+        kwargs['suppress_statechart_warnings'] = True
+        super(Statechart_1, self).__init__(**kwargs)
+
+    class RootState(State):
+        def __init__(self, **kwargs):
+            kwargs['initial_substate_key'] = 'A'
+            super(Statechart_1.RootState, self).__init__(**kwargs)
+
+        class A(State):
+            pass
+
+def resolve_with_registered_paths(state, value):
+    '''How get_substate resolved a path expression before the path trie, from
+       the relative paths of the substates registered with the state.
+    '''
+    matcher = StatePathMatcher(state=state, expression=value)
+
+    paths = {}
+    for substate in state._registered_substates:
+        if substate.name == matcher.last_part:
+            paths[substate.path_relative_to(state)] = substate
+
+    if not paths:
+        return None, None
+
+    if value in paths:
+        return paths[value], None
+
+    matches = [paths[path] for path in paths if matcher.match(path)]
+
+    if len(matches) == 1:
+        return matches[0], None
+
+    if len(matches) > 1:
+        return None, list(paths)
+
+    return None, None
+
+class StateSubstatePathTrieTestCase(unittest.TestCase):
+    def setUp(self):
+        global statechart_1
+        global root_state_1
+
+        statechart_1 = Statechart_1()
+        root_state_1 = statechart_1.root_state_instance
+
+    def _add_substates(self, state, rnd, depth):
+        if depth == 0:
+            return
+
+        for name in rnd.sample(NAMES, rnd.randint(1, 3)):
+            if name == state.name or hasattr(state, name):
+                continue
+            substate = state.add_substate(name)
+            self._add_substates(substate, rnd, depth - 1)
+
+    def _expression(self, rnd):
+        parts = []
+        for i in range(rnd.randint(1, 3)):
+            if rnd.random() < 0.3:
+                parts.append('{0}~{1}'.format(rnd.choice(NAMES),
+                                              rnd.choice(NAMES)))
+            else:
+                parts.append(rnd.choice(NAMES))
+        if rnd.random() < 0.3:
+            parts.insert(0, 'self')
+        return '.'.join(parts)
+
+    def test_resolutions_match_registered_paths(self):
+        rnd = random.Random(20)
+        self._add_substates(statechart_1.get_state('A'), rnd, 4)
+
+        states = [root_state_1] + root_state_1._registered_substates
+
+        for i in range(3000):
+            state = rnd.choice(states)
+            value = self._expression(rnd)
+
+            self.assertEqual(state._resolve_substate_path(value),
+                             resolve_with_registered_paths(state, value),
+                             (state.full_path, value))
+
+    def test_destroyed_states_leave_the_trie(self):
+        state_A = statechart_1.get_state('A')
+        state_B = state_A.add_substate('B')
+        state_B.add_substate('C')
+
+        self.assertEqual(root_state_1.get_substate('B~C'),
+                         statechart_1.get_state('A.B.C'))
+
+        state_B.destroy()
+
+        self.assertIsNone(root_state_1.get_substate('B~C'))
+        self.assertIsNone(root_state_1.get_substate('B'))
+        self.assertEqual(sorted(root_state_1._substate_path_trie._root.children),
+                         ['A', '__EMPTY_STATE__'])
+
+    def test_destroyed_states_leave_the_indexes(self):
+        state_A = statechart_1.get_state('A')
+        state_B = state_A.add_substate('B')
+        state_C = state_B.add_substate('C')
+        state_D = state_A.add_substate('D')
+        state_D.add_substate('C')
+
+        # Paths are kept in reverse, so the nodes below node C are named by
+        # the parent states of the states named C.
+        node_C = root_state_1._substate_path_trie._root.children['C']
+        self.assertEqual(len(node_C.named['A']), 2)
+        self.assertTrue(state_C in node_C.states)
+
+        state_B.destroy()
+
+        self.assertEqual(list(node_C.states), [statechart_1.get_state('D.C')])
+        self.assertEqual(len(node_C.named['A']), 1)
+        self.assertFalse('B' in node_C.named)
+        self.assertEqual(root_state_1.get_substate('A~C'),
+                         statechart_1.get_state('D.C'))
@@ -289,3 +289,26 @@ class StateTryToHandleEventTestCase(unittest.TestCase):
 
         # This is False because the event is the name of a handler.
         self.assertFalse(foo.responds_to_event('event_handler1'))
+
+    # Test that handler lookups are remembered in the event dispatch table
+    def test_event_dispatch_table(self):
+        self.assertEqual(foo._event_dispatch_table, {})
+
+        foo.try_to_handle_event('event1', 100, 200)
+        foo.try_to_handle_event('digit3', 100, 200)
+        foo.responds_to_event('event_handler1')
+
+        self.assertEqual(foo._event_dispatch_table['event1'][1], 'event_handler1')
+        self.assertEqual(foo._event_dispatch_table['event_handler1'][2], None)
+
+        # Events matched by regular expression are kept in the event memo.
+        self.assertFalse('digit3' in foo._event_dispatch_table)
+        self.assertEqual(foo._event_memo['digit3'][1], 'event_handler3')
+
+        def match(event):
+            raise AssertionError('{0} was matched twice'.format(event))
+        foo._match_reg_exp_event_handler = match
+
+        self.assertTrue(foo.try_to_handle_event('digit3', 300, 400))
+        self.assertEqual(foo.handled_event_info['arg1'], 300)
+        self.assertFalse(foo.responds_to_event('event_handler1'))
@@ -0,0 +1,194 @@
+'''
+Statechart tests, transitioning, async, futures
+===========
+'''
+
+import unittest
+
+from kivy_statecharts.system.async import StatechartFuture
+from kivy_statecharts.system.state import State
+from kivy_statecharts.system.statechart import StatechartManager
+
+class Statechart_1(StatechartManager):
+    def __init__(self, **kwargs):
+        kwargs['root_state_class'] = self.RootState
+        kwargs['monitor_is_active'] = True
+        super(Statechart_1, self).__init__(**kwargs)
+
+    class RootState(State):
+        def __init__(self, **kwargs):
+            kwargs['initial_substate_key'] = 'A'
+            super(Statechart_1.RootState, self).__init__(**kwargs)
+
+        class A(State):
+            def exit_state(self, context=None):
+                self.future = StatechartFuture()
+                return self.future
+
+            def to_B(self, arg1=None, arg2=None):
+                self.go_to_state('B')
+
+            def ping(self, arg1=None, arg2=None):
+                self.pinged = arg1
+                return True
+
+        class B(State):
+            def __init__(self, **kwargs):
+                kwargs['initial_substate_key'] = 'C'
+                super(Statechart_1.RootState.B, self).__init__(**kwargs)
+
+            def enter_state(self, context=None):
+                future = StatechartFuture()
+                future.set_result(None)
+                return future
+
+            def to_A(self, arg1=None, arg2=None):
+                self.go_to_state('A')
+
+            class C(State):
+                pass
+
+class StateTransitioningAsyncFuturesTestCase(unittest.TestCase):
+    def setUp(self):
+        global statechart_1
+        global monitor_1
+        global state_A
+
+        statechart_1 = Statechart_1()
+        monitor_1 = statechart_1.monitor
+        state_A = statechart_1.get_state('A')
+
+    def test_state_returning_a_future_suspends_the_transition(self):
+        monitor_1.reset()
+        statechart_1.go_to_state('B')
+
+        self.assertTrue(statechart_1.go_to_state_suspended)
+        self.assertTrue(monitor_1.match_sequence().begin().exited('A').end())
+
+        state_A.future.set_result(None)
+
+        self.assertFalse(statechart_1.go_to_state_active)
+        self.assertTrue(monitor_1.match_sequence().begin().exited('A').entered('B', 'C').end())
+        self.assertTrue(statechart_1.state_is_current_state('C'))
+
+    def test_send_event_future(self):
+        done = []
+
+        future = statechart_1.send_event_future('to_B')
+        future.add_done_callback(done.append)
+
+        self.assertFalse(future.done())
+        self.assertEqual(done, [])
+
+        state_A.future.set_result(None)
+
+        self.assertTrue(future.done())
+        self.assertEqual(done, [future])
+        self.assertTrue(statechart_1.state_is_current_state('C'))
+
+        future = statechart_1.send_event_future('to_A')
+
+        # Nothing suspends the transition, so the future is done right away.
+        self.assertTrue(future.done())
+        self.assertTrue(statechart_1.state_is_current_state('A'))
+
+    def test_go_to_state_future_waits_for_pending_transitions(self):
+        future = statechart_1.go_to_state_future('B')
+        statechart_1.go_to_state('A')
+
+        self.assertFalse(future.done())
+
+        state_A.future.set_result(None)
+
+        self.assertTrue(future.done())
+        self.assertIsNone(future.result())
+        self.assertTrue(statechart_1.state_is_current_state('A'))
+
+    def test_send_event_future_of_a_queued_event(self):
+        statechart_1.go_to_state('B')
+        state_A.pinged = None
+
+        # The transition is suspended, so the event is queued.
+        future = statechart_1.send_event_future('ping', 1)
+
+        self.assertFalse(future.done())
+
+        state_A.future.set_result(None)
+
+        # Queued events are handled once the transition is complete.
+        self.assertTrue(future.done())
+        self.assertIsNone(future.result())
+        self.assertIsNone(state_A.pinged)
+        self.assertTrue(statechart_1.state_is_current_state('C'))
+
+        statechart_1.go_to_state('A')
+        statechart_1.go_to_state('B')
+        future = statechart_1.send_event_future('to_A')
+        future_ping = statechart_1.send_event_future('ping', 2)
+
+        state_A.future.set_result(None)
+
+        self.assertIs(future.result(), statechart_1)
+        self.assertIs(future_ping.result(), statechart_1)
+        self.assertEqual(state_A.pinged, 2)
+        self.assertTrue(statechart_1.state_is_current_state('A'))
+
+    def test_failed_future_abandons_the_transition(self):
+        errors = []
+        statechart_1.statechart_log_error = errors.append
+
+        future = statechart_1.go_to_state_future('B')
+        monitor_1.reset()
+
+        exception = ValueError('animation failed')
+        state_A.future.set_exception(exception)
+
+        self.assertFalse(statechart_1.go_to_state_active)
+        self.assertFalse(statechart_1.go_to_state_suspended)
+        self.assertEqual(monitor_1.length, 0)
+        self.assertFalse(statechart_1.state_is_current_state('C'))
+        self.assertIs(future.exception(), exception)
+        self.assertRaises(ValueError, future.result)
+        self.assertTrue(any('animation failed' in error for error in errors))
+
+        # The statechart goes on with state transitions. A has been exited
+        # already, so nothing suspends this one.
+        statechart_1.go_to_state('B')
+        self.assertTrue(statechart_1.state_is_current_state('C'))
+
+    def test_send_event_future_of_a_dropped_event(self):
+        statechart_1.internal_event_queue_capacity = 1
+        statechart_1.go_to_state('B')
+
+        future_1 = statechart_1.send_event_future('ping', 1)
+        future_2 = statechart_1.send_event_future('ping', 2)
+
+        # The oldest event was dropped to make room for the newest one.
+        self.assertTrue(future_1.done())
+        self.assertFalse(future_2.done())
+        self.assertEqual(str(future_1.exception()),
+                         "Cannot handle event ping. It was dropped by a full "
+                         "event queue")
+        self.assertRaises(Exception, future_1.result)
+
+        statechart_1.event_queue_overflow = 'drop_newest'
+        future_3 = statechart_1.send_event_future('ping', 3)
+
+        self.assertTrue(future_3.done())
+        self.assertIsNotNone(future_3.exception())
+
+        state_A.future.set_result(None)
+
+        self.assertTrue(future_2.done())
+        self.assertIsNone(future_2.exception())
+
+    def test_send_event_future_of_a_coalesced_event(self):
+        statechart_1.internal_event_queue_capacity = 1
+        statechart_1.event_queue_overflow = 'coalesce'
+        statechart_1.go_to_state('B')
+
+        future_1 = statechart_1.send_event_future('ping', 1)
+        future_2 = statechart_1.send_event_future('ping', 2)
+
+        self.assertIsNotNone(future_1.exception())
+        self.assertFalse(future_2.done())
@@ -0,0 +1,73 @@
+'''
+Statechart tests, transitioning, deferred state property changes
+===========
+'''
+
+import unittest
+
+from kivy_statecharts.system.state import State
+from kivy_statecharts.system.statechart import StatechartManager
+
+class Statechart_1(StatechartManager):
+    def __init__(self, **kwargs):
+        kwargs['root_state_class'] = self.RootState
+        super(Statechart_1, self).__init__(**kwargs)
+
+    class RootState(State):
+        def __init__(self, **kwargs):
+            kwargs['initial_substate_key'] = 'A'
+            super(Statechart_1.RootState, self).__init__(**kwargs)
+
+        class A(State):
+            def __init__(self, **kwargs):
+                kwargs['initial_substate_key'] = 'C'
+                super(Statechart_1.RootState.A, self).__init__(**kwargs)
+
+            class C(State):
+                pass
+
+        class B(State):
+            def __init__(self, **kwargs):
+                kwargs['substates_are_concurrent'] = True
+                super(Statechart_1.RootState.B, self).__init__(**kwargs)
+
+            class D(State):
+                def enter_state(self, context=None):
+                    # The lists are up to date while notifications are deferred.
+                    self.was_current = self.is_current_state()
+
+            class E(State):
+                pass
+
+class StateTransitioningDeferredStatePropertyChangesTestCase(unittest.TestCase):
+    def setUp(self):
+        global statechart_1
+        global root_state_1
+        global changes
+
+        changes = []
+
+        statechart_1 = Statechart_1()
+        root_state_1 = statechart_1.root_state_instance
+
+        root_state_1.bind(current_substates=self._record_change,
+                          entered_substates=self._record_change)
+
+    def _record_change(self, state, value):
+        changes.append(sorted(item.name for item in value))
+
+    def test_notifications_per_change(self):
+        statechart_1.go_to_state('B')
+
+        self.assertTrue(len(changes) > 2)
+
+    def test_deferred_notifications(self):
+        statechart_1.defer_state_property_changes = True
+
+        statechart_1.go_to_state('B')
+
+        self.assertEqual(changes, [['D', 'E'], ['B', 'D', 'E', '__ROOT_STATE__']])
+        self.assertTrue(statechart_1.get_state('D').was_current)
+        self.assertTrue(statechart_1.state_is_current_state('D'))
+        self.assertTrue(statechart_1.state_is_current_state('E'))
+        self.assertEqual(statechart_1._changed_state_properties, {})
@@ -0,0 +1,140 @@
+'''
+Statechart tests, transitioning, timers
+===========
+'''
+
+import time
+import unittest
+
+from kivy.clock import Clock
+from kivy_statecharts.system.state import State
+from kivy_statecharts.system.statechart import StatechartManager
+
+class Statechart_1(StatechartManager):
+    def __init__(self, **kwargs):
+        kwargs['root_state_class'] = self.RootState
+        super(Statechart_1, self).__init__(**kwargs)
+
+    class RootState(State):
+        def __init__(self, **kwargs):
+            kwargs['initial_substate_key'] = 'Waiting'
+            self.handled = []
+            super(Statechart_1.RootState, self).__init__(**kwargs)
+
+        def ping(self, arg1=None, arg2=None):
+            self.handled.append(('ping', arg1))
+
+        class Waiting(State):
+            def enter_state(self, context=None):
+                self.go_to_state_after(10, 'TimedOut')
+                self.send_event_after(5, 'ping', 'waiting')
+
+            def start(self, arg1=None, arg2=None):
+                self.go_to_state('Playing')
+
+        class Playing(State):
+            pass
+
+        class TimedOut(State):
+            pass
+
+class StateTransitioningTimersTestCase(unittest.TestCase):
+    def setUp(self):
+        global statechart_1
+        global root_state_1
+
+        statechart_1 = Statechart_1()
+        root_state_1 = statechart_1.root_state_instance
+
+    def test_state_timeout(self):
+        now = time.time()
+
+        self.assertEqual(statechart_1.timers_depth(), 2)
+        self.assertEqual(statechart_1.run_timers(now + 1), 0)
+
+        self.assertEqual(statechart_1.run_timers(now + 20), 2)
+
+        self.assertEqual(root_state_1.handled, [('ping', 'waiting')])
+        self.assertTrue(statechart_1.state_is_current_state('TimedOut'))
+        self.assertEqual(statechart_1.timers_depth(), 0)
+
+    def test_state_timers_are_cancelled_on_exit(self):
+        statechart_1.send_event('start')
+
+        self.assertTrue(statechart_1.state_is_current_state('Playing'))
+        self.assertEqual(statechart_1.timers_depth(), 0)
+
+        self.assertEqual(statechart_1.run_timers(time.time() + 20), 0)
+        self.assertTrue(statechart_1.state_is_current_state('Playing'))
+        self.assertEqual(root_state_1.handled, [])
+
+    def test_send_event_after(self):
+        statechart_1.send_event('start')
+
+        now = time.time()
+        timers = [statechart_1.send_event_after(delay, 'ping', delay)
+                  for delay in (3, 1, 2)]
+        timers[2].cancel()
+        timers[2].cancel()
+
+        self.assertEqual(statechart_1.timers_depth(), 2)
+        self.assertEqual(statechart_1.details()['timers']['depth'], 2)
+        self.assertEqual(statechart_1.run_timers(now + 5), 2)
+        self.assertEqual(root_state_1.handled, [('ping', 1), ('ping', 3)])
+
+    def test_timers_are_run_by_one_clock_event(self):
+        statechart_1.send_event('start')
+
+        for i in range(1000):
+            statechart_1.send_event_after(0.5 + i / 1000.0, 'ping', i)
+        statechart_1.send_event_after(0, 'ping', 'now')
+
+        self.assertEqual(statechart_1._timers_deadline,
+                         statechart_1._timers.next_deadline())
+
+        Clock.tick()
+
+        self.assertEqual(root_state_1.handled, [('ping', 'now')])
+        self.assertEqual(statechart_1.timers_depth(), 1000)
+        self.assertTrue(statechart_1._timers_deadline is not None)
+
+    def test_cancelled_timers_are_compacted(self):
+        timers = [statechart_1.send_event_after(1, 'ping', i)
+                  for i in range(200)]
+        for timer in timers[:150]:
+            timer.cancel()
+
+        self.assertEqual(statechart_1.timers_depth(), 52)
+        self.assertTrue(len(statechart_1._timers._heap) < 200)
+
+    def test_timers_after_a_failing_timer_still_run(self):
+        statechart_1.send_event('start')
+
+        def fail():
+            raise ValueError('fail')
+
+        statechart_1.send_event_after(0, 'ping', 1)
+        statechart_1.schedule_timer(0, fail)
+        statechart_1.send_event_after(0, 'ping', 3)
+
+        self.assertRaises(ValueError, Clock.tick)
+
+        self.assertEqual(root_state_1.handled, [('ping', 1)])
+        self.assertEqual(statechart_1.timers_depth(), 1)
+        self.assertTrue(statechart_1._timers_deadline is not None)
+
+        Clock.tick()
+
+        self.assertEqual(root_state_1.handled, [('ping', 1), ('ping', 3)])
+        self.assertEqual(statechart_1.timers_depth(), 0)
+
+    def test_cancelled_state_timers_are_discarded(self):
+        state = statechart_1.get_state('Waiting')
+        timer = state.send_event_after(1, 'ping', 'cancelled')
+
+        self.assertTrue(timer in statechart_1._state_timers[state.state_id])
+
+        timer.cancel()
+
+        self.assertFalse(timer in statechart_1._state_timers[state.state_id])
+        self.assertEqual(len(statechart_1._state_timers[state.state_id]), 2)
@@ -0,0 +1,172 @@
+'''
+Statechart tests, statechart definitions
+===========
+'''
+
+import random
+import unittest
+
+from kivy_statecharts.system.state import State
+from kivy_statecharts.system.history_state import HistoryState
+from kivy_statecharts.system.statechart import StatechartManager
+from kivy_statecharts.system.statechart_definition import StatechartDefinition
+
+class RootState(State):
+    def __init__(self, **kwargs):
+        kwargs['initial_substate_key'] = 'A'
+        super(RootState, self).__init__(**kwargs)
+
+    def hit(self, arg1=None, arg2=None):
+        instance = getattr(self.statechart, 'instance', None)
+        if instance is not None:
+            instance.data['hits'] = instance.data.get('hits', 0) + 1
+
+    class A(State):
+        def __init__(self, **kwargs):
+            kwargs['initial_substate_key'] = 'C'
+            super(RootState.A, self).__init__(**kwargs)
+
+        def to_B(self, arg1=None, arg2=None):
+            self.go_to_state('B')
+
+        class C(State):
+            def next(self, arg1=None, arg2=None):
+                self.go_to_state('D')
+
+        class D(State):
+            def next(self, arg1=None, arg2=None):
+                self.go_to_state('C')
+
+            def time_out(self, arg1=None, arg2=None):
+                self.go_to_state_after(1, 'C')
+
+    class B(State):
+        def __init__(self, **kwargs):
+            kwargs['substates_are_concurrent'] = True
+            super(RootState.B, self).__init__(**kwargs)
+
+        def to_A(self, arg1=None, arg2=None):
+            self.go_to_history_state('A')
+
+        class E(State):
+            class InitialSubstate(HistoryState):
+                default_state = 'G'
+
+            class G(State):
+                def next(self, arg1=None, arg2=None):
+                    self.go_to_state('H')
+
+            class H(State):
+                def next(self, arg1=None, arg2=None):
+                    self.go_to_state('G')
+
+        class F(State):
+            @State.event_handler(['poke', 'prod'])
+            def poked(self, event, arg1=None, arg2=None):
+                self.statechart.send_event('next')
+
+EVENTS = ['to_A', 'to_B', 'next', 'poke', 'hit']
+
+class StatechartDefinitionTestCase(unittest.TestCase):
+    def setUp(self):
+        global definition
+
+        definition = StatechartDefinition(root_state_class=RootState,
+                                          monitor_is_active=True)
+
+    def _current_state_names(self, states):
+        return sorted(state.full_path for state in states)
+
+    def test_instances_behave_as_statechart_managers(self):
+        random.seed(42)
+
+        instances = [definition.create_instance() for i in range(5)]
+        statecharts = [StatechartManager(root_state_class=RootState)
+                       for i in range(5)]
+
+        for instance, statechart in zip(instances, statecharts):
+            self.assertEqual(self._current_state_names(instance.current_states),
+                             self._current_state_names(statechart.current_states))
+
+        for step in range(200):
+            i = random.randrange(5)
+            event = random.choice(EVENTS)
+
+            instances[i].send_event(event)
+            statecharts[i].send_event(event)
+
+            self.assertEqual(self._current_state_names(instances[i].current_states),
+                             self._current_state_names(statecharts[i].current_states))
+            self.assertEqual(
+                    self._current_state_names(instances[i].entered_states),
+                    self._current_state_names(statecharts[i].entered_states()))
+
+    def test_history_is_kept_per_instance(self):
+        instance_1 = definition.create_instance()
+        instance_2 = definition.create_instance()
+
+        instance_1.send_event('next')
+        instance_1.send_event('to_B')
+        instance_2.send_event('to_B')
+
+        monitor = definition.statechart.monitor
+        monitor.reset()
+        instance_1.send_event('to_A')
+
+        self.assertTrue(monitor.match_sequence().begin().exited('G', 'E', 'F', 'B').entered('A', 'D').end())
+        self.assertTrue(instance_1.state_is_current_state('D'))
+
+        instance_2.send_event('to_A')
+        self.assertTrue(instance_2.state_is_current_state('C'))
+        self.assertTrue(instance_2.state_is_entered('A'))
+        self.assertFalse(instance_2.state_is_entered('B'))
+
+    def test_instance_data(self):
+        instance_1 = definition.create_instance(data={'hits': 10})
+        instance_2 = definition.create_instance()
+
+        instance_1.send_event('hit')
+        instance_2.send_events(['hit', 'hit'])
+
+        self.assertEqual(instance_1.data, {'hits': 11})
+        self.assertEqual(instance_2.data, {'hits': 2})
+
+    def test_events_sent_to_other_instances_are_queued(self):
+        instance_1 = definition.create_instance()
+        instance_2 = definition.create_instance()
+        log = []
+
+        class Forward(State):
+            def forward(self, arg1=None, arg2=None):
+                log.append(arg1.send_event('to_B'))
+                log.append(self.statechart.instance.current_states[0].name)
+
+        definition.get_state('A').add_substate('Forward', Forward)
+
+        instance_1.go_to_state('Forward')
+        instance_1.send_event('forward', instance_2)
+
+        self.assertEqual(log, [None, 'Forward'])
+        self.assertTrue(instance_1.state_is_current_state('Forward'))
+        self.assertTrue(instance_2.state_is_current_state('G'))
+        self.assertTrue(instance_2.state_is_current_state('F'))
+
+    def test_timers_cannot_be_scheduled(self):
+        errors = []
+        definition.statechart.statechart_log_error = errors.append
+        instance = definition.create_instance()
+        instance.send_event('next')
+
+        msg = ("Cannot schedule a timer on the statechart of a "
+               "StatechartDefinition. Its states are shared by all instances")
+
+        with self.assertRaises(Exception) as cm:
+            instance.send_event('time_out')
+        self.assertEqual(str(cm.exception), msg)
+
+        with self.assertRaises(Exception) as cm:
+            definition.statechart.send_event_after(1, 'next')
+        self.assertEqual(str(cm.exception), msg)
+
+        self.assertEqual(errors.count(msg), 2)
+        self.assertEqual(definition.statechart.timers_depth(), 0)
@@ -0,0 +1,170 @@
+'''
+Statechart tests, statechart definitions, broadcasting events
+===========
+'''
+
+import unittest
+
+from kivy_statecharts.system.state import State
+from kivy_statecharts.system.statechart_definition import StatechartDefinition
+from kivy_statecharts.system.statechart_definition import PYTHON_TRANSITION
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+class RootState(State):
+    def __init__(self, **kwargs):
+        kwargs['initial_substate_key'] = 'Slow'
+        super(RootState, self).__init__(**kwargs)
+
+    class Slow(State):
+        speed_up = State.transition_to('Fast')
+        park = State.transition_to('Parked')
+
+    class Fast(State):
+        speed_up = State.transition_to('Faster')
+        slow_down = State.transition_to('Slow')
+
+    class Faster(State):
+        def enter_state(self, context=None):
+            self.statechart.instance.data['entered'] = \
+                    self.statechart.instance.data.get('entered', 0) + 1
+
+        def exit_state(self, context=None):
+            self.statechart.instance.data['exited'] = True
+
+        slow_down = State.transition_to('Slow')
+
+        def speed_up(self, arg1=None, arg2=None):
+            self.go_to_state('Stopped')
+
+    class Stopped(State):
+        pass
+
+    class Parked(State):
+        def state_did_become_entered(self, context=None):
+            super(RootState.Parked, self).state_did_become_entered(context)
+            self.statechart.instance.data['parked'] = \
+                    self.statechart.instance.data.get('parked', 0) + 1
+
+        def state_will_become_exited(self, context=None):
+            super(RootState.Parked, self).state_will_become_exited(context)
+            self.statechart.instance.data['unparked'] = True
+
+        drive = State.transition_to('Slow')
+
+class StatechartDefinitionBroadcastTestCase(unittest.TestCase):
+    def setUp(self):
+        global definition
+
+        definition = StatechartDefinition(root_state_class=RootState)
+
+    def _state_names(self, instances):
+        return [instance.current_states[0].name for instance in instances]
+
+    def test_broadcast_event(self):
+        instances = [definition.create_instance() for i in range(4)]
+        instances[1].send_event('speed_up')
+        instances[2].send_events(['speed_up', 'speed_up'])
+
+        definition.broadcast_event(instances, 'speed_up')
+
+        self.assertEqual(self._state_names(instances),
+                         ['Fast', 'Faster', 'Stopped', 'Fast'])
+        self.assertEqual(instances[1].data, {'entered': 1})
+        self.assertEqual(instances[2].data, {'entered': 1, 'exited': True})
+        self.assertTrue(instances[0].state_is_current_state('Fast'))
+        self.assertFalse(instances[0].state_is_entered('Slow'))
+
+        definition.broadcast_event(instances, 'slow_down')
+
+        self.assertEqual(self._state_names(instances),
+                         ['Slow', 'Slow', 'Stopped', 'Slow'])
+        self.assertEqual(instances[1].data, {'entered': 1, 'exited': True})
+
+        # Moved instances keep working one by one.
+        instances[0].send_event('speed_up')
+        self.assertTrue(instances[0].state_is_current_state('Fast'))
+
+    def test_transition_table(self):
+        instance = definition.create_instance()
+        slow_id = definition.configuration_id(instance)
+
+        instance.send_event('speed_up')
+        fast_id = definition.configuration_id(instance)
+
+        instance.send_event('speed_up')
+        faster_id = definition.configuration_id(instance)
+
+        next_ids, needs_callbacks = definition.next_configuration_ids(
+                [slow_id, fast_id, faster_id, slow_id], 'speed_up')
+
+        self.assertEqual(next_ids, [fast_id, faster_id, PYTHON_TRANSITION, fast_id])
+        self.assertEqual(needs_callbacks, [False, True, False, False])
+
+        definition.get_state('Fast').add_substate('Idle')
+
+        self.assertEqual(definition._transition_rows, {})
+
+    def test_broadcast_calls_state_hooks(self):
+        instances = [definition.create_instance() for i in range(3)]
+        instances[2].send_event('speed_up')
+
+        definition.broadcast_event(instances, 'park')
+
+        self.assertEqual(self._state_names(instances),
+                         ['Parked', 'Parked', 'Fast'])
+        self.assertEqual(instances[0].data, {'parked': 1})
+        self.assertEqual(instances[1].data, {'parked': 1})
+        self.assertEqual(instances[2].data, {})
+
+        definition.broadcast_event(instances, 'drive')
+
+        self.assertEqual(self._state_names(instances),
+                         ['Slow', 'Slow', 'Fast'])
+        self.assertEqual(instances[0].data, {'parked': 1, 'unparked': True})
+
+    def test_broadcast_tells_the_monitor(self):
+        definition = StatechartDefinition(root_state_class=RootState,
+                                          monitor_is_active=True)
+        monitor = definition.statechart.monitor
+        instances = [definition.create_instance() for i in range(2)]
+
+        monitor.reset()
+        definition.broadcast_event(instances, 'speed_up')
+
+        self.assertTrue(monitor.match_sequence().begin()
+                        .exited('Slow').entered('Fast')
+                        .exited('Slow').entered('Fast').end())
+
+        records = definition.statechart.flight_recorder.records()
+        self.assertEqual([record[1] for record in records[-4:]],
+                         ['exited', 'entered', 'exited', 'entered'])
+
+    @unittest.skipIf(numpy is None, "numpy is not installed")
+    def test_transition_table_with_numpy(self):
+        instance = definition.create_instance()
+        slow_id = definition.configuration_id(instance)
+
+        instance.send_event('speed_up')
+        fast_id = definition.configuration_id(instance)
+
+        instance.send_event('speed_up')
+        faster_id = definition.configuration_id(instance)
+
+        configuration_ids = [slow_id, fast_id, faster_id, slow_id]
+        next_ids, needs_callbacks = definition.next_configuration_ids(
+                numpy.array(configuration_ids), 'speed_up')
+
+        self.assertIsInstance(next_ids, numpy.ndarray)
+        self.assertEqual(next_ids.tolist(),
+                         [fast_id, faster_id, PYTHON_TRANSITION, fast_id])
+        self.assertEqual(needs_callbacks.tolist(), [False, True, False, False])
+
+        # The same as with lists.
+        self.assertEqual(
+                (next_ids.tolist(), needs_callbacks.tolist()),
+                definition.next_configuration_ids(configuration_ids,
+                                                  'speed_up'))
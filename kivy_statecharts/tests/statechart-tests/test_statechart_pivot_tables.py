@@ -0,0 +1,132 @@
+'''
+Statechart tests, pivot state lookup
+===========
+'''
+
+import unittest
+
+from kivy_statecharts.system.state import State
+from kivy_statecharts.system.statechart import StatechartManager
+
+class Statechart_1(StatechartManager):
+    def __init__(self, **kwargs):
+        kwargs['root_state_class'] = self.RootState
+        kwargs['monitor_is_active'] = True
+        super(Statechart_1, self).__init__(**kwargs)
+
+    class RootState(State):
+        def __init__(self, **kwargs):
+            kwargs['initial_substate_key'] = 'A'
+            super(Statechart_1.RootState, self).__init__(**kwargs)
+
+        class A(State):
+            def __init__(self, **kwargs):
+                kwargs['initial_substate_key'] = 'C'
+                super(Statechart_1.RootState.A, self).__init__(**kwargs)
+
+            class C(State):
+                def __init__(self, **kwargs):
+                    kwargs['initial_substate_key'] = 'G'
+                    super(Statechart_1.RootState.A.C, self).__init__(**kwargs)
+
+                class G(State):
+                    pass
+
+                class H(State):
+                    pass
+
+            class D(State):
+                pass
+
+        class B(State):
+            def __init__(self, **kwargs):
+                kwargs['initial_substate_key'] = 'E'
+                super(Statechart_1.RootState.B, self).__init__(**kwargs)
+
+            class E(State):
+                pass
+
+            class F(State):
+                pass
+
+class StatechartPivotTablesTestCase(unittest.TestCase):
+    def setUp(self):
+        global statechart_1
+        global monitor_1
+
+        statechart_1 = Statechart_1()
+        monitor_1 = statechart_1.monitor
+
+    def _pivot(self, name_1, name_2):
+        chain_1 = statechart_1._create_state_chain(statechart_1.get_state(name_1))
+        chain_2 = statechart_1._create_state_chain(statechart_1.get_state(name_2))
+        return statechart_1._find_pivot_state(chain_1, chain_2)
+
+    def test_pivot_state_is_lowest_common_ancestor(self):
+        root_state = statechart_1.root_state_instance
+
+        self.assertEqual(self._pivot('G', 'H').name, 'C')
+        self.assertEqual(self._pivot('G', 'D').name, 'A')
+        self.assertEqual(self._pivot('H', 'F'), root_state)
+        self.assertEqual(self._pivot('C', 'G').name, 'C')
+        self.assertEqual(self._pivot('E', 'E').name, 'E')
+        self.assertEqual(self._pivot('B', 'E').name, 'B')
+
+    def test_state_chain_runs_to_root(self):
+        chain = statechart_1._create_state_chain(statechart_1.get_state('G'))
+
+        self.assertEqual([state.name for state in chain],
+                         ['G', 'C', 'A', '__ROOT_STATE__'])
+
+        chain.popleft()
+        self.assertEqual(len(statechart_1._create_state_chain(statechart_1.get_state('G'))), 4)
+
+    def test_add_substate_updates_tables(self):
+        self._pivot('G', 'F')
+        self.assertIsNotNone(statechart_1._pivot_tables)
+
+        tables = statechart_1._pivot_tables
+        statechart_1.get_state('F').add_substate('I')
+
+        self.assertIs(statechart_1._pivot_tables, tables)
+        self.assertEqual(self._pivot('I', 'E').name, 'B')
+        self.assertEqual(self._pivot('I', 'G'), statechart_1.root_state_instance)
+
+        monitor_1.reset()
+        statechart_1.go_to_state('I')
+
+        self.assertTrue(monitor_1.match_sequence().begin().exited('G', 'C', 'A').entered('B', 'F', 'I').end())
+
+    def test_added_substates_extend_tables(self):
+        self._pivot('G', 'F')
+        tables = statechart_1._pivot_tables
+
+        state_F = statechart_1.get_state('F')
+        state_F.add_substate('I')
+        statechart_1.get_state('F.I').add_substate('J')
+        state_F.add_substate('K')
+
+        self.assertIs(statechart_1._pivot_tables, tables)
+        self.assertEqual(self._pivot('J', 'K').name, 'F')
+        self.assertEqual(self._pivot('J', 'I').name, 'I')
+        self.assertEqual(self._pivot('F', 'J').name, 'F')
+        self.assertEqual(self._pivot('J', 'E').name, 'B')
+        self.assertEqual(self._pivot('H', 'K'), statechart_1.root_state_instance)
+
+    def test_tables_are_rebuilt_once_outgrown(self):
+        self._pivot('G', 'F')
+        tables = statechart_1._pivot_tables
+        size = max(len(tables[0]) // 2, 64)
+
+        state_D = statechart_1.get_state('D')
+        for index in range(size // 2):
+            state_D.add_substate('S{0}'.format(index))
+
+        self.assertIs(statechart_1._pivot_tables, tables)
+
+        for index in range(size // 2, size + 1):
+            state_D.add_substate('S{0}'.format(index))
+
+        self.assertIsNone(statechart_1._pivot_tables)
+        self.assertEqual(self._pivot('S0', 'G').name, 'A')
+        self.assertEqual(len(statechart_1._untabled_states), 0)
@@ -0,0 +1,78 @@
+'''
+Statechart tests, startup profile
+===========
+'''
+
+import gc
+import unittest
+
+from kivy_statecharts.system.state import State
+from kivy_statecharts.system.statechart import StatechartManager
+
+class Statechart_1(StatechartManager):
+    initial_state_key = 'A'
+
+    class A(State):
+        def __init__(self, **kwargs):
+            kwargs['initial_substate_key'] = 'C'
+            super(Statechart_1.A, self).__init__(**kwargs)
+
+        class C(State):
+            pass
+
+        class D(State):
+            pass
+
+    class B(State):
+        pass
+
+class StatechartStartupProfileTestCase(unittest.TestCase):
+    def test_startup_profiler_is_off_by_default(self):
+        statechart_1 = Statechart_1()
+
+        self.assertIsNone(statechart_1.startup_profile)
+
+    def test_startup_profile(self):
+        statechart_1 = Statechart_1(startup_profiler_is_active=True)
+        profile = statechart_1.startup_profile.as_dict()
+
+        phases = dict((phase['phase'], phase) for phase in profile['phases'])
+        self.assertEqual(sorted(phases.keys()),
+                         ['construct root state class', 'create root state',
+                          'full path', 'go to initial states', 'init state',
+                          'register paths'])
+        self.assertEqual(phases['init state']['calls'], 1)
+        self.assertEqual(phases['register paths']['calls'], 5)
+        self.assertTrue(phases['init state']['allocations'] > 0)
+
+        seconds = [phase['seconds'] for phase in profile['phases']]
+        self.assertEqual(seconds, sorted(seconds, reverse=True))
+
+        subtrees = dict((subtree['state'], subtree)
+                        for subtree in profile['subtrees'])
+        self.assertEqual(sorted(subtrees.keys()),
+                         ['A', 'A.C', 'A.D', 'B', '__ROOT_STATE__'])
+        self.assertEqual(subtrees['__ROOT_STATE__']['states'], 5)
+        self.assertEqual(subtrees['A']['states'], 3)
+        self.assertEqual(subtrees['B']['states'], 1)
+        self.assertEqual(profile['subtrees'][0]['state'], '__ROOT_STATE__')
+        self.assertTrue(subtrees['A']['own-seconds'] <= subtrees['A']['seconds'])
+        self.assertEqual(profile['states'], 5)
+
+        self.assertTrue(statechart_1.state_is_current_state('C'))
+        self.assertIsNone(statechart_1._active_startup_profile)
+        self.assertTrue(gc.isenabled())
+
+    def test_report(self):
+        statechart_1 = Statechart_1(startup_profiler_is_active=True)
+        report = statechart_1.startup_profile.report(limit=2)
+        lines = report.split('\n')
+
+        self.assertTrue(lines[0].startswith('Startup profile: '))
+        self.assertTrue(lines[0].endswith(' 5 states'))
+        self.assertTrue(lines[2].startswith('phase'))
+
+        subtree_lines = lines[lines.index('', 2) + 1:]
+        self.assertTrue(subtree_lines[0].startswith('subtree'))
+        self.assertEqual(len(subtree_lines), 3)
+        self.assertTrue(subtree_lines[1].startswith('__ROOT_STATE__'))
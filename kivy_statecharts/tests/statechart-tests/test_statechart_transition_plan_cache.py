@@ -0,0 +1,112 @@
+'''
+Statechart tests, transition plan cache
+===========
+'''
+
+import unittest
+
+from kivy_statecharts.system.state import State
+from kivy_statecharts.system.statechart import StatechartManager
+
+class Statechart_1(StatechartManager):
+    def __init__(self, **kwargs):
+        kwargs['root_state_class'] = self.RootState
+        kwargs['monitor_is_active'] = True
+        kwargs['transition_plan_cache_is_active'] = True
+        super(Statechart_1, self).__init__(**kwargs)
+
+    class RootState(State):
+        def __init__(self, **kwargs):
+            kwargs['initial_substate_key'] = 'A'
+            super(Statechart_1.RootState, self).__init__(**kwargs)
+
+        class A(State):
+            def __init__(self, **kwargs):
+                kwargs['initial_substate_key'] = 'C'
+                super(Statechart_1.RootState.A, self).__init__(**kwargs)
+
+            class C(State):
+                pass
+
+            class D(State):
+                pass
+
+        class B(State):
+            def __init__(self, **kwargs):
+                kwargs['initial_substate_key'] = 'E'
+                super(Statechart_1.RootState.B, self).__init__(**kwargs)
+
+            class E(State):
+                pass
+
+            class F(State):
+                pass
+
+class StatechartTransitionPlanCacheTestCase(unittest.TestCase):
+    def setUp(self):
+        global statechart_1
+        global monitor_1
+
+        statechart_1 = Statechart_1()
+        monitor_1 = statechart_1.monitor
+
+    def test_repeated_transitions_hit_the_cache(self):
+        statechart_1.go_to_state('B')
+        statechart_1.go_to_state('A')
+
+        misses = statechart_1.transition_plan_cache_misses
+        self.assertEqual(statechart_1.transition_plan_cache_hits, 0)
+
+        monitor_1.reset()
+        statechart_1.go_to_state('B')
+
+        self.assertEqual(statechart_1.transition_plan_cache_hits, 1)
+        self.assertEqual(statechart_1.transition_plan_cache_misses, misses)
+        self.assertTrue(monitor_1.match_sequence().begin().exited('C', 'A').entered('B', 'E').end())
+        self.assertTrue(statechart_1.state_is_current_state('E'))
+
+        statechart_1.go_to_state('A')
+
+        self.assertEqual(statechart_1.transition_plan_cache_hits, 2)
+        self.assertTrue(statechart_1.state_is_current_state('C'))
+
+        details = statechart_1.details()
+        self.assertEqual(details['transition-plan-cache']['hits'], 2)
+
+    def test_plans_depend_on_history(self):
+        statechart_1.go_to_state('F')
+        statechart_1.go_to_state('A')
+        statechart_1.go_to_history_state('B', recursive=True)
+        self.assertTrue(statechart_1.state_is_current_state('F'))
+
+        statechart_1.go_to_state('E')
+        statechart_1.go_to_state('A')
+
+        hits = statechart_1.transition_plan_cache_hits
+        monitor_1.reset()
+        statechart_1.go_to_history_state('B', recursive=True)
+
+        self.assertEqual(statechart_1.transition_plan_cache_hits, hits)
+        self.assertTrue(monitor_1.match_sequence().begin().exited('C', 'A').entered('B', 'E').end())
+        self.assertTrue(statechart_1.state_is_current_state('E'))
+
+    def test_add_substate_clears_the_cache(self):
+        statechart_1.go_to_state('B')
+        statechart_1.go_to_state('A')
+
+        self.assertTrue(len(statechart_1._transition_plan_cache) > 0)
+
+        statechart_1.get_state('B').add_substate('G')
+
+        self.assertEqual(len(statechart_1._transition_plan_cache), 0)
+
+        statechart_1.go_to_state('G')
+        self.assertTrue(statechart_1.state_is_current_state('G'))
+
+    def test_cache_is_bounded(self):
+        statechart_1.transition_plan_cache_size = 2
+
+        for name in ('B', 'A', 'D', 'F', 'C'):
+            statechart_1.go_to_state(name)
+
+        self.assertEqual(len(statechart_1._transition_plan_cache), 2)